@@ -1,14 +1,17 @@
 "use client";
 
-import { useState, useEffect } from "react";
+import { useState, useEffect, useRef, useCallback } from "react";
 import { useAuth } from "@/contexts/AuthContext";
 import {
   getChatSessionWithMessages,
+  getMessageBodies,
+  hasArchivedMessages,
   ChatSessionWithMessages,
 } from "@/lib/database";
-import { ArrowLeft, MessageSquare, Calendar } from "lucide-react";
+import { ArrowLeft, MessageSquare, Calendar, Archive } from "lucide-react";
 import Link from "next/link";
 import { getModelById } from "@/lib/ai-models";
+import { cachedSession, storeSession } from "@/lib/session-prefetch";
 
 interface ChatSessionPageProps {
   params: {
@@ -18,9 +21,20 @@ interface ChatSessionPageProps {
 
 export default function ChatSessionPage({ params }: ChatSessionPageProps) {
   const { user, loading: authLoading } = useAuth();
-  const [session, setSession] = useState<ChatSessionWithMessages | null>(null);
-  const [loading, setLoading] = useState(true);
+  // A session prefetched from the history page renders at once; the full
+  // session replaces it once loaded.
+  const [prefetched] = useState(() => cachedSession(params.sessionId));
+  const [session, setSession] = useState<ChatSessionWithMessages | null>(
+    prefetched ?? null
+  );
+  const [loading, setLoading] = useState(prefetched === undefined);
   const [error, setError] = useState("");
+  // Older messages of the session are being restored from the archive
+  const [restoring, setRestoring] = useState(false);
+  // Full text of offloaded messages fetched so far, by message id
+  const [bodies, setBodies] = useState<Record<string, string>>({});
+  const bodyObserver = useRef<IntersectionObserver | null>(null);
+  const requestedBodies = useRef(new Set<string>());
 
   useEffect(() => {
     if (user && !authLoading && params.sessionId) {
@@ -30,9 +44,14 @@ export default function ChatSessionPage({ params }: ChatSessionPageProps) {
 
   const loadSession = async () => {
     try {
-      setLoading(true);
+      if (prefetched === undefined) setLoading(true);
       const data = await getChatSessionWithMessages(params.sessionId);
       setSession(data);
+      storeSession(params.sessionId, data);
+      if (data && hasArchivedMessages(data)) {
+        setLoading(false);
+        await restoreArchivedMessages();
+      }
     } catch (err: any) {
       setError(err.message || "Failed to load chat session");
     } finally {
@@ -40,6 +59,72 @@ export default function ChatSessionPage({ params }: ChatSessionPageProps) {
     }
   };
 
+  // Shows the recent messages at once and the whole session once its
+  // archived months are back.
+  const restoreArchivedMessages = async () => {
+    setRestoring(true);
+    try {
+      const response = await fetch(
+        `/api/sessions/${params.sessionId}/rehydrate`,
+        { method: "POST" }
+      );
+      if (!response.ok) throw new Error("Failed to restore older messages");
+      const data = await getChatSessionWithMessages(params.sessionId);
+      setSession(data);
+      storeSession(params.sessionId, data);
+    } finally {
+      setRestoring(false);
+    }
+  };
+
+  // Long messages arrive as a preview; each one's full text is fetched when
+  // it comes near the viewport, one query for all that do so together.
+  const loadBodies = useCallback(async (messageIds: string[]) => {
+    try {
+      const loaded = await getMessageBodies(messageIds);
+      setBodies((prev) => ({ ...prev, ...loaded }));
+    } catch (err) {
+      // Let them be requested again the next time they come into view
+      messageIds.forEach((id) => requestedBodies.current.delete(id));
+      console.error("Failed to load messages:", err);
+    }
+  }, []);
+
+  // Stable, so messages are not unobserved and observed again on every
+  // render (each loaded body causes one).
+  const observeMessage = useCallback(
+    (element: HTMLDivElement | null) => {
+      if (!element || typeof IntersectionObserver === "undefined") return;
+      bodyObserver.current ??= new IntersectionObserver(
+        (entries) => {
+          const messageIds: string[] = [];
+          entries.forEach(({ target, isIntersecting }) => {
+            const { messageId } = (target as HTMLElement).dataset;
+            if (!isIntersecting || !messageId) return;
+            bodyObserver.current?.unobserve(target);
+            if (requestedBodies.current.has(messageId)) return;
+            requestedBodies.current.add(messageId);
+            messageIds.push(messageId);
+          });
+          if (messageIds.length > 0) loadBodies(messageIds);
+        },
+        { rootMargin: "400px" }
+      );
+      bodyObserver.current.observe(element);
+      return () => bodyObserver.current?.unobserve(element);
+    },
+    [loadBodies]
+  );
+
+  // Stops watching the messages once the page is left
+  useEffect(
+    () => () => {
+      bodyObserver.current?.disconnect();
+      bodyObserver.current = null;
+    },
+    []
+  );
+
   const formatDate = (dateString: string) => {
     return new Date(dateString).toLocaleString();
   };
@@ -154,6 +239,12 @@ export default function ChatSessionPage({ params }: ChatSessionPageProps) {
               <MessageSquare size={16} />
               <span>{session.messages.length} messages</span>
             </div>
+            {restoring && (
+              <div className="flex items-center gap-1">
+                <Archive size={16} />
+                <span>Restoring older messages...</span>
+              </div>
+            )}
           </div>
         </div>
 
@@ -165,10 +256,13 @@ export default function ChatSessionPage({ params }: ChatSessionPageProps) {
               !isUser && message.model_id
                 ? getModelById(message.model_id)
                 : null;
+            const content = message.content ?? bodies[message.id];
 
             return (
               <div
                 key={message.id}
+                ref={content === undefined ? observeMessage : undefined}
+                data-message-id={message.id}
                 className={`flex gap-4 ${
                   isUser ? "justify-end" : "justify-start"
                 }`}
@@ -191,7 +285,15 @@ export default function ChatSessionPage({ params }: ChatSessionPageProps) {
                         : "bg-gradient-to-r from-slate-800/50 to-slate-900/50 border border-purple-500/30 text-white"
                     }`}
                   >
-                    <div className="whitespace-pre-wrap">{message.content}</div>
+                    <div className="whitespace-pre-wrap">
+                      {content ?? message.preview}
+                    </div>
+                    {content === undefined && (
+                      <div className="mt-2 text-xs text-gray-400">
+                        Loading the rest ({message.content_length}{" "}
+                        characters)...
+                      </div>
+                    )}
                   </div>
 
                   <div
@@ -1,10 +1,10 @@
 "use client";
 
-import { useState, useEffect } from "react";
+import { useState, useEffect, useRef, useCallback } from "react";
 import { useAuth } from "@/contexts/AuthContext";
 import {
   getChatSessions,
-  deleteChatSession,
+  deleteChatSessions,
   ChatSession,
 } from "@/lib/database";
 import {
@@ -13,14 +13,26 @@ import {
   Calendar,
   Clock,
   ArrowLeft,
+  Download,
+  Upload,
 } from "lucide-react";
 import Link from "next/link";
+import { useRouter } from "next/navigation";
+import {
+  cancelPrefetch,
+  forgetSession,
+  prefetchSession,
+} from "@/lib/session-prefetch";
 
 export default function HistoryPage() {
   const { user, loading: authLoading } = useAuth();
   const [sessions, setSessions] = useState<ChatSession[]>([]);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState("");
+  const [selected, setSelected] = useState<Set<string>>(new Set());
+  const [importing, setImporting] = useState(false);
+  const router = useRouter();
+  const cardObserver = useRef<IntersectionObserver | null>(null);
 
   useEffect(() => {
     if (user && !authLoading) {
@@ -40,19 +52,101 @@ export default function HistoryPage() {
     }
   };
 
-  const handleDeleteSession = async (sessionId: string) => {
-    if (!confirm("Are you sure you want to delete this chat session?")) {
+  // Deleting only marks the sessions, so they are taken off the list right
+  // away and put back if that fails.
+  const handleDeleteSessions = async (sessionIds: string[]) => {
+    const question =
+      sessionIds.length === 1
+        ? "Are you sure you want to delete this chat session?"
+        : `Are you sure you want to delete these ${sessionIds.length} chat sessions?`;
+    if (!confirm(question)) {
       return;
     }
 
+    const previous = sessions;
+    setSessions(sessions.filter((session) => !sessionIds.includes(session.id)));
+    setSelected(new Set());
+    sessionIds.forEach(forgetSession);
     try {
-      await deleteChatSession(sessionId);
-      setSessions(sessions.filter((session) => session.id !== sessionId));
+      await deleteChatSessions(sessionIds);
     } catch (err: any) {
+      setSessions(previous);
       setError(err.message || "Failed to delete session");
     }
   };
 
+  // The file is sent as the request body, so the browser streams it
+  // rather than reading it into memory.
+  const handleImport = async (file: File) => {
+    setImporting(true);
+    setError("");
+    try {
+      const response = await fetch("/api/history/import", {
+        method: "POST",
+        body: file,
+      });
+      const result = await response.json();
+      if (!response.ok) throw new Error(result.error);
+      await loadSessions();
+    } catch (err: any) {
+      setError(err.message || "Failed to import chat history");
+    } finally {
+      setImporting(false);
+    }
+  };
+
+  const toggleSelected = (sessionId: string) =>
+    setSelected((prev) => {
+      const next = new Set(prev);
+      if (!next.delete(sessionId)) next.add(sessionId);
+      return next;
+    });
+
+  const allSelected = sessions.length > 0 && selected.size === sessions.length;
+
+  // Fetches a session's route and first messages ahead of the click. The
+  // Links do not prefetch on their own, so these are all that run, and at
+  // most a few at a time.
+  const prefetch = useCallback(
+    (sessionId: string, urgent = false) =>
+      prefetchSession(sessionId, {
+        urgent,
+        alongside: () => router.prefetch(`/chat/${sessionId}`),
+      }),
+    [router]
+  );
+
+  // Prefetches the sessions scrolled into view (or about to be), and drops
+  // the queued ones scrolled past. Stable, so cards are not unobserved and
+  // observed again on every render.
+  const observeCard = useCallback(
+    (card: HTMLDivElement | null) => {
+      if (!card || typeof IntersectionObserver === "undefined") return;
+      cardObserver.current ??= new IntersectionObserver(
+        (entries) =>
+          entries.forEach(({ target, isIntersecting }) => {
+            const { sessionId } = (target as HTMLElement).dataset;
+            if (!sessionId) return;
+            if (isIntersecting) prefetch(sessionId);
+            else cancelPrefetch(sessionId);
+          }),
+        { rootMargin: "200px" }
+      );
+      cardObserver.current.observe(card);
+      return () => cardObserver.current?.unobserve(card);
+    },
+    [prefetch]
+  );
+
+  // Stops watching the cards once the page is left
+  useEffect(
+    () => () => {
+      cardObserver.current?.disconnect();
+      cardObserver.current = null;
+    },
+    []
+  );
+
   const formatDate = (dateString: string) => {
     const date = new Date(dateString);
     const now = new Date();
@@ -139,11 +233,37 @@ export default function HistoryPage() {
 
       {/* Main Content */}
       <div className="max-w-7xl mx-auto p-6">
-        <div className="mb-6">
-          <h2 className="text-3xl font-bold text-white mb-2">Chat History</h2>
-          <p className="text-gray-400">
-            Your previous conversations with AI models
-          </p>
+        <div className="mb-6 flex items-end justify-between gap-4">
+          <div>
+            <h2 className="text-3xl font-bold text-white mb-2">Chat History</h2>
+            <p className="text-gray-400">
+              Your previous conversations with AI models
+            </p>
+          </div>
+          <div className="flex items-center gap-2">
+            <a
+              href="/api/history/export"
+              className="flex items-center gap-2 px-3 py-1 text-sm bg-purple-500/20 border border-purple-500/30 rounded-lg text-purple-300 hover:text-white hover:bg-purple-500/30 transition-all duration-200"
+            >
+              <Download size={14} />
+              Export
+            </a>
+            <label className="flex items-center gap-2 px-3 py-1 text-sm bg-purple-500/20 border border-purple-500/30 rounded-lg text-purple-300 hover:text-white hover:bg-purple-500/30 transition-all duration-200 cursor-pointer">
+              <Upload size={14} />
+              {importing ? "Importing..." : "Import"}
+              <input
+                type="file"
+                accept=".gz,.ndjson,.jsonl"
+                disabled={importing}
+                onChange={(event) => {
+                  const file = event.target.files?.[0];
+                  event.target.value = "";
+                  if (file) handleImport(file);
+                }}
+                className="hidden"
+              />
+            </label>
+          </div>
         </div>
 
         {error && (
@@ -152,6 +272,35 @@ export default function HistoryPage() {
           </div>
         )}
 
+        {sessions.length > 0 && (
+          <div className="mb-4 flex items-center gap-4">
+            <label className="flex items-center gap-2 text-sm text-gray-400">
+              <input
+                type="checkbox"
+                checked={allSelected}
+                onChange={() =>
+                  setSelected(
+                    allSelected
+                      ? new Set()
+                      : new Set(sessions.map((session) => session.id))
+                  )
+                }
+                className="accent-purple-500"
+              />
+              Select all
+            </label>
+            {selected.size > 0 && (
+              <button
+                onClick={() => handleDeleteSessions(Array.from(selected))}
+                className="flex items-center gap-2 px-3 py-1 text-sm bg-red-500/20 border border-red-500/30 rounded-lg text-red-300 hover:text-white hover:bg-red-500/30 transition-all duration-200"
+              >
+                <Trash2 size={14} />
+                Delete selected ({selected.size})
+              </button>
+            )}
+          </div>
+        )}
+
         {sessions.length === 0 ? (
           <div className="text-center py-12">
             <MessageSquare className="w-16 h-16 text-gray-600 mx-auto mb-4" />
@@ -173,9 +322,18 @@ export default function HistoryPage() {
             {sessions.map((session) => (
               <div
                 key={session.id}
+                ref={observeCard}
+                data-session-id={session.id}
                 className="bg-gradient-to-br from-slate-800/50 to-slate-900/50 backdrop-blur-sm border border-purple-500/30 rounded-xl p-6 hover:border-purple-400/50 transition-all duration-200 group"
               >
                 <div className="flex items-start justify-between mb-4">
+                  <input
+                    type="checkbox"
+                    checked={selected.has(session.id)}
+                    onChange={() => toggleSelected(session.id)}
+                    aria-label={`Select ${session.title}`}
+                    className="mt-1.5 mr-3 accent-purple-500"
+                  />
                   <div className="flex-1">
                     <h3 className="text-lg font-semibold text-white mb-2 line-clamp-2">
                       {session.title}
@@ -188,7 +346,7 @@ export default function HistoryPage() {
                     </div>
                   </div>
                   <button
-                    onClick={() => handleDeleteSession(session.id)}
+                    onClick={() => handleDeleteSessions([session.id])}
                     className="opacity-0 group-hover:opacity-100 p-2 text-gray-400 hover:text-red-400 hover:bg-red-500/20 rounded-lg transition-all duration-200"
                   >
                     <Trash2 size={16} />
@@ -197,6 +355,9 @@ export default function HistoryPage() {
 
                 <Link
                   href={`/chat/${session.id}`}
+                  prefetch={false}
+                  onMouseEnter={() => prefetch(session.id, true)}
+                  onFocus={() => prefetch(session.id, true)}
                   className="block w-full py-2 px-4 bg-gradient-to-r from-purple-500/20 to-blue-500/20 border border-purple-500/30 rounded-lg text-purple-300 hover:text-white hover:bg-purple-500/30 transition-all duration-200 text-center text-sm font-medium"
                 >
                   View Chat
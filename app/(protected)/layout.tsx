@@ -1,15 +1,22 @@
+import { headers } from "next/headers";
 import { redirect } from "next/navigation";
-import { createClient } from "@/utils/supabase/server";
+import { AuthProvider } from "@/contexts/AuthContext";
+import { getServerUser } from "@/utils/supabase/server";
+import { withSpan, withTrace } from "@/lib/telemetry";
 
 export default async function ProtectedLayout({
   children,
 }: {
   children: React.ReactNode;
 }) {
-  const supabase = await createClient();
-  const { data, error } = await supabase.auth.getUser();
-  if (error || !data?.user) {
+  // The middleware has already verified the session for this request.
+  const user = await withTrace("ProtectedLayout", await headers(), () =>
+    withSpan("auth.user", getServerUser)
+  );
+  if (!user) {
     redirect("/login");
   }
-  return <>{children}</>;
+  // Seeds the client's auth state so the first render already knows the
+  // user instead of showing a loading state until the session is read.
+  return <AuthProvider initialUser={user}>{children}</AuthProvider>;
 }
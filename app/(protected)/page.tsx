@@ -1,7 +1,13 @@
 "use client";
 
-import { useState, useEffect } from "react";
-import { AIResponse, ChatMessage } from "@/types/ai";
+import { useState, useEffect, useRef } from "react";
+import {
+  AIResponse,
+  ChatJob,
+  ChatMessage,
+  ChatStreamEvent,
+  ChatTurn,
+} from "@/types/ai";
 import { getModelById } from "@/lib/ai-models";
 import ModelSelector from "@/components/ModelSelector";
 import MessageInput from "@/components/MessageInput";
@@ -13,8 +19,89 @@ import {
   addMultipleMessages,
   getMessages,
 } from "@/lib/database";
+import { watchChatJobs } from "@/lib/chat-jobs";
+import { readNdjson } from "@/lib/ndjson";
+import {
+  OutboxEntry,
+  addToOutbox,
+  countOutbox,
+  isDelivered,
+  outboxRequest,
+  returnToOutbox,
+  takeFromOutbox,
+} from "@/lib/outbox";
+import { SendTiming, startSend } from "@/lib/rum";
 import Link from "next/link";
 
+interface SavedMessage {
+  id?: string;
+  content: string;
+  isUser: boolean;
+  modelId?: string;
+}
+
+// The send whose responses are on screen.
+interface ActiveSend {
+  id: string;
+  controller: AbortController;
+  // Absent for a send picked up again after a reload
+  timing?: SendTiming;
+  // Models still generating, and the text each has streamed so far
+  pending: Set<string>;
+  partial: Record<string, string>;
+  toSave: SavedMessage[];
+  // Run by the job workers (queue mode) rather than streamed back
+  queued?: boolean;
+}
+
+// A failure reported by the server, as opposed to a broken connection;
+// only the latter is worth resuming.
+class SendError extends Error {}
+
+// A broken stream is resumed this many times, backing off linearly.
+const RESUME_ATTEMPTS = 5;
+const RESUME_BACKOFF_MS = 1000;
+
+// The send in progress, kept so it can be resumed after a reload.
+const PENDING_SEND_KEY = "pendingSend";
+
+interface PendingSend {
+  sendId: string;
+  sessionId: string;
+  modelIds: string[];
+  queued?: boolean;
+  // Delivered from the outbox: the server saves its messages
+  persisted?: boolean;
+}
+
+const stoppedResponse = (modelId: string, content: string): AIResponse => ({
+  id: crypto.randomUUID(),
+  modelId,
+  content,
+  timestamp: new Date(),
+  isLoading: false,
+  cancelled: true,
+});
+
+// What each column shows until a send's answers start arriving.
+const placeholderResponses = (
+  modelIds: string[],
+  queued = false
+): Record<string, AIResponse> =>
+  Object.fromEntries(
+    modelIds.map((modelId) => [
+      modelId,
+      {
+        id: crypto.randomUUID(),
+        modelId,
+        content: "",
+        timestamp: new Date(),
+        isLoading: !queued,
+        ...(queued && { queued }),
+      },
+    ])
+  );
+
 export default function Home() {
   const { user, signOut } = useAuth();
   const [selectedModels, setSelectedModels] = useState<string[]>([
@@ -31,6 +118,14 @@ export default function Home() {
   const [currentSessionId, setCurrentSessionId] = useState<string | null>(null);
   const [showAuthModal, setShowAuthModal] = useState(false);
   const [authMode, setAuthMode] = useState<"signin" | "signup">("signin");
+  // Settles when the current session's row has been written (or failed to
+  // be), so messages sent in quick succession are not saved ahead of it.
+  const sessionSaved = useRef<Promise<boolean>>(Promise.resolve(true));
+  const activeSend = useRef<ActiveSend | null>(null);
+  // Sends waiting in the offline outbox; new messages queue up behind them
+  // so they go out in order.
+  const outboxSize = useRef(0);
+  const delivering = useRef(false);
 
   // Load existing session on mount if present
   useEffect(() => {
@@ -43,53 +138,8 @@ export default function Home() {
 
       try {
         setCurrentSessionId(savedId);
-        const messages = await getMessages(savedId);
-
-        // Reconstruct chatHistory per selected model
-        const initialHistory: Record<string, ChatMessage[]> = {};
-        selectedModels.forEach((m) => {
-          initialHistory[m] = [];
-        });
-
-        messages.forEach((msg) => {
-          if (msg.is_user) {
-            const userMsg: ChatMessage = {
-              id: msg.id,
-              content: msg.content,
-              timestamp: new Date(msg.timestamp),
-              isUser: true,
-            };
-            selectedModels.forEach((modelId) => {
-              initialHistory[modelId] = [
-                ...(initialHistory[modelId] || []),
-                userMsg,
-              ];
-            });
-          } else if (msg.model_id) {
-            const aiMsg: ChatMessage = {
-              id: msg.id,
-              content: msg.content,
-              timestamp: new Date(msg.timestamp),
-              isUser: false,
-              modelId: msg.model_id,
-            };
-            // Only place AI message under its model id if it's currently selected
-            if (selectedModels.includes(msg.model_id)) {
-              initialHistory[msg.model_id] = [
-                ...(initialHistory[msg.model_id] || []),
-                aiMsg,
-              ];
-            } else {
-              // If the model isn't currently selected, ensure key exists but don't render since not selected
-              initialHistory[msg.model_id] = [
-                ...(initialHistory[msg.model_id] || []),
-                aiMsg,
-              ];
-            }
-          }
-        });
-
-        setChatHistory(initialHistory);
+        await loadHistory(savedId);
+        resumePendingSend(savedId);
       } catch (e) {
         console.error("Failed to load existing session messages", e);
       }
@@ -99,8 +149,89 @@ export default function Home() {
     // eslint-disable-next-line react-hooks/exhaustive-deps
   }, [user]);
 
+  // Delivers sends queued while offline once the connection is back, and
+  // shows the answers to sends the service worker delivered instead.
+  useEffect(() => {
+    if (!user) return;
+    refreshOutboxSize().then((size) => {
+      if (size > 0 && navigator.onLine) deliverOutbox();
+    });
+
+    const handleOnline = () => deliverOutbox();
+    const handleWorkerMessage = (event: MessageEvent) => {
+      if (event.data?.type !== "outbox-delivered") return;
+      refreshOutboxSize();
+      if (event.data.sessionId === localStorage.getItem("currentSessionId")) {
+        showDeliveredSend(event.data.sessionId);
+      }
+    };
+    window.addEventListener("online", handleOnline);
+    navigator.serviceWorker?.addEventListener("message", handleWorkerMessage);
+    return () => {
+      window.removeEventListener("online", handleOnline);
+      navigator.serviceWorker?.removeEventListener(
+        "message",
+        handleWorkerMessage
+      );
+    };
+    // eslint-disable-next-line react-hooks/exhaustive-deps
+  }, [user]);
+
+  // Rebuilds the columns' conversations from a session's saved messages.
+  const loadHistory = async (sessionId: string) => {
+    const messages = await getMessages(sessionId);
+
+    // Reconstruct chatHistory per selected model
+    const initialHistory: Record<string, ChatMessage[]> = {};
+    selectedModels.forEach((m) => {
+      initialHistory[m] = [];
+    });
+
+    messages.forEach((msg) => {
+      if (msg.is_user) {
+        const userMsg: ChatMessage = {
+          id: msg.id,
+          content: msg.content,
+          timestamp: new Date(msg.timestamp),
+          isUser: true,
+        };
+        selectedModels.forEach((modelId) => {
+          initialHistory[modelId] = [
+            ...(initialHistory[modelId] || []),
+            userMsg,
+          ];
+        });
+      } else if (msg.model_id) {
+        const aiMsg: ChatMessage = {
+          id: msg.id,
+          content: msg.content,
+          timestamp: new Date(msg.timestamp),
+          isUser: false,
+          modelId: msg.model_id,
+        };
+        // Only place AI message under its model id if it's currently selected
+        if (selectedModels.includes(msg.model_id)) {
+          initialHistory[msg.model_id] = [
+            ...(initialHistory[msg.model_id] || []),
+            aiMsg,
+          ];
+        } else {
+          // If the model isn't currently selected, ensure key exists but don't render since not selected
+          initialHistory[msg.model_id] = [
+            ...(initialHistory[msg.model_id] || []),
+            aiMsg,
+          ];
+        }
+      }
+    });
+
+    setChatHistory(initialHistory);
+  };
+
   const handleNewChat = () => {
+    stopActiveSend();
     setCurrentSessionId(null);
+    sessionSaved.current = Promise.resolve(true);
     setChatHistory({});
     setResponses({});
     if (typeof window !== "undefined") {
@@ -108,42 +239,430 @@ export default function Home() {
     }
   };
 
-  const handleSendMessage = async (message: string) => {
-    if (selectedModels.length === 0) {
-      alert("Please select at least one AI model");
-      return;
+  // Drops an optimistic session that could not be saved, so the next send
+  // starts a fresh one instead of writing into a session that is not there.
+  const rollbackSession = (sessionId: string) => {
+    setCurrentSessionId((current) => (current === sessionId ? null : current));
+    if (
+      typeof window !== "undefined" &&
+      localStorage.getItem("currentSessionId") === sessionId
+    ) {
+      localStorage.removeItem("currentSessionId");
+    }
+  };
+
+  const readPendingSend = (): PendingSend | null => {
+    const saved = sessionStorage.getItem(PENDING_SEND_KEY);
+    return saved ? JSON.parse(saved) : null;
+  };
+
+  const rememberPendingSend = (pending: PendingSend) =>
+    sessionStorage.setItem(PENDING_SEND_KEY, JSON.stringify(pending));
+
+  const forgetPendingSend = (sendId: string) => {
+    if (readPendingSend()?.sendId === sendId) {
+      sessionStorage.removeItem(PENDING_SEND_KEY);
     }
+  };
 
-    // Check if user is authenticated
-    if (!user) {
-      setShowAuthModal(true);
-      return;
+  // Saves the message once its session is saved. Resolves to whether it
+  // was; never rejects.
+  const saveUserMessage = async (
+    sessionId: string,
+    isNewSession: boolean,
+    userMessage: ChatMessage
+  ): Promise<boolean> => {
+    if (isNewSession) {
+      const { content } = userMessage;
+      sessionSaved.current = createChatSession(
+        content.slice(0, 50) + (content.length > 50 ? "..." : ""),
+        sessionId
+      ).then(
+        () => true,
+        (error) => {
+          console.error("Failed to create chat session:", error);
+          rollbackSession(sessionId);
+          return false;
+        }
+      );
+    }
+    if (!(await sessionSaved.current)) return false;
+
+    try {
+      await addMultipleMessages(sessionId, [
+        { id: userMessage.id, content: userMessage.content, isUser: true },
+      ]);
+      return true;
+    } catch (error) {
+      console.error("Failed to save user message:", error);
+      return false;
+    }
+  };
+
+  // Records a model's final response for a send; later events for that
+  // model (after a local stop) are ignored.
+  const finishModel = (send: ActiveSend, response: AIResponse) => {
+    if (!send.pending.delete(response.modelId)) return;
+    if (response.cancelled) {
+      send.timing?.cancelled(response.modelId);
+    } else {
+      send.timing?.complete(response.modelId, Boolean(response.error));
+    }
+    setResponses((prev) => ({ ...prev, [response.modelId]: response }));
+
+    // A model stopped before it wrote anything leaves no message behind.
+    if (response.cancelled && !response.content) return;
+
+    // Add AI response to chat history
+    const aiMessage: ChatMessage = {
+      id: response.id,
+      content: response.content,
+      timestamp: response.timestamp,
+      isUser: false,
+      modelId: response.modelId,
+    };
+
+    setChatHistory((prev) => ({
+      ...prev,
+      [response.modelId]: [...(prev[response.modelId] || []), aiMessage],
+    }));
+
+    // Saved under the same id as its usage row
+    send.toSave.push({
+      id: response.id,
+      content: response.content,
+      isUser: false,
+      modelId: response.modelId,
+    });
+  };
+
+  // Resolves to the models the server stopped.
+  const cancelOnServer = async (sendId: string, modelIds?: string[]) => {
+    const response = await fetch("/api/chat/cancel", {
+      method: "POST",
+      headers: { "Content-Type": "application/json" },
+      body: JSON.stringify({ sendId, modelIds }),
+      keepalive: true,
+    });
+    const { cancelled } = await response.json();
+    return Array.isArray(cancelled) ? (cancelled as string[]) : [];
+  };
+
+  // Ends a send on this side: each unfinished model keeps what it had
+  // streamed. The caller tells the server, unless the next send does.
+  const abandonSend = (send: ActiveSend) => {
+    if (activeSend.current === send) {
+      activeSend.current = null;
+      setIsLoading(false);
+    }
+    send.controller.abort();
+    Array.from(send.pending).forEach((modelId) =>
+      finishModel(send, stoppedResponse(modelId, send.partial[modelId] ?? ""))
+    );
+  };
+
+  const stopActiveSend = () => {
+    const send = activeSend.current;
+    if (!send) return;
+    abandonSend(send);
+    cancelOnServer(send.id).catch((error) =>
+      console.error("Failed to cancel generation:", error)
+    );
+  };
+
+  // Stops one model and lets the others carry on. The server answers with
+  // the model's partial text as a cancelled `done` event; if this instance
+  // no longer knows the send, the partial text is kept locally instead.
+  const handleStopModel = async (modelId: string) => {
+    const send = activeSend.current;
+    if (!send || !send.pending.has(modelId)) return;
+    try {
+      if ((await cancelOnServer(send.id, [modelId])).includes(modelId)) return;
+    } catch (error) {
+      console.error("Failed to cancel generation:", error);
+    }
+    finishModel(send, stoppedResponse(modelId, send.partial[modelId] ?? ""));
+  };
+
+  const resumeRequest = (send: ActiveSend) =>
+    fetch("/api/chat/resume", {
+      method: "POST",
+      headers: { "Content-Type": "application/json" },
+      body: JSON.stringify({
+        sendId: send.id,
+        offsets: Object.fromEntries(
+          Array.from(send.pending, (modelId) => [
+            modelId,
+            send.partial[modelId]?.length ?? 0,
+          ])
+        ),
+      }),
+      signal: send.controller.signal,
+    });
+
+  // Text is shown as it streams in; each model's final response replaces
+  // it when the model is done.
+  const applyDelta = (send: ActiveSend, modelId: string, text: string) => {
+    if (!send.pending.has(modelId)) return;
+    send.partial[modelId] = (send.partial[modelId] ?? "") + text;
+    send.timing?.firstContent(modelId);
+    setResponses((prev) => ({
+      ...prev,
+      [modelId]: {
+        ...prev[modelId],
+        content: (prev[modelId]?.content ?? "") + text,
+      },
+    }));
+  };
+
+  const applyJob = (send: ActiveSend, job: ChatJob) => {
+    const known = send.partial[job.model_id] ?? "";
+    if (job.content.length > known.length && job.content.startsWith(known)) {
+      applyDelta(send, job.model_id, job.content.slice(known.length));
+    }
+    if (job.status === "queued" || job.status === "running") return;
+    finishModel(
+      send,
+      job.response ??
+        (job.status === "cancelled"
+          ? stoppedResponse(job.model_id, job.content)
+          : {
+              id: crypto.randomUUID(),
+              modelId: job.model_id,
+              content: "",
+              timestamp: new Date(),
+              isLoading: false,
+              error: "Failed to get response",
+            })
+    );
+  };
+
+  // Applies a send's stream to the columns.
+  const consume = async (send: ActiveSend, response: Response) => {
+    if (!response.ok) {
+      const { error } = await response.json().catch(() => ({}));
+      throw new SendError(error || "Failed to get response");
+    }
+    // Queue mode: the answers arrive through the job rows instead.
+    if (response.status === 202) {
+      send.queued = true;
+      const pending = readPendingSend();
+      if (pending?.sendId === send.id) {
+        rememberPendingSend({ ...pending, queued: true });
+      }
+      return followJobs(send);
+    }
+
+    for await (const event of readNdjson<ChatStreamEvent>(response)) {
+      if (event.type === "error") throw new SendError(event.error);
+      if (event.type === "delta") applyDelta(send, event.modelId, event.text);
+      if (event.type === "done") finishModel(send, event.response);
+    }
+    if (send.pending.size > 0) throw new Error("Response stream ended early");
+  };
+
+  const followJobs = (send: ActiveSend) =>
+    watchChatJobs(
+      send.id,
+      Array.from(send.pending),
+      (job) => applyJob(send, job),
+      send.controller.signal
+    );
+
+  // Follows a send to the end, then saves its answers. A broken stream is
+  // picked up again where it stopped; the models are not called twice.
+  // Without a `request`, the send is resumed from the start.
+  const runSend = async (
+    send: ActiveSend,
+    sessionId: string,
+    request: Promise<Response> | undefined,
+    userMessageSaved: Promise<boolean>
+  ) => {
+    try {
+      for (let attempt = 1; ; attempt++) {
+        try {
+          if (send.queued) {
+            await followJobs(send);
+          } else {
+            await consume(send, await (request ?? resumeRequest(send)));
+          }
+          break;
+        } catch (error) {
+          if (
+            error instanceof SendError ||
+            send.controller.signal.aborted ||
+            attempt > RESUME_ATTEMPTS
+          ) {
+            throw error;
+          }
+          await new Promise((resolve) =>
+            setTimeout(resolve, RESUME_BACKOFF_MS * attempt)
+          );
+          if (send.controller.signal.aborted) throw error;
+          request = resumeRequest(send);
+        }
+      }
+    } catch (error) {
+      // Stopped or superseded: already wrapped up by abandonSend.
+      if (send.controller.signal.aborted) return;
+
+      console.error("Error:", error);
+      // Set error responses for the models that had not finished
+      const failed = Array.from(send.pending);
+      failed.forEach((modelId) => send.timing?.complete(modelId, true));
+      send.pending.clear();
+      setResponses((prev) => {
+        const errorResponses = { ...prev };
+        failed.forEach((modelId) => {
+          errorResponses[modelId] = {
+            id: crypto.randomUUID(),
+            modelId,
+            content: "",
+            timestamp: new Date(),
+            isLoading: false,
+            error:
+              error instanceof Error ? error.message : "Failed to get response",
+          };
+        });
+        return errorResponses;
+      });
+    } finally {
+      // Any model that never reported back counts as failed.
+      send.pending.forEach((modelId) => send.timing?.complete(modelId, true));
+      if (activeSend.current === send) {
+        activeSend.current = null;
+        setIsLoading(false);
+      }
+
+      // Save AI responses to database, once their session and prompt are
+      if (send.toSave.length > 0 && (await userMessageSaved)) {
+        try {
+          await addMultipleMessages(sessionId, send.toSave);
+        } catch (error) {
+          console.error("Failed to save AI messages:", error);
+        }
+      }
+      // Until now a reload resumes the send to collect its answers.
+      forgetPendingSend(send.id);
     }
+  };
 
+  // Picks up a send that was still streaming when the page was reloaded.
+  const resumePendingSend = (sessionId: string) => {
+    const pending = readPendingSend();
+    if (!pending || pending.sessionId !== sessionId) return;
+
+    const send: ActiveSend = {
+      id: pending.sendId,
+      controller: new AbortController(),
+      pending: new Set(pending.modelIds),
+      partial: {},
+      toSave: [],
+      queued: pending.queued,
+    };
+    activeSend.current = send;
     setIsLoading(true);
+    setResponses(placeholderResponses(pending.modelIds));
+    // The prompt was saved before the reload, or it is lost either way.
+    runSend(send, sessionId, undefined, Promise.resolve(!pending.persisted));
+  };
 
-    // Create a new chat session if this is the first message
-    let sessionId = currentSessionId;
-    if (!sessionId) {
-      try {
-        const session = await createChatSession(
-          message.slice(0, 50) + (message.length > 50 ? "..." : "")
+  const refreshOutboxSize = async () => {
+    try {
+      outboxSize.current = await countOutbox();
+    } catch (error) {
+      console.error("Failed to read the outbox:", error);
+    }
+    return outboxSize.current;
+  };
+
+  // Shows the answers to a send delivered from the outbox by someone else
+  // (the service worker, or an earlier delivery).
+  const showDeliveredSend = (sessionId: string) => {
+    if (activeSend.current) return;
+    setResponses({});
+    loadHistory(sessionId).catch((error) =>
+      console.error("Failed to load session messages:", error)
+    );
+  };
+
+  // Sends the messages queued while offline, oldest first, stopping at the
+  // first that cannot go out yet. A send for the session on screen streams
+  // into the columns like any other; the server saves its messages either
+  // way, and finishes it even if nobody is reading.
+  const deliverOutbox = async () => {
+    if (delivering.current) return;
+    delivering.current = true;
+    try {
+      for (;;) {
+        const entry = await takeFromOutbox();
+        if (!entry) break;
+
+        const response = await fetch("/api/chat", outboxRequest(entry)).catch(
+          () => undefined
         );
-        sessionId = session.id;
-        setCurrentSessionId(sessionId);
-        if (typeof window !== "undefined") {
-          localStorage.setItem("currentSessionId", sessionId);
+        if (!response || !isDelivered(response)) {
+          await returnToOutbox(entry);
+          break;
+        }
+        await refreshOutboxSize();
+
+        const onScreen =
+          entry.sessionId === localStorage.getItem("currentSessionId");
+        if (!response.ok || !onScreen || activeSend.current) {
+          response.body?.cancel();
+          if (onScreen) showDeliveredSend(entry.sessionId);
+          continue;
         }
-      } catch (error) {
-        console.error("Failed to create chat session:", error);
-        // Continue without saving to database
+
+        const send: ActiveSend = {
+          id: entry.sendId,
+          controller: new AbortController(),
+          pending: new Set(entry.modelIds),
+          partial: {},
+          toSave: [],
+        };
+        activeSend.current = send;
+        setIsLoading(true);
+        setResponses(placeholderResponses(entry.modelIds));
+        rememberPendingSend({
+          sendId: send.id,
+          sessionId: entry.sessionId,
+          modelIds: entry.modelIds,
+          persisted: true,
+        });
+        await runSend(
+          send,
+          entry.sessionId,
+          Promise.resolve(response),
+          Promise.resolve(false)
+        );
+      }
+    } catch (error) {
+      console.error("Failed to deliver queued messages:", error);
+    } finally {
+      delivering.current = false;
+    }
+  };
+
+  // The session a new message goes into, started here if there is none.
+  const sessionForSend = () => {
+    const isNewSession = !currentSessionId;
+    const sessionId = currentSessionId ?? crypto.randomUUID();
+    if (isNewSession) {
+      setCurrentSessionId(sessionId);
+      if (typeof window !== "undefined") {
+        localStorage.setItem("currentSessionId", sessionId);
       }
     }
+    return { sessionId, isNewSession };
+  };
 
-    // Add user message to chat history for all selected models
+  // Adds the user's message to the chat history of every selected model.
+  const addUserMessage = (content: string): ChatMessage => {
     const userMessage: ChatMessage = {
       id: crypto.randomUUID(),
-      content: message,
+      content,
       timestamp: new Date(),
       isUser: true,
     };
@@ -155,108 +674,136 @@ export default function Home() {
       });
       return newHistory;
     });
+    return userMessage;
+  };
 
-    // Save user message to database
-    if (sessionId) {
-      try {
-        await addMultipleMessages(sessionId, [
-          { content: message, isUser: true },
-        ]);
-      } catch (error) {
-        console.error("Failed to save user message:", error);
-      }
-    }
-
-    // Initialize loading responses
-    const loadingResponses: Record<string, AIResponse> = {};
+  // Each model continues its own conversation (this render's history does
+  // not include the message being sent).
+  const historyByModel = () => {
+    const history: Record<string, ChatTurn[]> = {};
     selectedModels.forEach((modelId) => {
-      loadingResponses[modelId] = {
-        id: crypto.randomUUID(),
-        modelId,
-        content: "",
-        timestamp: new Date(),
-        isLoading: true,
-      };
+      history[modelId] = (chatHistory[modelId] || [])
+        .filter((entry) => entry.content)
+        .map((entry) => ({
+          role: entry.isUser ? "user" : "assistant",
+          content: entry.content,
+        }));
     });
-    setResponses(loadingResponses);
+    return history;
+  };
+
+  // Keeps a message written offline in the outbox until it can be sent.
+  // It goes out with the id shown here, and the server saves it (and starts
+  // its session) on delivery, so nothing is written from this side.
+  const queueSend = async (message: string) => {
+    const { sessionId } = sessionForSend();
+    const userMessage = addUserMessage(message);
+    const entry: OutboxEntry = {
+      sendId: crypto.randomUUID(),
+      sessionId,
+      messageId: userMessage.id,
+      message,
+      modelIds: selectedModels,
+      history: historyByModel(),
+      queuedAt: Date.now(),
+    };
 
     try {
-      const response = await fetch("/api/chat", {
-        method: "POST",
-        headers: {
-          "Content-Type": "application/json",
-        },
-        body: JSON.stringify({
-          message,
-          modelIds: selectedModels,
-        }),
-      });
+      await addToOutbox(entry);
+      outboxSize.current += 1;
+      setResponses(placeholderResponses(selectedModels, true));
+    } catch (error) {
+      console.error("Failed to queue message:", error);
+      setResponses(
+        Object.fromEntries(
+          selectedModels.map((modelId) => [
+            modelId,
+            {
+              id: crypto.randomUUID(),
+              modelId,
+              content: "",
+              timestamp: new Date(),
+              isLoading: false,
+              error: "You are offline and this message could not be saved",
+            },
+          ])
+        )
+      );
+      return;
+    }
+    // Online, but queued behind earlier messages that have not gone out.
+    if (navigator.onLine) deliverOutbox();
+  };
 
-      if (!response.ok) {
-        throw new Error("Failed to get responses");
-      }
+  const handleSendMessage = async (message: string) => {
+    if (selectedModels.length === 0) {
+      alert("Please select at least one AI model");
+      return;
+    }
 
-      const data = await response.json();
-      const newResponses: Record<string, AIResponse> = {};
-      const messagesToSave: Array<{
-        content: string;
-        isUser: boolean;
-        modelId?: string;
-      }> = [];
-
-      data.responses.forEach((response: AIResponse) => {
-        newResponses[response.modelId] = response;
-
-        // Add AI response to chat history
-        const aiMessage: ChatMessage = {
-          id: response.id,
-          content: response.content,
-          timestamp: response.timestamp,
-          isUser: false,
-          modelId: response.modelId,
-        };
+    // Check if user is authenticated
+    if (!user) {
+      setShowAuthModal(true);
+      return;
+    }
 
-        setChatHistory((prev) => ({
-          ...prev,
-          [response.modelId]: [...(prev[response.modelId] || []), aiMessage],
-        }));
+    // Offline, or behind messages still waiting to go out: queue it.
+    if (!navigator.onLine || outboxSize.current > 0) {
+      await queueSend(message);
+      return;
+    }
 
-        // Prepare message for database
-        messagesToSave.push({
-          content: response.content,
-          isUser: false,
-          modelId: response.modelId,
-        });
-      });
+    // Sending while answers are still streaming replaces that send.
+    const superseded = activeSend.current;
+    if (superseded) abandonSend(superseded);
 
-      setResponses(newResponses);
+    setIsLoading(true);
+    const timing = startSend(selectedModels);
+    const send: ActiveSend = {
+      id: crypto.randomUUID(),
+      controller: new AbortController(),
+      timing,
+      pending: new Set(selectedModels),
+      partial: {},
+      toSave: [],
+    };
+    activeSend.current = send;
+
+    // Ids are generated here so the model request can leave immediately;
+    // the session and user message are saved alongside it and rolled back
+    // if that fails.
+    const { sessionId, isNewSession } = sessionForSend();
+    const userMessage = addUserMessage(message);
+    setResponses(placeholderResponses(selectedModels));
+    const history = historyByModel();
+
+    const request = fetch("/api/chat", {
+      method: "POST",
+      headers: {
+        "Content-Type": "application/json",
+      },
+      body: JSON.stringify({
+        message,
+        modelIds: selectedModels,
+        history,
+        sendId: send.id,
+        supersedes: superseded?.id,
+      }),
+      signal: send.controller.signal,
+    });
+    timing.requestStarted();
+    const userMessageSaved = saveUserMessage(
+      sessionId,
+      isNewSession,
+      userMessage
+    );
+    rememberPendingSend({
+      sendId: send.id,
+      sessionId,
+      modelIds: selectedModels,
+    });
 
-      // Save AI responses to database
-      if (sessionId && messagesToSave.length > 0) {
-        try {
-          await addMultipleMessages(sessionId, messagesToSave);
-        } catch (error) {
-          console.error("Failed to save AI messages:", error);
-        }
-      }
-    } catch (error) {
-      console.error("Error:", error);
-      // Set error responses
-      const errorResponses: Record<string, AIResponse> = {};
-      selectedModels.forEach((modelId) => {
-        errorResponses[modelId] = {
-          id: crypto.randomUUID(),
-          modelId,
-          content: "",
-          timestamp: new Date(),
-          isLoading: false,
-          error: "Failed to get response",
-        };
-      });
-      setResponses(errorResponses);
-    } finally {
-      setIsLoading(false);
-    }
+    await runSend(send, sessionId, request, userMessageSaved);
   };
 
   return (
@@ -346,6 +893,7 @@ export default function Home() {
                     response={responses[modelId]}
                     isLoading={isLoading && responses[modelId]?.isLoading}
                     chatHistory={chatHistory[modelId] || []}
+                    onStop={() => handleStopModel(modelId)}
                   />
                 );
               })}
@@ -359,6 +907,7 @@ export default function Home() {
         <div className="max-w-4xl mx-auto">
           <MessageInput
             onSendMessage={handleSendMessage}
+            onStop={stopActiveSend}
             isLoading={isLoading}
             disabled={selectedModels.length === 0}
           />
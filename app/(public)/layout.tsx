@@ -0,0 +1,11 @@
+import { AuthProvider } from "@/contexts/AuthContext";
+
+// Sign-in and sign-up pages. They only need the auth actions, so the user
+// is not read from the request and the pages can be rendered statically.
+export default function PublicLayout({
+  children,
+}: {
+  children: React.ReactNode;
+}) {
+  return <AuthProvider>{children}</AuthProvider>;
+}
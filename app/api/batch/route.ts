@@ -0,0 +1,117 @@
+import { NextRequest, NextResponse } from "next/server";
+import { AIResponse } from "@/types/ai";
+import { getModelById } from "@/lib/ai-models";
+import { BatchItem, runBatch } from "@/lib/batch";
+import { checkQuota, persistUsage, recordUsage } from "@/lib/quota";
+import { USER_ID_HEADER } from "@/utils/supabase/middleware";
+import { createRouteClient } from "@/utils/supabase/server";
+
+// Batches are meant to be chunks of a larger prompt set (see
+// tools/batch_eval.py), small enough to finish well within maxDuration.
+const MAX_ITEMS = 100;
+const DEFAULT_CONCURRENCY = 4;
+const MAX_CONCURRENCY = 16;
+
+export const maxDuration = 300;
+
+const isBatchItem = (item: any): item is BatchItem =>
+  typeof item?.id === "string" &&
+  typeof item?.prompt === "string" &&
+  item.prompt.length > 0;
+
+// Streams one NDJSON line per (item, model) as soon as it completes:
+// {"itemId", "modelId", "content", "error"?, "usage"?}. Items not started
+// by the time the user's quota runs out are left out; the next request
+// gets a 429.
+export async function POST(request: NextRequest) {
+  const userId = request.headers.get(USER_ID_HEADER);
+  if (!userId) {
+    return NextResponse.json(
+      { error: "Authentication required" },
+      { status: 401 }
+    );
+  }
+
+  const { items, modelIds, concurrency } = await request
+    .json()
+    .catch(() => ({}));
+
+  if (
+    !Array.isArray(items) ||
+    items.length === 0 ||
+    items.length > MAX_ITEMS ||
+    !items.every(isBatchItem)
+  ) {
+    return NextResponse.json(
+      { error: `items must be 1-${MAX_ITEMS} {id, prompt} objects` },
+      { status: 400 }
+    );
+  }
+  if (
+    !Array.isArray(modelIds) ||
+    modelIds.length === 0 ||
+    !modelIds.every((id) => getModelById(id))
+  ) {
+    return NextResponse.json(
+      { error: "modelIds must be available model ids" },
+      { status: 400 }
+    );
+  }
+
+  const supabase = await createRouteClient(request);
+  const quota = await checkQuota(supabase, userId);
+  if (!quota.allowed) {
+    return NextResponse.json(
+      { error: "Daily usage quota exceeded" },
+      { status: 429 }
+    );
+  }
+
+  const encoder = new TextEncoder();
+  const completed: AIResponse[] = [];
+  const stream = new ReadableStream<Uint8Array>({
+    async start(controller) {
+      try {
+        await runBatch(items, modelIds, {
+          userId,
+          concurrency: Math.min(
+            Math.max(Number(concurrency) || DEFAULT_CONCURRENCY, 1),
+            MAX_CONCURRENCY
+          ),
+          signal: request.signal,
+          // Usage is counted as results arrive, so a batch stops starting
+          // items once it has used up the quota.
+          canContinue: async () =>
+            (await checkQuota(supabase, userId)).allowed,
+          onResult: (itemId, response) => {
+            completed.push(response);
+            recordUsage(userId, [response]);
+            const { modelId, content, error, usage } = response;
+            controller.enqueue(
+              encoder.encode(
+                JSON.stringify({ itemId, modelId, content, error, usage }) +
+                  "\n"
+              )
+            );
+          },
+        });
+      } catch (error) {
+        // Includes enqueueing after the client went away; the CLI resumes
+        // from what it has written.
+        console.error("Error running batch:", error);
+      } finally {
+        if (!request.signal.aborted) controller.close();
+        await persistUsage(supabase, userId, completed).catch((error) =>
+          console.error("Error recording usage:", error)
+        );
+      }
+    },
+  });
+
+  return new Response(stream, {
+    headers: {
+      "Content-Type": "application/x-ndjson",
+      "Cache-Control": "no-store",
+    },
+  });
+}
@@ -0,0 +1,7 @@
+import { handleCancel } from "@/lib/chat-handler";
+
+// Sends are registered in the instance that runs them, so this runs in the
+// same runtime as /api/chat (see app/api/chat/edge).
+export const runtime = "nodejs";
+
+export const POST = handleCancel;
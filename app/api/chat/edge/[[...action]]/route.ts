@@ -0,0 +1,23 @@
+import { NextResponse } from "next/server";
+import { handleCancel, handleChat, handleResume } from "@/lib/chat-handler";
+
+export const runtime = "edge";
+
+// /api/chat/edge, /api/chat/edge/resume and /api/chat/edge/cancel in one
+// route: sends are registered in the isolate that runs them (lib/
+// generations.ts), and each Edge route gets its own, so resuming or
+// cancelling has to reach the same one.
+export async function POST(
+  request: Request,
+  { params }: { params: Promise<{ action?: string[] }> }
+) {
+  const { action = [] } = await params;
+  if (action.length === 0) return handleChat(request);
+  if (action.length === 1 && action[0] === "resume") {
+    return handleResume(request);
+  }
+  if (action.length === 1 && action[0] === "cancel") {
+    return handleCancel(request);
+  }
+  return NextResponse.json({ error: "Not found" }, { status: 404 });
+}
@@ -0,0 +1,7 @@
+import { handleResume } from "@/lib/chat-handler";
+
+// Sends are registered in the instance that runs them, so this runs in the
+// same runtime as /api/chat (see app/api/chat/edge).
+export const runtime = "nodejs";
+
+export const POST = handleResume;
@@ -1,25 +1,7 @@
-import { NextRequest, NextResponse } from "next/server";
-import { generateMultipleResponses } from "@/lib/openrouter";
+import { handleChat } from "@/lib/chat-handler";
 
-export async function POST(request: NextRequest) {
-  try {
-    const { message, modelIds } = await request.json();
+// The same handler is served from the Edge runtime at /api/chat/edge;
+// building with CHAT_RUNTIME=edge routes /api/chat there (next.config.ts).
+export const runtime = "nodejs";
 
-    if (!message || !modelIds || !Array.isArray(modelIds)) {
-      return NextResponse.json(
-        { error: "Message and modelIds are required" },
-        { status: 400 }
-      );
-    }
-
-    const responses = await generateMultipleResponses(modelIds, message);
-
-    return NextResponse.json({ responses });
-  } catch (error) {
-    console.error("Error generating responses:", error);
-    return NextResponse.json(
-      { error: "Failed to generate responses" },
-      { status: 500 }
-    );
-  }
-}
+export const POST = handleChat;
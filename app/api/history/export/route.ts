@@ -0,0 +1,30 @@
+import { NextRequest, NextResponse } from "next/server";
+import { exportHistory } from "@/lib/history-transfer";
+import { USER_ID_HEADER } from "@/utils/supabase/middleware";
+import { createRouteClient } from "@/utils/supabase/server";
+
+// Archived messages are restored from the local filesystem
+export const runtime = "nodejs";
+export const maxDuration = 300;
+
+// GET /api/history/export: the user's sessions and messages as gzipped
+// NDJSON (see lib/history-transfer.ts), streamed as it is read.
+export async function GET(request: NextRequest) {
+  const userId = request.headers.get(USER_ID_HEADER);
+  if (!userId) {
+    return NextResponse.json(
+      { error: "Authentication required" },
+      { status: 401 }
+    );
+  }
+
+  const supabase = await createRouteClient(request);
+  const day = new Date().toISOString().slice(0, 10);
+  return new Response(exportHistory(supabase, userId), {
+    headers: {
+      "Content-Type": "application/gzip",
+      "Content-Disposition": `attachment; filename="polymind-history-${day}.ndjson.gz"`,
+      "Cache-Control": "no-store",
+    },
+  });
+}
@@ -0,0 +1,42 @@
+import { NextRequest, NextResponse } from "next/server";
+import { ImportError, importHistory } from "@/lib/history-transfer";
+import { USER_ID_HEADER } from "@/utils/supabase/middleware";
+import { createRouteClient } from "@/utils/supabase/server";
+
+export const runtime = "nodejs";
+export const maxDuration = 300;
+
+// POST /api/history/import with an export file (gzipped or plain NDJSON)
+// as the raw body. Responds `{ sessions, messages }` with the rows read;
+// ones already present are left as they are.
+export async function POST(request: NextRequest) {
+  const userId = request.headers.get(USER_ID_HEADER);
+  if (!userId) {
+    return NextResponse.json(
+      { error: "Authentication required" },
+      { status: 401 }
+    );
+  }
+  if (!request.body) {
+    return NextResponse.json(
+      { error: "An export file is required" },
+      { status: 400 }
+    );
+  }
+
+  const supabase = await createRouteClient(request);
+  try {
+    return NextResponse.json(
+      await importHistory(supabase, userId, request.body)
+    );
+  } catch (error) {
+    if (error instanceof ImportError) {
+      return NextResponse.json({ error: error.message }, { status: 400 });
+    }
+    console.error("Error importing chat history:", error);
+    return NextResponse.json(
+      { error: "Failed to import chat history" },
+      { status: 500 }
+    );
+  }
+}
@@ -0,0 +1,9 @@
+import { NextResponse } from "next/server";
+import { upstreamPoolStats } from "@/lib/upstream-fetch";
+
+export const dynamic = "force-dynamic";
+
+// Process-local counters for this server instance.
+export async function GET() {
+  return NextResponse.json({ upstream: upstreamPoolStats() });
+}
@@ -0,0 +1,42 @@
+import { NextResponse } from "next/server";
+import { AVAILABLE_MODELS } from "@/lib/ai-models";
+import { circuitStatus } from "@/lib/circuit-breaker";
+import { getModelStats } from "@/lib/model-stats";
+
+// Stats live in this server's memory, so the response is never cached.
+export const dynamic = "force-dynamic";
+
+// Models that have been failing most of the time sort last.
+const UNHEALTHY_ERROR_RATE = 0.5;
+
+// Lists the registry with each model's rolling stats and circuit state,
+// healthiest and fastest first; models without samples keep their
+// configured order.
+export async function GET() {
+  const models = AVAILABLE_MODELS.map((model, index) => ({
+    model,
+    index,
+    stats: getModelStats(model.id),
+    circuit: circuitStatus(model.id),
+  }));
+
+  models.sort((a, b) => {
+    const unhealthy = ({ stats, circuit }: typeof a) =>
+      circuit.state !== "closed" || stats.errorRate >= UNHEALTHY_ERROR_RATE
+        ? 1
+        : 0;
+    return (
+      unhealthy(a) - unhealthy(b) ||
+      (a.stats.p50LatencyMs ?? Infinity) - (b.stats.p50LatencyMs ?? Infinity) ||
+      a.index - b.index
+    );
+  });
+
+  return NextResponse.json({
+    models: models.map(({ model, stats, circuit }) => ({
+      ...model,
+      stats,
+      circuit,
+    })),
+  });
+}
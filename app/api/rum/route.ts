@@ -0,0 +1,94 @@
+import { NextRequest, NextResponse } from "next/server";
+import { createServiceClient } from "@/utils/supabase/server";
+import { getModelById } from "@/lib/ai-models";
+import { RUM_METRICS, RUM_ROUTES, RumSample, routeOf } from "@/lib/rum";
+
+// Upper bounds (ms) of the histogram buckets stored in rum_aggregates;
+// slower samples land in one extra overflow bucket.
+const BUCKETS = [
+  25, 50, 100, 200, 300, 500, 750, 1000, 1500, 2000, 3000, 5000, 7500, 10000,
+  15000, 20000, 30000, 60000,
+];
+const MAX_SAMPLES = 500;
+
+interface Aggregate {
+  route: string;
+  metric: string;
+  model_id: string;
+  count: number;
+  sum: number;
+  max: number;
+  histogram: number[];
+}
+
+const isValidSample = (sample: RumSample) =>
+  RUM_METRICS.has(sample?.metric) &&
+  typeof sample.route === "string" &&
+  typeof sample.value === "number" &&
+  Number.isFinite(sample.value) &&
+  sample.value >= 0;
+
+export async function POST(request: NextRequest) {
+  try {
+    const { samples } = await request.json();
+
+    if (!Array.isArray(samples)) {
+      return NextResponse.json(
+        { error: "samples must be an array" },
+        { status: 400 }
+      );
+    }
+
+    // Pre-aggregate the batch so it costs one RPC regardless of its size.
+    const aggregates = new Map<string, Aggregate>();
+    for (const sample of samples.slice(0, MAX_SAMPLES) as RumSample[]) {
+      if (!isValidSample(sample)) continue;
+      const route = RUM_ROUTES.has(routeOf(sample.route))
+        ? routeOf(sample.route)
+        : "other";
+      const modelId =
+        typeof sample.modelId === "string" && getModelById(sample.modelId)
+          ? sample.modelId
+          : "";
+      const key = [route, sample.metric, modelId].join("\u0000");
+
+      let aggregate = aggregates.get(key);
+      if (!aggregate) {
+        aggregate = {
+          route,
+          metric: sample.metric,
+          model_id: modelId,
+          count: 0,
+          sum: 0,
+          max: 0,
+          histogram: new Array(BUCKETS.length + 1).fill(0),
+        };
+        aggregates.set(key, aggregate);
+      }
+
+      aggregate.count += 1;
+      aggregate.sum += sample.value;
+      aggregate.max = Math.max(aggregate.max, sample.value);
+      const bucket = BUCKETS.findIndex((bound) => sample.value <= bound);
+      aggregate.histogram[bucket === -1 ? BUCKETS.length : bucket] += 1;
+    }
+
+    // Only the service role may record samples (migration 015): the checks
+    // above are the function's only guard.
+    if (aggregates.size > 0) {
+      const supabase = createServiceClient();
+      const { error } = await supabase.rpc("record_rum_samples", {
+        samples: Array.from(aggregates.values()),
+      });
+      if (error) throw error;
+    }
+
+    return new NextResponse(null, { status: 204 });
+  } catch (error) {
+    console.error("Error recording RUM samples:", error);
+    return NextResponse.json(
+      { error: "Failed to record samples" },
+      { status: 500 }
+    );
+  }
+}
@@ -0,0 +1,49 @@
+import { NextRequest, NextResponse } from "next/server";
+import { rehydrateSession } from "@/lib/message-archive";
+import { USER_ID_HEADER } from "@/utils/supabase/middleware";
+import { createRouteClient } from "@/utils/supabase/server";
+
+// Archives are read from the local filesystem
+export const runtime = "nodejs";
+
+// POST /api/sessions/:sessionId/rehydrate: brings the session's archived
+// messages back into the database, responding `{ restored }` with how many
+// were. Sessions without archived messages restore 0.
+export async function POST(
+  request: NextRequest,
+  { params }: { params: Promise<{ sessionId: string }> }
+) {
+  const userId = request.headers.get(USER_ID_HEADER);
+  if (!userId) {
+    return NextResponse.json(
+      { error: "Authentication required" },
+      { status: 401 }
+    );
+  }
+
+  const { sessionId } = await params;
+  const supabase = await createRouteClient(request);
+  const { data: session, error } = await supabase
+    .from("live_chat_sessions")
+    .select("id")
+    .eq("id", sessionId)
+    .eq("user_id", userId)
+    .maybeSingle();
+  if (error || !session) {
+    return NextResponse.json(
+      { error: "Chat session not found" },
+      { status: 404 }
+    );
+  }
+
+  try {
+    const restored = await rehydrateSession(sessionId);
+    return NextResponse.json({ restored });
+  } catch (error) {
+    console.error("Error rehydrating chat session:", error);
+    return NextResponse.json(
+      { error: "Failed to restore archived messages" },
+      { status: 500 }
+    );
+  }
+}
@@ -1,7 +1,8 @@
 import type { Metadata } from "next";
 import { Geist, Geist_Mono } from "next/font/google";
 import "./globals.css";
-import { AuthProvider } from "@/contexts/AuthContext";
+import RumReporter from "@/components/RumReporter";
+import ServiceWorker from "@/components/ServiceWorker";
 
 const geistSans = Geist({
   variable: "--font-geist-sans",
@@ -19,6 +20,8 @@ export const metadata: Metadata = {
     "Compare responses from multiple AI models simultaneously. Test GPT-4, Claude, Gemini, and DeepSeek side by side.",
 };
 
+// The auth context is provided by the (protected) and (public) layouts, so
+// only the pages that need the user read it from the request.
 export default function RootLayout({
   children,
 }: Readonly<{
@@ -29,7 +32,9 @@ export default function RootLayout({
       <body
         className={`${geistSans.variable} ${geistMono.variable} antialiased`}
       >
-        <AuthProvider>{children}</AuthProvider>
+        <RumReporter />
+        <ServiceWorker />
+        {children}
       </body>
     </html>
   );
@@ -1,16 +1,20 @@
 "use client";
 
 import { useState, useRef } from "react";
-import { Send, Image, Paperclip, Mic, Star } from "lucide-react";
+import { Send, Image, Paperclip, Mic, Square, Star } from "lucide-react";
 
 interface MessageInputProps {
   onSendMessage: (message: string) => void;
+  // Stops the send in progress; sending again while one is in progress
+  // replaces it.
+  onStop?: () => void;
   isLoading: boolean;
   disabled?: boolean;
 }
 
 export default function MessageInput({
   onSendMessage,
+  onStop,
   isLoading,
   disabled,
 }: MessageInputProps) {
@@ -19,7 +23,7 @@ export default function MessageInput({
 
   const handleSubmit = (e: React.FormEvent) => {
     e.preventDefault();
-    if (message.trim() && !isLoading && !disabled) {
+    if (message.trim() && !disabled) {
       onSendMessage(message.trim());
       setMessage("");
       // Reset textarea height
@@ -68,7 +72,7 @@ export default function MessageInput({
             onChange={handleInput}
             onKeyDown={handleKeyDown}
             placeholder="Ask me anything..."
-            disabled={isLoading || disabled}
+            disabled={disabled}
             className="w-full resize-none bg-gradient-to-r from-slate-800/50 to-slate-900/50 backdrop-blur-sm border border-purple-500/30 rounded-xl px-6 py-4 pr-20 text-white placeholder-purple-300 focus:ring-2 focus:ring-purple-500/50 focus:border-purple-400 disabled:opacity-50 disabled:cursor-not-allowed transition-all duration-200"
             style={{ minHeight: "60px", maxHeight: "120px" }}
           />
@@ -87,9 +91,19 @@ export default function MessageInput({
             >
               <Star size={18} />
             </button>
+            {isLoading && onStop && (
+              <button
+                type="button"
+                onClick={onStop}
+                title="Stop generating"
+                className="flex items-center justify-center w-10 h-10 bg-red-500/20 border border-red-500/30 hover:bg-red-500/30 text-red-300 hover:text-white rounded-lg transition-all duration-200"
+              >
+                <Square size={16} />
+              </button>
+            )}
             <button
               type="submit"
-              disabled={!message.trim() || isLoading || disabled}
+              disabled={!message.trim() || disabled}
               className="flex items-center justify-center w-10 h-10 bg-gradient-to-r from-green-400 to-blue-500 hover:from-green-500 hover:to-blue-600 disabled:from-gray-600 disabled:to-gray-700 disabled:cursor-not-allowed text-white rounded-lg transition-all duration-200 shadow-lg"
             >
               <Send size={18} />
@@ -1,6 +1,13 @@
 "use client";
 
+import { useEffect, useState } from "react";
 import { AVAILABLE_MODELS } from "@/lib/ai-models";
+import { AIModel, ModelHealth } from "@/types/ai";
+
+const STATS_REFRESH_MS = 30000;
+
+const formatLatency = (ms: number) =>
+  ms < 1000 ? `${Math.round(ms)}ms` : `${(ms / 1000).toFixed(1)}s`;
 
 interface ModelSelectorProps {
   selectedModels: string[];
@@ -19,32 +26,79 @@ export default function ModelSelector({
     }
   };
 
-  const getModelDisplayName = (modelId: string) => {
-    const model = AVAILABLE_MODELS.find((m) => m.id === modelId);
-    if (!model) return modelId;
+  // Starts in configured order; the first stats response reorders the
+  // models (healthiest and fastest first) once, later refreshes only update
+  // the numbers so toggles don't move under the cursor.
+  const [models, setModels] = useState<AIModel[]>(AVAILABLE_MODELS);
+  const [health, setHealth] = useState<Record<string, ModelHealth>>({});
 
-    // Custom display names to match the latest models
-    const displayNames: Record<string, string> = {
-      "openai/gpt-5-chat": "ChatGPT 5",
-      "anthropic/claude-sonnet-4": "Claude Sonnet 4",
-      "google/gemini-2.5-pro": "Gemini 2.5 Pro",
-      "deepseek/deepseek-r1-0528": "DeepSeek R1",
+  useEffect(() => {
+    let ordered = false;
+    const load = async () => {
+      try {
+        const response = await fetch("/api/models");
+        if (!response.ok) return;
+        const data: { models: Array<AIModel & ModelHealth> } =
+          await response.json();
+        setHealth(
+          Object.fromEntries(
+            data.models.map(({ stats, circuit, ...model }) => [
+              model.id,
+              { stats, circuit },
+            ])
+          )
+        );
+        if (!ordered) {
+          ordered = true;
+          setModels(data.models);
+        }
+      } catch (error) {
+        console.error("Failed to load model stats:", error);
+      }
     };
 
-    return displayNames[modelId] || model.name;
-  };
+    load();
+    const interval = setInterval(load, STATS_REFRESH_MS);
+    return () => clearInterval(interval);
+  }, []);
 
   return (
     <div className="flex items-center gap-4 overflow-x-auto pb-2">
-      {AVAILABLE_MODELS.map((model) => {
+      {models.map((model) => {
         const isSelected = selectedModels.includes(model.id);
+        const p50 = health[model.id]?.stats.p50LatencyMs;
+        const cacheHitRate = health[model.id]?.stats.cacheHitRate;
+        const unavailable =
+          (health[model.id]?.circuit.state ?? "closed") !== "closed";
         return (
           <div key={model.id} className="flex items-center gap-3 min-w-fit">
             {/* Model Name */}
             <div className="flex items-center gap-2">
               <span className="text-white font-medium text-sm whitespace-nowrap">
-                {getModelDisplayName(model.id)}
+                {model.name}
               </span>
+              {unavailable ? (
+                <span
+                  className="text-xs text-red-400 whitespace-nowrap"
+                  title="Recent requests failed; responses fail fast until it recovers"
+                >
+                  unavailable
+                </span>
+              ) : (
+                p50 != null && (
+                  <span
+                    className="text-xs text-gray-400 whitespace-nowrap"
+                    title={
+                      "Median response time over recent requests" +
+                      (cacheHitRate != null
+                        ? `; ${Math.round(cacheHitRate * 100)}% of prompt tokens cached`
+                        : "")
+                    }
+                  >
+                    p50 {formatLatency(p50)}
+                  </span>
+                )
+              )}
             </div>
 
             {/* Selection Indicator */}
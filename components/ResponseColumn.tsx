@@ -1,13 +1,14 @@
 "use client";
 
 import { AIModel, AIResponse, ChatMessage } from "@/types/ai";
-import { AlertCircle, Loader2 } from "lucide-react";
+import { AlertCircle, Loader2, Square, WifiOff } from "lucide-react";
 
 interface ResponseColumnProps {
   model: AIModel;
   response?: AIResponse;
   isLoading: boolean;
   chatHistory: ChatMessage[];
+  onStop?: () => void;
 }
 
 export default function ResponseColumn({
@@ -15,48 +16,16 @@ export default function ResponseColumn({
   response,
   isLoading,
   chatHistory,
+  onStop,
 }: ResponseColumnProps) {
-  const getModelDisplayName = (modelId: string) => {
-    const displayNames: Record<string, string> = {
-      "openai/gpt-5-chat": "ChatGPT 5",
-      "anthropic/claude-sonnet-4": "Claude Sonnet 4",
-      "google/gemini-2.5-pro": "Gemini 2.5 Pro",
-      "deepseek/deepseek-r1-0528": "DeepSeek R1",
-    };
-
-    return displayNames[modelId] || model.name;
-  };
-
-  const getHeaderColor = () => {
-    const colors: Record<string, string> = {
-      "openai/gpt-5-chat": "bg-green-500",
-      "anthropic/claude-sonnet-4": "bg-orange-500",
-      "google/gemini-2.5-pro": "bg-blue-500",
-      "deepseek/deepseek-r1-0528": "bg-purple-500",
-    };
-    return colors[model.id] || "bg-gray-500";
-  };
-
-  const getAvatarColor = () => {
-    const colors: Record<string, string> = {
-      "openai/gpt-5-chat": "bg-green-500",
-      "anthropic/claude-sonnet-4": "bg-orange-500",
-      "google/gemini-2.5-pro": "bg-blue-500",
-      "deepseek/deepseek-r1-0528": "bg-purple-500",
-    };
-    return colors[model.id] || "bg-gray-500";
-  };
-
   return (
     <div className="flex flex-col h-[500px] bg-black border border-gray-700 rounded-lg overflow-hidden">
       {/* Header */}
       <div className="p-4">
-        <div className={`${getHeaderColor()} rounded-lg p-4 text-white`}>
+        <div className={`${model.color} rounded-lg p-4 text-white`}>
           <div className="flex items-center justify-between">
             <div>
-              <h3 className="font-bold text-lg">
-                {getModelDisplayName(model.id)}
-              </h3>
+              <h3 className="font-bold text-lg">{model.name}</h3>
               <p className="text-sm text-white/80">{model.provider}</p>
             </div>
             <div className="flex items-center gap-2">
@@ -102,20 +71,12 @@ export default function ResponseColumn({
           {chatHistory.length === 0 && !isLoading && (
             <div className="flex items-start gap-3">
               <div
-                className={`w-8 h-8 ${getAvatarColor()} rounded-full flex items-center justify-center flex-shrink-0`}
+                className={`w-8 h-8 ${model.color} rounded-full flex items-center justify-center flex-shrink-0`}
               >
                 <span className="text-white text-sm">🤖</span>
               </div>
               <div className="bg-gray-800 text-white p-3 rounded-lg max-w-[80%]">
-                <div className="text-gray-300">
-                  {model.id === "openai/gpt-5-chat" && "Hey! How's it going?"}
-                  {model.id === "anthropic/claude-sonnet-4" &&
-                    "Hello! How are you doing today? Is there anything I can help you with?"}
-                  {model.id === "google/gemini-2.5-pro" &&
-                    "Hello! How can I help you today?"}
-                  {model.id === "deepseek/deepseek-r1-0528" &&
-                    "Hi there! 👋 How can I help you today? Whether you have a question, need advice, or just want to chat—I'm here for it! 😊 What's on your mind?"}
-                </div>
+                <div className="text-gray-300">{model.greeting}</div>
               </div>
             </div>
           )}
@@ -149,7 +110,7 @@ export default function ResponseColumn({
                 // AI message
                 <>
                   <div
-                    className={`w-8 h-8 ${getAvatarColor()} rounded-full flex items-center justify-center flex-shrink-0`}
+                    className={`w-8 h-8 ${model.color} rounded-full flex items-center justify-center flex-shrink-0`}
                   >
                     <span className="text-white text-sm">🤖</span>
                   </div>
@@ -167,24 +128,55 @@ export default function ResponseColumn({
           {isLoading && (
             <div className="flex items-start gap-3">
               <div
-                className={`w-8 h-8 ${getAvatarColor()} rounded-full flex items-center justify-center flex-shrink-0`}
+                className={`w-8 h-8 ${model.color} rounded-full flex items-center justify-center flex-shrink-0`}
               >
                 <span className="text-white text-sm">🤖</span>
               </div>
               <div className="bg-gray-800 text-white p-3 rounded-lg max-w-[80%]">
-                <div className="flex items-center gap-2 text-gray-400">
-                  <Loader2 size={16} className="animate-spin" />
-                  <span className="text-sm">Generating response...</span>
-                </div>
+                {response?.content ? (
+                  // Streamed text so far
+                  <div className="whitespace-pre-wrap leading-relaxed">
+                    {response.content}
+                  </div>
+                ) : (
+                  <div className="flex items-center gap-2 text-gray-400">
+                    <Loader2 size={16} className="animate-spin" />
+                    <span className="text-sm">Generating response...</span>
+                  </div>
+                )}
+                {onStop && (
+                  <button
+                    onClick={onStop}
+                    className="mt-2 flex items-center gap-1 text-xs text-gray-400 hover:text-white transition-colors"
+                  >
+                    <Square size={12} />
+                    Stop
+                  </button>
+                )}
               </div>
             </div>
           )}
 
+          {/* Note a message waiting for the connection to come back */}
+          {response?.queued && (
+            <div className="flex items-center gap-2 text-xs text-gray-400">
+              <WifiOff size={12} />
+              Offline: will be sent when you reconnect
+            </div>
+          )}
+
+          {/* Note a response that was stopped before it finished */}
+          {response?.cancelled && (
+            <div className="text-xs text-gray-500 italic">
+              Stopped before it finished
+            </div>
+          )}
+
           {/* Show error if any */}
           {response?.error && (
             <div className="flex items-start gap-3">
               <div
-                className={`w-8 h-8 ${getAvatarColor()} rounded-full flex items-center justify-center flex-shrink-0`}
+                className={`w-8 h-8 ${model.color} rounded-full flex items-center justify-center flex-shrink-0`}
               >
                 <span className="text-white text-sm">🤖</span>
               </div>
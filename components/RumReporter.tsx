@@ -0,0 +1,16 @@
+"use client";
+
+import { useReportWebVitals } from "next/web-vitals";
+import { RUM_METRICS, record } from "@/lib/rum";
+
+export default function RumReporter() {
+  useReportWebVitals((metric) => {
+    // CLS is unitless; scale it so every metric shares one histogram.
+    const value = metric.name === "CLS" ? metric.value * 1000 : metric.value;
+    const name = `web_vital_${metric.name.toLowerCase()}`;
+    // Next.js also reports its own timings, which /api/rum would drop
+    if (RUM_METRICS.has(name)) record({ metric: name, value });
+  });
+
+  return null;
+}
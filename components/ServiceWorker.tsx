@@ -0,0 +1,10 @@
+"use client";
+
+import { useEffect } from "react";
+import { registerServiceWorker } from "@/lib/service-worker";
+
+export default function ServiceWorker() {
+  useEffect(registerServiceWorker, []);
+
+  return null;
+}
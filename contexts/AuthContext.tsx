@@ -1,11 +1,16 @@
 "use client";
 
 import React, { createContext, useContext, useEffect, useState } from "react";
-import { User } from "@supabase/supabase-js";
 import { supabase } from "@/lib/supabase";
+import type { ServerUser } from "@/utils/supabase/middleware";
+import { syncShellCacheUser } from "@/lib/service-worker";
+
+// Only the id and email are relied on, so the user the server rendered
+// the page for (getServerUser) can stand in until the session is read.
+type AuthUser = ServerUser;
 
 interface AuthContextType {
-  user: User | null;
+  user: AuthUser | null;
   loading: boolean;
   signUp: (email: string, password: string) => Promise<void>;
   signIn: (email: string, password: string) => Promise<void>;
@@ -14,28 +19,32 @@ interface AuthContextType {
 
 const AuthContext = createContext<AuthContextType | undefined>(undefined);
 
-export function AuthProvider({ children }: { children: React.ReactNode }) {
-  const [user, setUser] = useState<User | null>(null);
-  const [loading, setLoading] = useState(true);
+// `initialUser` is the user the server rendered the page for (see
+// getServerUser); without it the state stays loading until the client has
+// read the session.
+export function AuthProvider({
+  children,
+  initialUser,
+}: {
+  children: React.ReactNode;
+  initialUser?: AuthUser | null;
+}) {
+  const [user, setUser] = useState<AuthUser | null>(initialUser ?? null);
+  const [loading, setLoading] = useState(initialUser === undefined);
 
   useEffect(() => {
-    // Get initial session
-    const getInitialSession = async () => {
-      const {
-        data: { session },
-      } = await supabase.auth.getSession();
-      setUser(session?.user ?? null);
-      setLoading(false);
-    };
-
-    getInitialSession();
-
-    // Listen for auth changes
+    // Also reports the current session on subscribing (INITIAL_SESSION), so
+    // no separate getSession() call is needed. Keeping the current object
+    // when the same user is reported again avoids a re-render per event.
     const {
       data: { subscription },
-    } = supabase.auth.onAuthStateChange(async (event, session) => {
-      setUser(session?.user ?? null);
+    } = supabase.auth.onAuthStateChange((event, session) => {
+      const next = session?.user ?? null;
+      setUser((current) =>
+        current?.id === next?.id && event !== "USER_UPDATED" ? current : next
+      );
       setLoading(false);
+      syncShellCacheUser(next?.id ?? null);
     });
 
     return () => subscription.unsubscribe();
@@ -0,0 +1,24 @@
+export async function register() {
+  if (process.env.NEXT_RUNTIME !== "nodejs") return;
+
+  // Connect to OpenRouter at startup rather than on the first send. Not
+  // awaited: an unreachable upstream must not hold up serving.
+  const { OPENROUTER_BASE_URL } = await import("@/lib/openrouter");
+  const { warmUpstream } = await import("@/lib/upstream-fetch");
+  warmUpstream(OPENROUTER_BASE_URL);
+
+  if (process.env.CHAT_WORKER === "1") {
+    const { startChatWorker } = await import("@/lib/chat-worker");
+    startChatWorker();
+  }
+
+  if (process.env.SESSION_PURGE === "1") {
+    const { startSessionPurge } = await import("@/lib/session-purge");
+    startSessionPurge();
+  }
+
+  if (process.env.MESSAGE_ARCHIVE === "1") {
+    const { startMessageArchive } = await import("@/lib/message-archive");
+    startMessageArchive();
+  }
+}
@@ -1,32 +1,31 @@
 import { AIModel } from "@/types/ai";
+import modelConfig from "@/config/models.json";
 
-export const AVAILABLE_MODELS: AIModel[] = [
-  {
-    id: "openai/gpt-5-chat",
-    name: "ChatGPT 5",
-    provider: "OpenAI",
-    description: "Latest GPT-5 model with advanced capabilities",
-  },
-  {
-    id: "anthropic/claude-sonnet-4",
-    name: "Claude Sonnet 4",
-    provider: "Anthropic",
-    description: "Latest Claude Sonnet model with enhanced reasoning",
-  },
-  {
-    id: "google/gemini-2.5-pro",
-    name: "Gemini 2.5 Pro",
-    provider: "Google",
-    description: "Google's most advanced multimodal model",
-  },
-  {
-    id: "deepseek/deepseek-r1-0528",
-    name: "DeepSeek R1",
-    provider: "DeepSeek",
-    description: "Advanced reasoning and coding capabilities",
-  },
-];
+// Edit config/models.json to add a model or change its price, rate limit or
+// presentation; everything else reads it through this module.
+export const AVAILABLE_MODELS: AIModel[] = modelConfig;
+
+const MODELS_BY_ID = new Map(
+  AVAILABLE_MODELS.map((model) => [model.id, model])
+);
 
 export const getModelById = (id: string): AIModel | undefined => {
-  return AVAILABLE_MODELS.find((model) => model.id === id);
+  return MODELS_BY_ID.get(id);
+};
+
+export const estimateCost = (
+  modelId: string,
+  promptTokens: number,
+  completionTokens: number,
+  cachedPromptTokens = 0
+): number => {
+  const pricing = getModelById(modelId)?.pricing;
+  if (!pricing) return 0;
+  const cachedPrice = pricing.cachedPrompt ?? pricing.prompt;
+  return (
+    ((promptTokens - cachedPromptTokens) * pricing.prompt +
+      cachedPromptTokens * cachedPrice +
+      completionTokens * pricing.completion) /
+    1000000
+  );
 };
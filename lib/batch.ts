@@ -0,0 +1,59 @@
+import { AIResponse } from "@/types/ai";
+import { getModelById } from "@/lib/ai-models";
+import { generateAIResponse } from "@/lib/openrouter";
+import { acquire } from "@/lib/rate-limit";
+
+export interface BatchItem {
+  id: string;
+  prompt: string;
+}
+
+export interface BatchOptions {
+  // Whose batch this is (see GenerateOptions.userId)
+  userId: string;
+  // Requests in flight per model.
+  concurrency: number;
+  signal?: AbortSignal;
+  // Asked before each item starts; once it answers false (e.g. the user's
+  // quota is spent) no further items are started.
+  canContinue?: () => Promise<boolean>;
+  onResult: (itemId: string, response: AIResponse) => void | Promise<void>;
+}
+
+// Runs every item against every model. Each model gets its own pool of
+// workers, so a model waiting on its rate limit never holds up the others.
+export async function runBatch(
+  items: BatchItem[],
+  modelIds: string[],
+  { userId, concurrency, signal, canContinue, onResult }: BatchOptions
+): Promise<void> {
+  let stopped = false;
+  await Promise.all(
+    modelIds.map(async (modelId) => {
+      const requestsPerMinute = getModelById(modelId)?.requestsPerMinute ?? 0;
+      let next = 0;
+
+      const worker = async () => {
+        while (next < items.length && !signal?.aborted && !stopped) {
+          const item = items[next++];
+          if (canContinue && !(await canContinue())) {
+            stopped = true;
+            return;
+          }
+          await acquire(modelId, requestsPerMinute);
+          if (signal?.aborted || stopped) return;
+          const response = await generateAIResponse(modelId, item.prompt, {
+            userId,
+            signal,
+          });
+          if (response.cancelled) return;
+          await onResult(item.id, response);
+        }
+      };
+
+      await Promise.all(
+        Array.from({ length: Math.min(concurrency, items.length) }, worker)
+      );
+    })
+  );
+}
@@ -0,0 +1,376 @@
+import { NextResponse, after } from "next/server";
+import { AIResponse, ChatStreamEvent, ChatTurn } from "@/types/ai";
+import {
+  Generation,
+  GenerationListener,
+  appendDelta,
+  cancelSend,
+  detachSend,
+  findSend,
+  finishGeneration,
+  finishSend,
+  registerSend,
+} from "@/lib/generations";
+import {
+  QUEUE_ENABLED,
+  cancelChatJobs,
+  enqueueChatJobs,
+} from "@/lib/job-queue";
+import { getModelById } from "@/lib/ai-models";
+import { generateAIResponse } from "@/lib/openrouter";
+import {
+  isPersistTarget,
+  persistPrompt,
+  persistResponses,
+} from "@/lib/persist";
+import { checkQuota, persistUsage, recordUsage } from "@/lib/quota";
+import { serverTiming, withSpan, withTrace } from "@/lib/telemetry";
+import { USER_ID_HEADER } from "@/utils/supabase/middleware";
+import { createRouteClient } from "@/utils/supabase/server";
+
+// Earlier turns sent per model are capped; providers bill the whole
+// context on every turn.
+const MAX_HISTORY_TURNS = 40;
+
+const isChatTurn = (turn: any): turn is ChatTurn =>
+  (turn?.role === "user" || turn?.role === "assistant") &&
+  typeof turn.content === "string" &&
+  turn.content.length > 0;
+
+const NDJSON_HEADERS = {
+  "Content-Type": "application/x-ndjson",
+  "Cache-Control": "no-store",
+};
+
+// Streams a send's events to one client as NDJSON: `replay` first, then
+// whatever `generations` emit, closing once all of them are done (or, with
+// `closeWhenDone` off, when the caller closes it). If the client goes away
+// the send is detached rather than stopped, so it can be resumed.
+function follow(
+  sendId: string,
+  generations: Generation[],
+  request: Request,
+  replay: ChatStreamEvent[],
+  closeWhenDone = true
+) {
+  const encoder = new TextEncoder();
+  let controller!: ReadableStreamDefaultController<Uint8Array>;
+  let open = true;
+
+  const stop = () => {
+    open = false;
+    generations.forEach((generation) => generation.listeners.delete(listener));
+  };
+  const detach = () => {
+    if (!open) return;
+    stop();
+    detachSend(sendId);
+  };
+  const close = () => {
+    if (!open) return;
+    stop();
+    try {
+      controller.close();
+    } catch {
+      // Already cancelled by the client.
+    }
+  };
+  const write = (event: ChatStreamEvent) => {
+    if (!open) return;
+    try {
+      controller.enqueue(encoder.encode(JSON.stringify(event) + "\n"));
+    } catch {
+      detach();
+    }
+  };
+  const listener: GenerationListener = (event) => {
+    write(event);
+    if (
+      closeWhenDone &&
+      event.type === "done" &&
+      generations.every((g) => g.response)
+    ) {
+      close();
+    }
+  };
+
+  const stream = new ReadableStream<Uint8Array>({
+    start(streamController) {
+      controller = streamController;
+    },
+    cancel: detach,
+  });
+  request.signal.addEventListener("abort", detach);
+  replay.forEach(write);
+  generations.forEach((generation) => {
+    if (!generation.response) generation.listeners.add(listener);
+  });
+  if (closeWhenDone && generations.every((g) => g.response)) close();
+
+  return { stream, write, close };
+}
+
+// POST /api/chat, shared by the Node (app/api/chat) and Edge
+// (app/api/chat/edge) routes. Responds with NDJSON as soon as the request
+// is accepted: a `start` line, `delta` lines as each model streams text,
+// one `done` line per model carrying its final AIResponse, and a last
+// `timing` line with the Server-Timing of the whole request (the header
+// goes out before the models are called, so it lacks their spans).
+// `history` optionally maps model ids to that model's earlier turns.
+// `sendId` names the send for POST /api/chat/cancel and /api/chat/resume,
+// and `supersedes` cancels an earlier send the new one replaces. A send
+// whose stream is closed keeps generating for a grace period in case the
+// client resumes. In queue mode the send is handed to the job workers
+// instead, and the response is a 202 with `{ sendId, modelIds }`. Sends
+// delivered from the offline outbox carry `persist: { sessionId,
+// messageId }`: the prompt and answers are then saved here, the send runs
+// to completion whether or not anyone reads it, and a send whose prompt is
+// already saved gets a 409.
+export async function handleChat(request: Request): Promise<Response> {
+  // The response goes out before generation finishes, while the trace has
+  // to stay open until the last model is done.
+  let respond!: (response: Response) => void;
+  const response = new Promise<Response>((resolve) => (respond = resolve));
+
+  withTrace("POST /api/chat", request.headers, async (_root, trace) => {
+    // Set by the middleware once the session has been verified.
+    const userId = request.headers.get(USER_ID_HEADER);
+    if (!userId) {
+      return respond(
+        NextResponse.json({ error: "Authentication required" }, { status: 401 })
+      );
+    }
+
+    const { message, modelIds, history, sendId, supersedes, persist } =
+      await withSpan("parse", () => request.json());
+
+    if (!message || !modelIds || !Array.isArray(modelIds)) {
+      return respond(
+        NextResponse.json(
+          { error: "Message and modelIds are required" },
+          { status: 400 }
+        )
+      );
+    }
+    // Unregistered models have no pricing, so their usage would cost nothing
+    // against the quota.
+    if (modelIds.length === 0 || !modelIds.every((id) => getModelById(id))) {
+      return respond(
+        NextResponse.json(
+          { error: "modelIds must be available model ids" },
+          { status: 400 }
+        )
+      );
+    }
+
+    const supabase = await createRouteClient(request);
+    const quota = await withSpan("quota", () => checkQuota(supabase, userId));
+    if (!quota.allowed) {
+      return respond(
+        NextResponse.json(
+          { error: "Daily usage quota exceeded" },
+          { status: 429 }
+        )
+      );
+    }
+
+    const target = isPersistTarget(persist) ? persist : undefined;
+    if (
+      target &&
+      !(await withSpan("persist", () =>
+        persistPrompt(supabase, userId, target, message)
+      ))
+    ) {
+      return respond(
+        NextResponse.json(
+          { error: "This message has already been sent" },
+          { status: 409 }
+        )
+      );
+    }
+
+    const id = typeof sendId === "string" ? sendId : crypto.randomUUID();
+    const turnsByModel = new Map<string, ChatTurn[]>(
+      modelIds.map((modelId: string) => [
+        modelId,
+        Array.isArray(history?.[modelId])
+          ? history[modelId].filter(isChatTurn).slice(-MAX_HISTORY_TURNS)
+          : [],
+      ])
+    );
+
+    if (QUEUE_ENABLED) {
+      if (typeof supersedes === "string") {
+        await cancelChatJobs(supabase, supersedes);
+      }
+      await withSpan("enqueue", () =>
+        enqueueChatJobs(userId, id, message, turnsByModel, target?.sessionId)
+      );
+      return respond(
+        NextResponse.json({ sendId: id, modelIds }, { status: 202 })
+      );
+    }
+
+    if (typeof supersedes === "string") cancelSend(supersedes, userId);
+    const generations = registerSend(id, userId, modelIds, Boolean(target));
+    const client = follow(
+      id,
+      Array.from(generations.values()),
+      request,
+      [{ type: "start", sendId: id, modelIds }],
+      false
+    );
+
+    respond(
+      new Response(client.stream, {
+        headers: { ...NDJSON_HEADERS, "Server-Timing": serverTiming(trace) },
+      })
+    );
+
+    try {
+      const responses: AIResponse[] = await Promise.all(
+        modelIds.map(async (modelId: string) => {
+          const generation = generations.get(modelId)!;
+          const response = await generateAIResponse(modelId, message, {
+            history: turnsByModel.get(modelId),
+            userId,
+            onDelta: (text) => appendDelta(generation, text),
+            signal: generation.controller.signal,
+          });
+          finishGeneration(generation, response);
+          return response;
+        })
+      );
+      client.write({ type: "timing", serverTiming: serverTiming(trace) });
+      client.close();
+
+      recordUsage(userId, responses);
+      after(() =>
+        persistUsage(supabase, userId, responses).catch((error) =>
+          console.error("Error recording usage:", error)
+        )
+      );
+      if (target) {
+        after(() =>
+          persistResponses(supabase, target.sessionId, responses).catch(
+            (error) => console.error("Error saving responses:", error)
+          )
+        );
+      }
+    } catch (error) {
+      console.error("Error generating responses:", error);
+      client.write({ type: "error", error: "Failed to generate responses" });
+      client.close();
+    } finally {
+      finishSend(id);
+    }
+  }).catch((error) => {
+    console.error("Error handling chat request:", error);
+    // A no-op if the stream had already been returned.
+    respond(
+      NextResponse.json(
+        { error: "Failed to generate responses" },
+        { status: 500 }
+      )
+    );
+  });
+
+  return response;
+}
+
+// POST /api/chat/resume with `{ sendId, offsets }`, where `offsets` maps
+// each model the client is still waiting for to the length of the text it
+// already has. Responds with the same NDJSON as /api/chat: the rest of each
+// model's text, then live deltas and its `done` line. The models are not
+// called again.
+export async function handleResume(request: Request): Promise<Response> {
+  const userId = request.headers.get(USER_ID_HEADER);
+  if (!userId) {
+    return NextResponse.json(
+      { error: "Authentication required" },
+      { status: 401 }
+    );
+  }
+
+  const { sendId, offsets } = await request.json().catch(() => ({}));
+  if (typeof sendId !== "string" || typeof offsets !== "object" || !offsets) {
+    return NextResponse.json(
+      { error: "sendId and offsets are required" },
+      { status: 400 }
+    );
+  }
+
+  const generations = findSend(sendId, userId);
+  if (!generations) {
+    return NextResponse.json(
+      { error: "This response can no longer be resumed" },
+      { status: 404 }
+    );
+  }
+
+  const modelIds = Object.keys(offsets).filter((id) => generations.has(id));
+  const replay: ChatStreamEvent[] = [{ type: "start", sendId, modelIds }];
+  const watched: Generation[] = [];
+  modelIds.forEach((modelId) => {
+    const generation = generations.get(modelId)!;
+    const offset = Math.max(0, Number(offsets[modelId]) || 0);
+    if (generation.response) {
+      replay.push({ type: "done", response: generation.response });
+    } else if (offset < generation.base) {
+      replay.push({
+        type: "done",
+        response: {
+          id: crypto.randomUUID(),
+          modelId,
+          content: "",
+          timestamp: new Date(),
+          isLoading: false,
+          error: "Too much of this response was missed to resume it",
+        },
+      });
+    } else {
+      const rest = generation.text.slice(offset - generation.base);
+      if (rest) replay.push({ type: "delta", modelId, text: rest });
+      watched.push(generation);
+    }
+  });
+
+  const { stream } = follow(sendId, watched, request, replay);
+  return new Response(stream, { headers: NDJSON_HEADERS });
+}
+
+// POST /api/chat/cancel with `{ sendId, modelIds? }`: stops the given models
+// of a running send (all of them when `modelIds` is omitted). Each stopped
+// model's `done` line then carries the text it had produced, marked
+// `cancelled`.
+export async function handleCancel(request: Request): Promise<Response> {
+  const userId = request.headers.get(USER_ID_HEADER);
+  if (!userId) {
+    return NextResponse.json(
+      { error: "Authentication required" },
+      { status: 401 }
+    );
+  }
+
+  const { sendId, modelIds } = await request.json().catch(() => ({}));
+  if (typeof sendId !== "string") {
+    return NextResponse.json({ error: "sendId is required" }, { status: 400 });
+  }
+
+  const models = Array.isArray(modelIds) ? modelIds : undefined;
+  if (QUEUE_ENABLED) {
+    try {
+      const supabase = await createRouteClient(request);
+      const cancelled = await cancelChatJobs(supabase, sendId, models);
+      return NextResponse.json({ cancelled });
+    } catch (error) {
+      console.error("Error cancelling chat jobs:", error);
+      return NextResponse.json(
+        { error: "Failed to cancel" },
+        { status: 500 }
+      );
+    }
+  }
+
+  return NextResponse.json({ cancelled: cancelSend(sendId, userId, models) });
+}
@@ -0,0 +1,75 @@
+import { supabase } from "@/lib/supabase";
+import { ChatJob } from "@/types/ai";
+
+// Browser side of queue mode (lib/job-queue.ts): follows a send's chat_jobs
+// rows as the workers update them.
+
+// Realtime delivers each update as it is written; this slower poll covers
+// updates missed while subscribing or when Realtime is unavailable.
+const POLL_INTERVAL_MS = 3000;
+const COLUMNS = "id, send_id, model_id, status, content, response";
+
+const isFinished = (job: ChatJob) =>
+  job.status !== "queued" && job.status !== "running";
+
+// Calls `onChange` with the latest row of each of the send's jobs until all
+// of them have finished (or `signal` aborts). Rows can arrive more than
+// once and out of order.
+export function watchChatJobs(
+  sendId: string,
+  modelIds: string[],
+  onChange: (job: ChatJob) => void,
+  signal: AbortSignal
+): Promise<void> {
+  return new Promise((resolve, reject) => {
+    const finished = new Set<string>();
+    let pollTimer: ReturnType<typeof setTimeout> | undefined;
+    let settled = false;
+
+    const settle = (error?: unknown) => {
+      if (settled) return;
+      settled = true;
+      clearTimeout(pollTimer);
+      supabase.removeChannel(channel);
+      signal.removeEventListener("abort", abort);
+      if (error) reject(error);
+      else resolve();
+    };
+    const abort = () => settle(signal.reason);
+
+    const apply = (job: ChatJob) => {
+      if (settled) return;
+      onChange(job);
+      if (isFinished(job)) finished.add(job.model_id);
+      if (modelIds.every((modelId) => finished.has(modelId))) settle();
+    };
+
+    const poll = async () => {
+      const { data, error } = await supabase
+        .from("chat_jobs")
+        .select(COLUMNS)
+        .eq("send_id", sendId);
+      if (error) console.error("Failed to load chat jobs:", error);
+      (data as ChatJob[] | null)?.forEach(apply);
+      if (!settled) pollTimer = setTimeout(poll, POLL_INTERVAL_MS);
+    };
+
+    const channel = supabase
+      .channel(`chat_jobs:${sendId}`)
+      .on(
+        "postgres_changes",
+        {
+          event: "UPDATE",
+          schema: "public",
+          table: "chat_jobs",
+          filter: `send_id=eq.${sendId}`,
+        },
+        (payload) => apply(payload.new as ChatJob)
+      )
+      .subscribe();
+
+    signal.addEventListener("abort", abort, { once: true });
+    if (signal.aborted) return abort();
+    poll();
+  });
+}
@@ -0,0 +1,179 @@
+import { hostname } from "node:os";
+import type { SupabaseClient } from "@supabase/supabase-js";
+import { ChatTurn } from "@/types/ai";
+import { generateAIResponse } from "@/lib/openrouter";
+import { persistResponses } from "@/lib/persist";
+import { persistUsage, recordUsage } from "@/lib/quota";
+import { createServiceClient } from "@/utils/supabase/server";
+
+// Runs queued chat jobs (see lib/job-queue.ts). Any number of workers can
+// poll the same table: claim_chat_jobs hands each job to exactly one of
+// them. Started from instrumentation.ts when CHAT_WORKER=1. Node only.
+
+const CONCURRENCY = Number(process.env.CHAT_WORKER_CONCURRENCY) || 4;
+const POLL_INTERVAL_MS = Number(process.env.CHAT_WORKER_POLL_MS) || 1000;
+// How often streamed text is written back to the job row.
+const FLUSH_INTERVAL_MS = 500;
+// Silent stretches (reasoning) still refresh the lock this often, well
+// inside claim_chat_jobs' two-minute stale window.
+const HEARTBEAT_MS = 15000;
+
+interface ClaimedJob {
+  id: string;
+  user_id: string;
+  model_id: string;
+  message: string;
+  history: ChatTurn[];
+  session_id: string | null;
+}
+
+// The service client bypasses RLS, so the job's session is checked to be
+// its user's before answers are written into it.
+async function ownsSession(supabase: SupabaseClient, job: ClaimedJob) {
+  const { data, error } = await supabase
+    .from("chat_sessions")
+    .select("id")
+    .eq("id", job.session_id)
+    .eq("user_id", job.user_id)
+    .maybeSingle();
+  if (error) throw error;
+  if (!data) {
+    console.error(`Chat job ${job.id} names a session its user does not own`);
+  }
+  return Boolean(data);
+}
+
+async function runJob(
+  supabase: SupabaseClient,
+  worker: string,
+  job: ClaimedJob
+) {
+  const controller = new AbortController();
+  let content = "";
+  let written = 0;
+  let writtenAt = Date.now();
+  let writing = false;
+
+  // Writes the text so far and refreshes the lock. Finding the row no
+  // longer running under this worker means it was cancelled (or handed to
+  // another worker after a stall), so the generation is aborted.
+  const flush = async () => {
+    if (writing) return;
+    if (content.length === written && Date.now() - writtenAt < HEARTBEAT_MS) {
+      return;
+    }
+    writing = true;
+    const text = content;
+    try {
+      const now = new Date().toISOString();
+      const { data, error } = await supabase
+        .from("chat_jobs")
+        .update({ content: text, locked_at: now, updated_at: now })
+        .eq("id", job.id)
+        .eq("status", "running")
+        .eq("locked_by", worker)
+        .select("id");
+      if (error) throw error;
+      written = text.length;
+      writtenAt = Date.now();
+      if (data.length === 0) controller.abort();
+    } catch (error) {
+      console.error(`Error updating chat job ${job.id}:`, error);
+    } finally {
+      writing = false;
+    }
+  };
+
+  const timer = setInterval(flush, FLUSH_INTERVAL_MS);
+  try {
+    const response = await generateAIResponse(job.model_id, job.message, {
+      history: job.history,
+      userId: job.user_id,
+      onDelta: (text) => (content += text),
+      signal: controller.signal,
+    });
+    clearInterval(timer);
+
+    const status = response.cancelled
+      ? "cancelled"
+      : response.error
+      ? "failed"
+      : "done";
+    // Only the worker still holding the running job finishes it. One whose
+    // stale lock was reclaimed, or whose job was cancelled meanwhile,
+    // updates nothing and must not save usage or answers a second time.
+    const { data, error } = await supabase
+      .from("chat_jobs")
+      .update({
+        status,
+        content: response.content,
+        response,
+        updated_at: new Date().toISOString(),
+      })
+      .eq("id", job.id)
+      .eq("status", "running")
+      .eq("locked_by", worker)
+      .select("id");
+    if (error) throw error;
+    if (data.length !== 1) return;
+
+    recordUsage(job.user_id, [response]);
+    await persistUsage(supabase, job.user_id, [response]);
+    if (job.session_id && (await ownsSession(supabase, job))) {
+      await persistResponses(supabase, job.session_id, [response]);
+    }
+  } finally {
+    clearInterval(timer);
+  }
+}
+
+export function startChatWorker() {
+  const supabase = createServiceClient();
+  const worker = `${hostname()}:${process.pid}`;
+  let active = 0;
+  let polling = false;
+  let timer: ReturnType<typeof setTimeout> | undefined;
+
+  const schedule = (delay: number) => {
+    clearTimeout(timer);
+    timer = setTimeout(poll, delay);
+  };
+
+  async function poll() {
+    if (polling) return;
+    polling = true;
+    try {
+      const free = CONCURRENCY - active;
+      if (free > 0) {
+        const { data, error } = await supabase.rpc("claim_chat_jobs", {
+          worker,
+          max_jobs: free,
+        });
+        if (error) throw error;
+
+        for (const job of (data as ClaimedJob[] | null) ?? []) {
+          active += 1;
+          runJob(supabase, worker, job)
+            .catch((error) =>
+              console.error(`Error running chat job ${job.id}:`, error)
+            )
+            .finally(() => {
+              active -= 1;
+              // A slot opened up: look for more work right away.
+              schedule(0);
+            });
+        }
+      }
+    } catch (error) {
+      console.error("Error claiming chat jobs:", error);
+    } finally {
+      polling = false;
+    }
+    schedule(POLL_INTERVAL_MS);
+  }
+
+  console.log(
+    `Chat worker ${worker} started (concurrency ${CONCURRENCY}, polling every ${POLL_INTERVAL_MS}ms)`
+  );
+  schedule(0);
+}
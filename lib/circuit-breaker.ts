@@ -0,0 +1,93 @@
+import { CircuitState, CircuitStatus } from "@/types/ai";
+import { getModelById } from "@/lib/ai-models";
+
+// Per-model circuit breakers. A model whose recent calls mostly fail (or
+// crawl) is opened: requests fail fast instead of waiting on it, and a
+// background probe checks for recovery so no user request is spent on that.
+// A call is slow when its first output (text or reasoning) takes longer
+// than the model's `slowFirstTokenMs` (config/models.json) or
+// CIRCUIT_SLOW_FIRST_TOKEN_MS; total time says more about how long the
+// answer is than about the model's health.
+
+const WINDOW = 20;
+const MIN_CALLS = 5;
+const FAILURE_RATE = 0.5;
+const SLOW_FIRST_TOKEN_MS =
+  Number(process.env.CIRCUIT_SLOW_FIRST_TOKEN_MS) || 30000;
+const OPEN_MS = 30000;
+const MAX_OPEN_MS = 300000;
+
+interface Breaker {
+  state: CircuitState;
+  // true for each failed or slow call, most recent last
+  outcomes: boolean[];
+  openMs: number;
+  retryAt?: number;
+}
+
+const breakers = new Map<string, Breaker>();
+
+function breakerFor(key: string): Breaker {
+  let breaker = breakers.get(key);
+  if (!breaker) {
+    breaker = { state: "closed", outcomes: [], openMs: OPEN_MS };
+    breakers.set(key, breaker);
+  }
+  return breaker;
+}
+
+export function circuitStatus(key: string): CircuitStatus {
+  const { state, retryAt } = breakerFor(key);
+  return { state, retryAt };
+}
+
+export const isCallAllowed = (key: string) =>
+  breakerFor(key).state === "closed";
+
+function open(key: string, breaker: Breaker, probe: () => Promise<void>) {
+  breaker.state = "open";
+  breaker.retryAt = Date.now() + breaker.openMs;
+  const timer = setTimeout(async () => {
+    breaker.state = "half-open";
+    try {
+      await probe();
+      breaker.state = "closed";
+      breaker.outcomes = [];
+      breaker.openMs = OPEN_MS;
+      breaker.retryAt = undefined;
+    } catch {
+      // Still down: back off before probing again.
+      breaker.openMs = Math.min(breaker.openMs * 2, MAX_OPEN_MS);
+      open(key, breaker, probe);
+    }
+  }, breaker.openMs);
+  timer.unref?.();
+}
+
+// Feeds one call's outcome to the model's breaker. `firstTokenMs` is how
+// long its first output took (or the whole call, if there was none);
+// `probe` is what the breaker runs to test recovery once it has opened.
+export function recordCall(
+  key: string,
+  { ok, firstTokenMs }: { ok: boolean; firstTokenMs: number },
+  probe: () => Promise<void>
+) {
+  const breaker = breakerFor(key);
+  if (breaker.state !== "closed") return;
+
+  const slowMs = getModelById(key)?.slowFirstTokenMs ?? SLOW_FIRST_TOKEN_MS;
+  breaker.outcomes.push(!ok || firstTokenMs > slowMs);
+  if (breaker.outcomes.length > WINDOW) breaker.outcomes.shift();
+
+  const bad = breaker.outcomes.filter(Boolean).length;
+  if (
+    breaker.outcomes.length >= MIN_CALLS &&
+    bad / breaker.outcomes.length >= FAILURE_RATE
+  ) {
+    console.warn(
+      `Circuit opened for ${key}: ${bad} of the last ` +
+        `${breaker.outcomes.length} calls failed or were slow`
+    );
+    open(key, breaker, probe);
+  }
+}
@@ -1,4 +1,5 @@
 import { supabase } from "./supabase";
+import { withBody } from "./message-bodies";
 
 export interface ChatSession {
   id: string;
@@ -6,6 +7,7 @@ export interface ChatSession {
   title: string;
   created_at: string;
   updated_at: string;
+  deleted_at?: string | null;
 }
 
 export interface Message {
@@ -18,13 +20,29 @@ export interface Message {
   created_at: string;
 }
 
+// A message as listed with its session. Text longer than the offload
+// threshold (migration 011) is left out: `content` is null and `preview`
+// holds its start until getMessageBodies fetches the rest.
+export interface StoredMessage extends Omit<Message, "content"> {
+  content: string | null;
+  preview: string | null;
+  content_length: number | null;
+}
+
 export interface ChatSessionWithMessages extends ChatSession {
-  messages: Message[];
+  messages: StoredMessage[];
+  // Months of this session moved to the cold archive (migration 010). Those
+  // with no `rehydrated_at` are missing from `messages` until restored.
+  archived_message_sessions?: Array<{
+    month: string;
+    rehydrated_at: string | null;
+  }>;
 }
 
 // Chat Sessions
 export const createChatSession = async (
-  title: string
+  title: string,
+  id?: string
 ): Promise<ChatSession> => {
   const {
     data: { user },
@@ -34,6 +52,7 @@ export const createChatSession = async (
   const { data, error } = await supabase
     .from("chat_sessions")
     .insert({
+      ...(id && { id }),
       user_id: user.id,
       title,
     })
@@ -51,7 +70,7 @@ export const getChatSessions = async (): Promise<ChatSession[]> => {
   if (!user) throw new Error("User not authenticated");
 
   const { data, error } = await supabase
-    .from("chat_sessions")
+    .from("live_chat_sessions")
     .select("*")
     .eq("user_id", user.id)
     .order("created_at", { ascending: false });
@@ -60,25 +79,34 @@ export const getChatSessions = async (): Promise<ChatSession[]> => {
   return data || [];
 };
 
+// With `messageLimit`, only the session's first messages are loaded.
 export const getChatSessionWithMessages = async (
-  sessionId: string
+  sessionId: string,
+  messageLimit?: number
 ): Promise<ChatSessionWithMessages | null> => {
   const {
     data: { user },
   } = await supabase.auth.getUser();
   if (!user) throw new Error("User not authenticated");
 
-  const { data, error } = await supabase
-    .from("chat_sessions")
+  let query = supabase
+    .from("live_chat_sessions")
     .select(
       `
       *,
-      messages (*)
+      messages (*),
+      archived_message_sessions (month, rehydrated_at)
     `
     )
     .eq("id", sessionId)
-    .eq("user_id", user.id)
-    .single();
+    .eq("user_id", user.id);
+  if (messageLimit) {
+    query = query
+      .order("timestamp", { referencedTable: "messages" })
+      .limit(messageLimit, { referencedTable: "messages" });
+  }
+
+  const { data, error } = await query.single();
 
   if (error) {
     if (error.code === "PGRST116") return null; // No rows returned
@@ -88,12 +116,16 @@ export const getChatSessionWithMessages = async (
   return {
     ...data,
     messages: data.messages.sort(
-      (a: Message, b: Message) =>
+      (a: StoredMessage, b: StoredMessage) =>
         new Date(a.timestamp).getTime() - new Date(b.timestamp).getTime()
     ),
   };
 };
 
+// Whether some of the session's messages are still only in the archive
+export const hasArchivedMessages = (session: ChatSessionWithMessages) =>
+  !!session.archived_message_sessions?.some((month) => !month.rehydrated_at);
+
 export const updateChatSessionTitle = async (
   sessionId: string,
   title: string
@@ -112,7 +144,14 @@ export const updateChatSessionTitle = async (
   if (error) throw error;
 };
 
-export const deleteChatSession = async (sessionId: string): Promise<void> => {
+// Deleted sessions disappear at once; their messages are purged in the
+// background (lib/session-purge.ts).
+export const deleteChatSession = async (sessionId: string): Promise<void> =>
+  deleteChatSessions([sessionId]);
+
+export const deleteChatSessions = async (
+  sessionIds: string[]
+): Promise<void> => {
   const {
     data: { user },
   } = await supabase.auth.getUser();
@@ -120,9 +159,10 @@ export const deleteChatSession = async (sessionId: string): Promise<void> => {
 
   const { error } = await supabase
     .from("chat_sessions")
-    .delete()
-    .eq("id", sessionId)
-    .eq("user_id", user.id);
+    .update({ deleted_at: new Date().toISOString() })
+    .in("id", sessionIds)
+    .eq("user_id", user.id)
+    .is("deleted_at", null);
 
   if (error) throw error;
 };
@@ -157,6 +197,7 @@ export const addMessage = async (
 export const addMultipleMessages = async (
   sessionId: string,
   messages: Array<{
+    id?: string;
     content: string;
     isUser: boolean;
     modelId?: string;
@@ -168,6 +209,7 @@ export const addMultipleMessages = async (
   if (!user) throw new Error("User not authenticated");
 
   const messageData = messages.map((msg) => ({
+    ...(msg.id && { id: msg.id }),
     session_id: sessionId,
     content: msg.content,
     is_user: msg.isUser,
@@ -191,10 +233,25 @@ export const getMessages = async (sessionId: string): Promise<Message[]> => {
 
   const { data, error } = await supabase
     .from("messages")
-    .select("*")
+    .select("*, message_bodies (content)")
     .eq("session_id", sessionId)
     .order("timestamp", { ascending: true });
 
   if (error) throw error;
-  return data || [];
+  return (data || []).map(withBody);
+};
+
+// Full text of offloaded messages, by message id
+export const getMessageBodies = async (
+  messageIds: string[]
+): Promise<Record<string, string>> => {
+  const { data, error } = await supabase
+    .from("message_bodies")
+    .select("message_id, content")
+    .in("message_id", messageIds);
+
+  if (error) throw error;
+  return Object.fromEntries(
+    (data || []).map((body) => [body.message_id, body.content])
+  );
 };
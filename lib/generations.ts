@@ -0,0 +1,148 @@
+import { AIResponse, ChatStreamEvent } from "@/types/ai";
+
+// Generations in progress, by send. A running send can be cancelled model
+// by model from a second request (POST /api/chat/cancel) or replaced by the
+// user's next send, and a client whose stream broke (reload, network blip)
+// can pick it up again from POST /api/chat/resume without the models being
+// called twice. The registry is per server instance (per isolate on the
+// Edge runtime, which is why the Edge routes share one route file).
+
+// How long a send keeps generating with nobody reading it, waiting for the
+// client to resume, before it is cancelled.
+const RESUME_GRACE_MS = 30000;
+// How long a finished send can still be resumed (to collect its results).
+const RESUME_TTL_MS = 5 * 60 * 1000;
+// Streamed text kept per model for replay; a client further behind than
+// this gets an error for that model instead.
+const MAX_REPLAY_CHARS = 100000;
+
+export type GenerationListener = (event: ChatStreamEvent) => void;
+
+export interface Generation {
+  modelId: string;
+  controller: AbortController;
+  // The last MAX_REPLAY_CHARS of streamed text, starting at offset `base`
+  text: string;
+  base: number;
+  response?: AIResponse;
+  listeners: Set<GenerationListener>;
+}
+
+interface Send {
+  userId: string;
+  generations: Map<string, Generation>;
+  // Runs to completion with nobody reading it (its answers are saved by
+  // the server)
+  keepAlive: boolean;
+  graceTimer?: ReturnType<typeof setTimeout>;
+}
+
+// Kept on globalThis so every copy of this module bundled into the same
+// process or isolate (one per route) shares it.
+const registry = globalThis as typeof globalThis & {
+  __polymindSends?: Map<string, Send>;
+};
+const sends = (registry.__polymindSends ??= new Map<string, Send>());
+
+// Registers a send and returns a generation per model; each model's call
+// should watch its controller's signal.
+export function registerSend(
+  sendId: string,
+  userId: string,
+  modelIds: string[],
+  keepAlive = false
+): Map<string, Generation> {
+  const generations = new Map<string, Generation>(
+    modelIds.map((modelId) => [
+      modelId,
+      {
+        modelId,
+        controller: new AbortController(),
+        text: "",
+        base: 0,
+        listeners: new Set(),
+      },
+    ])
+  );
+  sends.set(sendId, { userId, generations, keepAlive });
+  return generations;
+}
+
+export function appendDelta(generation: Generation, text: string) {
+  generation.text += text;
+  const excess = generation.text.length - MAX_REPLAY_CHARS;
+  if (excess > 0) {
+    generation.text = generation.text.slice(excess);
+    generation.base += excess;
+  }
+  const event: ChatStreamEvent = {
+    type: "delta",
+    modelId: generation.modelId,
+    text,
+  };
+  generation.listeners.forEach((listener) => listener(event));
+}
+
+export function finishGeneration(
+  generation: Generation,
+  response: AIResponse
+) {
+  generation.response = response;
+  generation.listeners.forEach((listener) =>
+    listener({ type: "done", response })
+  );
+  generation.listeners.clear();
+}
+
+// Called once every model of a send has finished: the results stay
+// available to resume for a while, then the send is forgotten.
+export function finishSend(sendId: string) {
+  const send = sends.get(sendId);
+  if (!send) return;
+  clearTimeout(send.graceTimer);
+  setTimeout(() => {
+    if (sends.get(sendId) === send) sends.delete(sendId);
+  }, RESUME_TTL_MS).unref?.();
+}
+
+// Called when a client stops reading a send: unless a reader is back within
+// the grace period, the models still generating are cancelled. Sends kept
+// alive are left to finish.
+export function detachSend(sendId: string) {
+  const send = sends.get(sendId);
+  if (!send || send.keepAlive) return;
+  clearTimeout(send.graceTimer);
+  send.graceTimer = setTimeout(() => {
+    send.generations.forEach((generation) => {
+      if (!generation.response && generation.listeners.size === 0) {
+        generation.controller.abort();
+      }
+    });
+  }, RESUME_GRACE_MS);
+  send.graceTimer.unref?.();
+}
+
+export function findSend(sendId: string, userId: string) {
+  const send = sends.get(sendId);
+  return send && send.userId === userId ? send.generations : undefined;
+}
+
+// Cancels the given models of a send (all of them when none are given) if
+// the send belongs to `userId`. Returns the model ids that were cancelled.
+export function cancelSend(
+  sendId: string,
+  userId: string,
+  modelIds?: string[]
+): string[] {
+  const generations = findSend(sendId, userId);
+  if (!generations) return [];
+
+  const cancelled: string[] = [];
+  generations.forEach(({ controller, response }, modelId) => {
+    if (modelIds && !modelIds.includes(modelId)) return;
+    if (response || controller.signal.aborted) return;
+    controller.abort();
+    cancelled.push(modelId);
+  });
+  return cancelled;
+}
@@ -0,0 +1,294 @@
+import type { SupabaseClient } from "@supabase/supabase-js";
+import type { ChatSession, Message } from "@/lib/database";
+import { withBody } from "@/lib/message-bodies";
+import { archivedMessages } from "@/lib/message-archive";
+import { readNdjson } from "@/lib/ndjson";
+
+// A user's whole chat history as gzipped NDJSON, for /api/history/export
+// and /api/history/import. One JSON object per line:
+//   {"type":"export","version":1,"exported_at":"..."}
+//   {"type":"session","session":{id,title,created_at,updated_at}}
+//   {"type":"message","message":{id,session_id,content,is_user,...}}
+// with each session's messages following it. Both directions work a page
+// at a time, so memory stays flat however large the history is.
+
+export const EXPORT_VERSION = 1;
+// Rows per query while exporting, and per insert while importing
+const PAGE_SIZE = 500;
+
+export type HistoryLine =
+  | { type: "export"; version: number; exported_at: string }
+  | { type: "session"; session: ExportedSession }
+  | { type: "message"; message: ExportedMessage };
+
+type ExportedSession = Pick<
+  ChatSession,
+  "id" | "title" | "created_at" | "updated_at"
+>;
+type ExportedMessage = Omit<Message, "created_at"> & { created_at?: string };
+
+// PostgREST filter for rows after `last` in (column, id) order. Values are
+// quoted: timestamps contain characters the filter syntax reserves.
+const keysetAfter = (column: string, value: string, id: string) =>
+  `${column}.gt."${value}",and(${column}.eq."${value}",id.gt.${id})`;
+
+async function* sessionPages(
+  supabase: SupabaseClient,
+  userId: string
+): AsyncGenerator<(ExportedSession & { archived: boolean })[]> {
+  let last: ExportedSession | undefined;
+  for (;;) {
+    let query = supabase
+      .from("live_chat_sessions")
+      .select(
+        "id, title, created_at, updated_at, " +
+          "archived_message_sessions (rehydrated_at)"
+      )
+      .eq("user_id", userId)
+      .order("created_at")
+      .order("id")
+      .limit(PAGE_SIZE);
+    if (last) {
+      query = query.or(keysetAfter("created_at", last.created_at, last.id));
+    }
+    const { data, error } = await query;
+    if (error) throw error;
+    yield data.map(({ archived_message_sessions, ...session }: any) => ({
+      ...session,
+      archived: archived_message_sessions.some(
+        (month: { rehydrated_at: string | null }) => !month.rehydrated_at
+      ),
+    }));
+    if (data.length < PAGE_SIZE) return;
+    last = data[data.length - 1] as any;
+  }
+}
+
+async function* messagePages(
+  supabase: SupabaseClient,
+  sessionId: string
+): AsyncGenerator<Message[]> {
+  let last: Message | undefined;
+  for (;;) {
+    let query = supabase
+      .from("messages")
+      .select("*, message_bodies (content)")
+      .eq("session_id", sessionId)
+      .order("timestamp")
+      .order("id")
+      .limit(PAGE_SIZE);
+    if (last) {
+      query = query.or(keysetAfter("timestamp", last.timestamp, last.id));
+    }
+    const { data, error } = await query;
+    if (error) throw error;
+    const messages = data.map(withBody);
+    if (messages.length > 0) yield messages;
+    if (messages.length < PAGE_SIZE) return;
+    last = messages[messages.length - 1];
+  }
+}
+
+// Groups items into pages of PAGE_SIZE
+async function* pages<T>(items: AsyncIterable<T>): AsyncGenerator<T[]> {
+  let page: T[] = [];
+  for await (const item of items) {
+    page.push(item);
+    if (page.length >= PAGE_SIZE) {
+      yield page;
+      page = [];
+    }
+  }
+  if (page.length > 0) yield page;
+}
+
+// The export's text, one page of rows per chunk
+async function* exportChunks(
+  supabase: SupabaseClient,
+  userId: string
+): AsyncGenerator<string> {
+  const line = (value: HistoryLine) => JSON.stringify(value) + "\n";
+  yield line({
+    type: "export",
+    version: EXPORT_VERSION,
+    exported_at: new Date().toISOString(),
+  });
+  for await (const sessions of sessionPages(supabase, userId)) {
+    for (const { archived, ...session } of sessions) {
+      yield line({ type: "session", session });
+      // Messages in the cold archive are read from it, not restored: an
+      // export changes nothing (the session was read through the caller's
+      // RLS, so it is theirs).
+      if (archived) {
+        for await (const messages of pages(archivedMessages(session.id))) {
+          yield messages
+            .map((message) => line({ type: "message", message }))
+            .join("");
+        }
+      }
+      for await (const messages of messagePages(supabase, session.id)) {
+        yield messages
+          .map((message) => line({ type: "message", message }))
+          .join("");
+      }
+    }
+  }
+}
+
+// Streams the user's history, gzipped. Rows are only queried as the
+// client reads, so a slow download holds one page in memory.
+export function exportHistory(
+  supabase: SupabaseClient,
+  userId: string
+): ReadableStream<Uint8Array> {
+  const chunks = exportChunks(supabase, userId);
+  const encoder = new TextEncoder();
+  return new ReadableStream<Uint8Array>({
+    async pull(controller) {
+      const { value, done } = await chunks.next();
+      if (done) controller.close();
+      else controller.enqueue(encoder.encode(value));
+    },
+    async cancel() {
+      await chunks.return(undefined);
+    },
+  }).pipeThrough(new CompressionStream("gzip"));
+}
+
+const isSession = (value: any): value is ExportedSession =>
+  typeof value?.id === "string" &&
+  typeof value?.title === "string" &&
+  typeof value?.created_at === "string";
+
+const isMessage = (value: any): value is ExportedMessage =>
+  typeof value?.id === "string" &&
+  typeof value?.session_id === "string" &&
+  typeof value?.content === "string" &&
+  typeof value?.is_user === "boolean" &&
+  typeof value?.timestamp === "string" &&
+  !Number.isNaN(Date.parse(value.timestamp));
+
+// The id an imported row gets: a UUID hashed from the user and the row's
+// key in the file. Ids in the file are the client's choice, so they are
+// never stored as given (one could reuse an existing message's id under
+// another timestamp), yet importing the same file twice yields the same
+// ids and adds nothing the second time.
+async function importedId(userId: string, ...key: string[]) {
+  const digest = await crypto.subtle.digest(
+    "SHA-256",
+    new TextEncoder().encode(JSON.stringify([userId, ...key]))
+  );
+  const bytes = new Uint8Array(digest, 0, 16);
+  bytes[6] = (bytes[6] & 0x0f) | 0x80; // version 8 (custom)
+  bytes[8] = (bytes[8] & 0x3f) | 0x80; // RFC 4122 variant
+  const hex = Array.from(bytes, (byte) => byte.toString(16).padStart(2, "0"));
+  return [
+    hex.slice(0, 4),
+    hex.slice(4, 6),
+    hex.slice(6, 8),
+    hex.slice(8, 10),
+    hex.slice(10),
+  ]
+    .map((group) => group.join(""))
+    .join("-");
+}
+
+export class ImportError extends Error {}
+
+// Loads an export (gzipped or not) into the user's history, PAGE_SIZE rows
+// per insert. Rows get new ids derived from the file's (see importedId).
+// Messages must follow their session in the file.
+export async function importHistory(
+  supabase: SupabaseClient,
+  userId: string,
+  body: ReadableStream<Uint8Array>
+): Promise<{ sessions: number; messages: number }> {
+  const counts = { sessions: 0, messages: 0 };
+  const imported = new Set<string>();
+  let sessions: object[] = [];
+  let messages: object[] = [];
+
+  const flushSessions = async () => {
+    if (sessions.length === 0) return;
+    const { error } = await supabase
+      .from("chat_sessions")
+      .upsert(sessions, { onConflict: "id", ignoreDuplicates: true });
+    if (error) throw error;
+    counts.sessions += sessions.length;
+    sessions = [];
+  };
+  const flushMessages = async () => {
+    if (messages.length === 0) return;
+    // A message's session has to exist before it
+    await flushSessions();
+    const { error } = await supabase.from("messages").upsert(messages, {
+      onConflict: "id,timestamp",
+      ignoreDuplicates: true,
+    });
+    if (error) throw error;
+    counts.messages += messages.length;
+    messages = [];
+  };
+
+  const lines = readNdjson<HistoryLine>(new Response(await gunzipped(body)));
+  let lineNumber = 0;
+  try {
+    for await (const line of lines) {
+      lineNumber++;
+      if (line?.type === "export") {
+        if (line.version > EXPORT_VERSION) {
+          throw new ImportError(`Unsupported export version ${line.version}`);
+        }
+      } else if (line?.type === "session" && isSession(line.session)) {
+        const { id, title, created_at, updated_at } = line.session;
+        imported.add(id);
+        sessions.push({
+          id: await importedId(userId, id),
+          title,
+          created_at,
+          updated_at,
+          user_id: userId,
+        });
+        if (sessions.length >= PAGE_SIZE) await flushSessions();
+      } else if (
+        line?.type === "message" &&
+        isMessage(line.message) &&
+        imported.has(line.message.session_id)
+      ) {
+        const { id, session_id, content, is_user, model_id } = line.message;
+        const timestamp = new Date(line.message.timestamp).toISOString();
+        messages.push({
+          id: await importedId(userId, session_id, id, timestamp),
+          session_id: await importedId(userId, session_id),
+          content,
+          is_user,
+          model_id,
+          timestamp,
+        });
+        if (messages.length >= PAGE_SIZE) await flushMessages();
+      } else {
+        throw new ImportError(`Line ${lineNumber} is not a valid export line`);
+      }
+    }
+  } catch (error) {
+    if (error instanceof SyntaxError) {
+      throw new ImportError(`Line ${lineNumber + 1} is not valid JSON`);
+    }
+    throw error;
+  }
+  await flushMessages();
+  await flushSessions();
+  return counts;
+}
+
+// The body, decompressed if it starts with the gzip magic bytes
+async function gunzipped(
+  body: ReadableStream<Uint8Array>
+): Promise<ReadableStream<Uint8Array>> {
+  const [peek, stream] = body.tee();
+  const reader = peek.getReader();
+  const { value } = await reader.read();
+  reader.cancel();
+  const isGzip = value && value[0] === 0x1f && value[1] === 0x8b;
+  return isGzip ? stream.pipeThrough(new DecompressionStream("gzip")) : stream;
+}
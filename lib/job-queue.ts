@@ -0,0 +1,49 @@
+import type { SupabaseClient } from "@supabase/supabase-js";
+import { ChatTurn } from "@/types/ai";
+import { createServiceClient } from "@/utils/supabase/server";
+
+// Queue mode (CHAT_QUEUE=1): /api/chat records one chat_jobs row per model
+// and returns at once; worker processes (lib/chat-worker.ts) run the
+// generations and write their progress back to the rows, which clients
+// follow over Realtime. Long reasoning runs then hold a worker slot instead
+// of a request, and throughput scales with the number of workers.
+export const QUEUE_ENABLED = process.env.CHAT_QUEUE === "1";
+
+// Queued with the service role: users have no insert policy on chat_jobs,
+// so every job has passed the route's checks (migration 012).
+export async function enqueueChatJobs(
+  userId: string,
+  sendId: string,
+  message: string,
+  turnsByModel: Map<string, ChatTurn[]>,
+  // Set when the workers should save the answers into this session
+  sessionId?: string
+) {
+  const rows = Array.from(turnsByModel, ([modelId, history]) => ({
+    user_id: userId,
+    send_id: sendId,
+    model_id: modelId,
+    message,
+    history,
+    session_id: sessionId ?? null,
+  }));
+
+  const { error } = await createServiceClient()
+    .from("chat_jobs")
+    .insert(rows);
+  if (error) throw error;
+}
+
+// Cancels the caller's unfinished jobs of a send; returns their model ids.
+export async function cancelChatJobs(
+  supabase: SupabaseClient,
+  sendId: string,
+  modelIds?: string[]
+): Promise<string[]> {
+  const { data, error } = await supabase.rpc("cancel_chat_jobs", {
+    cancel_send_id: sendId,
+    model_ids: modelIds ?? null,
+  });
+  if (error) throw error;
+  return (data as string[] | null) ?? [];
+}
@@ -0,0 +1,303 @@
+import { createReadStream, createWriteStream } from "fs";
+import { mkdir, rename, rm } from "fs/promises";
+import { join } from "path";
+import { createInterface } from "readline";
+import { Readable } from "stream";
+import { pipeline } from "stream/promises";
+import { createGunzip, createGzip } from "zlib";
+import type { SupabaseClient } from "@supabase/supabase-js";
+import type { Message } from "@/lib/database";
+import { withBody } from "@/lib/message-bodies";
+import { createServiceClient } from "@/utils/supabase/server";
+
+// Cold storage for old messages (migration 010). Messages are partitioned
+// by month; once a month is MESSAGE_ARCHIVE_AFTER_MONTHS old its partition
+// is exported to ARCHIVE_DIR as gzipped NDJSON (one message per line) and
+// dropped. Opening a session with archived messages brings them back into
+// the default partition (rehydrateSession); they are evicted again after
+// REHYDRATED_TTL_MS. Other rows that land in the default partition for an
+// old month (imports, late offline sends) are appended to its archive
+// (migration 014). ARCHIVE_DIR stands in for an object store: swap
+// writeArchive/readArchive for its client to use one. Node only.
+
+const ARCHIVE_DIR = process.env.ARCHIVE_DIR || "archive";
+const KEEP_MONTHS = Number(process.env.MESSAGE_ARCHIVE_AFTER_MONTHS) || 6;
+const INTERVAL_MS =
+  Number(process.env.MESSAGE_ARCHIVE_INTERVAL_MS) || 60 * 60 * 1000;
+const REHYDRATED_TTL_MS =
+  Number(process.env.REHYDRATED_TTL_MS) || 24 * 60 * 60 * 1000;
+// Rows read from the database per query while exporting
+const EXPORT_PAGE = 1000;
+// Rows written per insert while rehydrating
+const REHYDRATE_BATCH = 500;
+
+// `month` is the partition's first day, "YYYY-MM-DD". A month's archive is
+// rewritten under a new `revision` when rows are appended to it.
+const archiveName = (month: string, revision?: string) =>
+  `messages-${month.slice(0, 7)}${revision ? `-${revision}` : ""}.ndjson.gz`;
+
+function monthRange(month: string) {
+  const start = new Date(`${month}T00:00:00Z`);
+  const end = new Date(start);
+  end.setUTCMonth(end.getUTCMonth() + 1);
+  return { start: start.toISOString(), end: end.toISOString() };
+}
+
+// The month's messages in (timestamp, id) order, paged by keyset so each
+// query stays an index range scan. Rows restored from the archive are
+// left out: the archive already holds them.
+async function* monthMessages(
+  supabase: SupabaseClient,
+  month: string
+): AsyncGenerator<Message> {
+  const { start, end } = monthRange(month);
+  let last: Message | undefined;
+  for (;;) {
+    let query = supabase
+      .from("messages")
+      .select("*, message_bodies (content)")
+      .gte("timestamp", start)
+      .lt("timestamp", end)
+      .eq("rehydrated", false)
+      .order("timestamp")
+      .order("id")
+      .limit(EXPORT_PAGE);
+    if (last) {
+      query = query.or(
+        `timestamp.gt."${last.timestamp}",` +
+          `and(timestamp.eq."${last.timestamp}",id.gt.${last.id})`
+      );
+    }
+    const { data, error } = await query;
+    if (error) throw error;
+    const messages = data.map(withBody);
+    yield* messages;
+    if (messages.length < EXPORT_PAGE) return;
+    last = messages[messages.length - 1];
+  }
+}
+
+// Writes the lines to ARCHIVE_DIR/name, via a temporary file so a crash
+// never leaves a truncated archive under the final name.
+async function writeArchive(name: string, lines: AsyncIterable<string>) {
+  await mkdir(ARCHIVE_DIR, { recursive: true });
+  const path = join(ARCHIVE_DIR, name);
+  await pipeline(
+    Readable.from(lines),
+    createGzip(),
+    createWriteStream(`${path}.tmp`)
+  );
+  await rename(`${path}.tmp`, path);
+}
+
+async function* readArchive(name: string): AsyncGenerator<string> {
+  const lines = createInterface({
+    input: createReadStream(join(ARCHIVE_DIR, name)).pipe(createGunzip()),
+    crlfDelay: Infinity,
+  });
+  for await (const line of lines) {
+    if (line.trim()) yield line;
+  }
+}
+
+async function archiveMonth(supabase: SupabaseClient, month: string) {
+  const name = archiveName(month);
+  let count = 0;
+  await writeArchive(
+    name,
+    (async function* () {
+      for await (const message of monthMessages(supabase, month)) {
+        count++;
+        yield JSON.stringify(message) + "\n";
+      }
+    })()
+  );
+
+  const { error } = await supabase.rpc("drop_archived_message_partition", {
+    month,
+    location: name,
+    message_count: count,
+  });
+  if (error) throw error;
+  console.log(`Archived ${count} messages from ${month} to ${name}`);
+}
+
+// Moves the month's rows left in the default partition into its archive,
+// creating one if the month has none. The archive is rewritten under a new
+// name; the old file is removed once the database points at the new one.
+async function archiveDefaultMonth(supabase: SupabaseClient, month: string) {
+  const { data: archive, error: archiveError } = await supabase
+    .from("message_archives")
+    .select("location")
+    .eq("month", month)
+    .maybeSingle();
+  if (archiveError) throw archiveError;
+
+  const name = archiveName(month, Date.now().toString(36));
+  const ids: string[] = [];
+  const timestamps: string[] = [];
+  await writeArchive(
+    name,
+    (async function* () {
+      if (archive) {
+        for await (const line of readArchive(archive.location)) {
+          yield line + "\n";
+        }
+      }
+      for await (const message of monthMessages(supabase, month)) {
+        ids.push(message.id);
+        timestamps.push(message.timestamp);
+        yield JSON.stringify(message) + "\n";
+      }
+    })()
+  );
+  if (ids.length === 0) {
+    await rm(join(ARCHIVE_DIR, name), { force: true });
+    return;
+  }
+
+  const { data: previous, error } = await supabase.rpc(
+    "archive_default_messages",
+    { month, location: name, ids, timestamps }
+  );
+  if (error) {
+    await rm(join(ARCHIVE_DIR, name), { force: true });
+    throw error;
+  }
+  if (previous) await rm(join(ARCHIVE_DIR, previous), { force: true });
+  console.log(`Archived ${ids.length} more messages from ${month} to ${name}`);
+}
+
+// The session's archived months whose messages are not back in the
+// database, with their archive files.
+async function archivedMonths(
+  supabase: SupabaseClient,
+  sessionId: string
+): Promise<{ month: string; location: string }[]> {
+  const { data, error } = await supabase
+    .from("archived_message_sessions")
+    .select("month, message_archives (location)")
+    .eq("session_id", sessionId)
+    .is("rehydrated_at", null)
+    .order("month");
+  if (error) throw error;
+  return data.map(({ month, message_archives }: any) => ({
+    month,
+    location: message_archives.location,
+  }));
+}
+
+// A month's archive holds every session of that month; only this session's
+// lines are parsed past the id check.
+async function* readSessionArchive(
+  location: string,
+  sessionId: string
+): AsyncGenerator<Message> {
+  for await (const line of readArchive(location)) {
+    if (!line.includes(sessionId)) continue;
+    const message: Message = JSON.parse(line);
+    if (message.session_id === sessionId) yield message;
+  }
+}
+
+// A session's messages that are only in the archive, read straight from it
+// without bringing them back. The caller checks the session belongs to the
+// user.
+export async function* archivedMessages(
+  sessionId: string
+): AsyncGenerator<Message> {
+  const supabase = createServiceClient();
+  for (const { location } of await archivedMonths(supabase, sessionId)) {
+    yield* readSessionArchive(location, sessionId);
+  }
+}
+
+// Brings a session's archived messages back. Returns how many were
+// restored. The caller checks the session belongs to the user.
+export async function rehydrateSession(sessionId: string): Promise<number> {
+  const supabase = createServiceClient();
+  const months = await archivedMonths(supabase, sessionId);
+  let restored = 0;
+  for (const { month, location } of months) {
+    let batch: object[] = [];
+    const flush = async () => {
+      if (batch.length === 0) return;
+      const { error } = await supabase.from("messages").upsert(batch, {
+        onConflict: "id,timestamp",
+        ignoreDuplicates: true,
+      });
+      if (error) throw error;
+      restored += batch.length;
+      batch = [];
+    };
+
+    for await (const message of readSessionArchive(location, sessionId)) {
+      // Flagged so eviction removes only what the archive holds
+      batch.push({ ...message, rehydrated: true });
+      if (batch.length >= REHYDRATE_BATCH) await flush();
+    }
+    await flush();
+
+    const { error } = await supabase
+      .from("archived_message_sessions")
+      .update({ rehydrated_at: new Date().toISOString() })
+      .eq("session_id", sessionId)
+      .eq("month", month);
+    if (error) throw error;
+  }
+  return restored;
+}
+
+// One pass of upkeep: partitions for the coming months, eviction of
+// rehydrated messages, archiving of months past the cutoff, and of rows
+// left in the default partition for archived (or partitionless) months.
+async function maintain(supabase: SupabaseClient) {
+  const { error: partitionError } = await supabase.rpc(
+    "create_message_partitions"
+  );
+  if (partitionError) throw partitionError;
+
+  const { error: evictError } = await supabase.rpc(
+    "evict_rehydrated_messages",
+    { older_than: `${Math.round(REHYDRATED_TTL_MS / 1000)} seconds` }
+  );
+  if (evictError) throw evictError;
+
+  const { data: months, error } = await supabase.rpc(
+    "message_partitions_to_archive",
+    { keep_months: KEEP_MONTHS }
+  );
+  if (error) throw error;
+  for (const month of months as string[]) {
+    await archiveMonth(supabase, month);
+  }
+
+  const { data: defaultMonths, error: defaultError } = await supabase.rpc(
+    "default_message_months_to_archive",
+    { keep_months: KEEP_MONTHS }
+  );
+  if (defaultError) throw defaultError;
+  for (const month of defaultMonths as string[]) {
+    await archiveDefaultMonth(supabase, month);
+  }
+}
+
+// Started from instrumentation.ts when MESSAGE_ARCHIVE=1. Run it on one
+// server: two archiving the same month would race for its file.
+export function startMessageArchive() {
+  const supabase = createServiceClient();
+
+  async function run() {
+    try {
+      await maintain(supabase);
+    } catch (error) {
+      console.error("Error maintaining message partitions:", error);
+    }
+    setTimeout(run, INTERVAL_MS);
+  }
+
+  console.log(
+    `Message archive started (${ARCHIVE_DIR}, after ${KEEP_MONTHS} months)`
+  );
+  run();
+}
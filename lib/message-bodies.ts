@@ -0,0 +1,18 @@
+import type { Message } from "@/lib/database";
+
+// Messages longer than the offload threshold (migration 011) keep only a
+// preview in `messages`; their text lives in `message_bodies`. Readers that
+// need whole messages select `*, message_bodies (content)` and pass each
+// row through withBody. Shared by the browser and server code, so it must
+// not import a Supabase client.
+
+export const withBody = ({
+  message_bodies,
+  preview,
+  content_length,
+  rehydrated,
+  ...message
+}: any): Message => ({
+  ...message,
+  content: message.content ?? message_bodies?.content,
+});
@@ -0,0 +1,64 @@
+import { ModelStats } from "@/types/ai";
+
+// Outcomes of the most recent generate calls per model, kept in a fixed-size
+// ring so stats track current upstream behaviour rather than all-time
+// averages.
+const WINDOW = 100;
+
+interface Outcome {
+  latencyMs: number;
+  ok: boolean;
+  promptTokens?: number;
+  cachedPromptTokens?: number;
+}
+
+interface Ring {
+  outcomes: Outcome[];
+  next: number;
+}
+
+const rings = new Map<string, Ring>();
+
+export function recordOutcome(modelId: string, outcome: Outcome) {
+  let ring = rings.get(modelId);
+  if (!ring) {
+    ring = { outcomes: [], next: 0 };
+    rings.set(modelId, ring);
+  }
+  ring.outcomes[ring.next] = outcome;
+  ring.next = (ring.next + 1) % WINDOW;
+}
+
+const percentile = (sorted: number[], pct: number) =>
+  sorted.length === 0
+    ? null
+    : sorted[Math.max(0, Math.ceil((pct / 100) * sorted.length) - 1)];
+
+export function getModelStats(modelId: string): ModelStats {
+  const outcomes = rings.get(modelId)?.outcomes ?? [];
+  // Failed calls often end early, so only successes describe latency.
+  const latencies = outcomes
+    .filter((outcome) => outcome.ok)
+    .map((outcome) => outcome.latencyMs)
+    .sort((a, b) => a - b);
+
+  const promptTokens = outcomes.reduce(
+    (sum, outcome) => sum + (outcome.promptTokens ?? 0),
+    0
+  );
+  const cachedPromptTokens = outcomes.reduce(
+    (sum, outcome) => sum + (outcome.cachedPromptTokens ?? 0),
+    0
+  );
+
+  return {
+    samples: outcomes.length,
+    p50LatencyMs: percentile(latencies, 50),
+    p95LatencyMs: percentile(latencies, 95),
+    errorRate:
+      outcomes.length === 0
+        ? 0
+        : outcomes.filter((outcome) => !outcome.ok).length / outcomes.length,
+    cacheHitRate: promptTokens === 0 ? null : cachedPromptTokens / promptTokens,
+  };
+}
@@ -1,42 +1,370 @@
-import { openrouter } from "@openrouter/ai-sdk-provider";
-import { generateText } from "ai";
-import { AIResponse } from "@/types/ai";
+import { createOpenRouter } from "@openrouter/ai-sdk-provider";
+import { APICallError, ModelMessage, streamText } from "ai";
+import { AIResponse, ChatTurn } from "@/types/ai";
+import { estimateCost, getModelById } from "@/lib/ai-models";
+import {
+  circuitStatus,
+  isCallAllowed,
+  recordCall,
+} from "@/lib/circuit-breaker";
+import { recordOutcome } from "@/lib/model-stats";
+import { withSpan } from "@/lib/telemetry";
 
-export async function generateAIResponse(
+// OPENROUTER_BASE_URL lets local runs target tools/mock_openrouter.py
+// instead of the real API.
+export const OPENROUTER_BASE_URL =
+  process.env.OPENROUTER_BASE_URL || "https://openrouter.ai/api/v1";
+
+// The pooled agent is built on Node modules; the Edge runtime keeps its
+// platform fetch. NEXT_RUNTIME is inlined per bundle, so the Edge build
+// never sees the require.
+const upstreamFetch: typeof fetch | undefined =
+  process.env.NEXT_RUNTIME === "nodejs"
+    ? // eslint-disable-next-line @typescript-eslint/no-require-imports
+      require("@/lib/upstream-fetch").pooledFetch
+    : undefined;
+
+const openrouter = createOpenRouter({
+  apiKey: process.env.OPENROUTER_API_KEY,
+  baseURL: OPENROUTER_BASE_URL,
+  fetch: upstreamFetch,
+});
+
+// Optional system prompt sent ahead of every conversation.
+const SYSTEM_PROMPT = process.env.CHAT_SYSTEM_PROMPT || "";
+
+// Marks the end of a prefix the provider may cache and reuse next turn.
+const CACHE_BREAKPOINT = {
+  openrouter: { cacheControl: { type: "ephemeral" } },
+};
+
+export type DeltaListener = (text: string) => void;
+
+export interface GenerateOptions {
+  history?: ChatTurn[];
+  // Whose call this is: only calls of the same user are coalesced.
+  userId?: string;
+  onDelta?: DeltaListener;
+  // Cancels this caller's generation; the text streamed so far comes back
+  // as a response marked `cancelled`.
+  signal?: AbortSignal;
+}
+
+// Builds the conversation for one call. The system prompt and the earlier
+// turns are identical from one turn to the next, so on models that take
+// explicit cache hints the end of each is marked as a cache breakpoint;
+// the others (OpenAI, DeepSeek) cache shared prefixes automatically.
+function buildMessages(
   modelId: string,
-  message: string
-): Promise<AIResponse> {
-  try {
-    const result = await generateText({
-      model: openrouter(modelId),
-      prompt: message,
+  message: string,
+  history: ChatTurn[]
+): ModelMessage[] {
+  const cacheable = getModelById(modelId)?.cacheControl ?? false;
+  const messages: ModelMessage[] = [];
+  if (SYSTEM_PROMPT) {
+    messages.push({
+      role: "system",
+      content: SYSTEM_PROMPT,
+      ...(cacheable && { providerOptions: CACHE_BREAKPOINT }),
     });
+  }
+  history.forEach((turn, index) => {
+    const last = index === history.length - 1;
+    messages.push({
+      role: turn.role,
+      content: turn.content,
+      ...(cacheable && last && { providerOptions: CACHE_BREAKPOINT }),
+    } as ModelMessage);
+  });
+  messages.push({ role: "user", content: message });
+  return messages;
+}
 
-    return {
-      id: crypto.randomUUID(),
-      modelId,
-      content: result.text,
-      timestamp: new Date(),
-      isLoading: false,
+// An upstream call in flight, shared by every call of one user with the
+// same model and prompt: double submits and repeated evaluation prompts
+// reuse its result instead of paying for another call. Callers that join
+// late are replayed the text streamed so far, then receive the rest live.
+// The call is paid once, so only the first caller to collect the result
+// gets its usage. The upstream call is aborted once every caller has
+// cancelled.
+interface Flight {
+  result: Promise<AIResponse>;
+  content: string;
+  listeners: Set<DeltaListener>;
+  callers: number;
+  controller: AbortController;
+  billed: boolean;
+}
+
+const inFlight = new Map<string, Flight>();
+
+const cancelledResponse = (modelId: string, content: string): AIResponse => ({
+  id: crypto.randomUUID(),
+  modelId,
+  content,
+  timestamp: new Date(),
+  isLoading: false,
+  cancelled: true,
+});
+
+function join(
+  key: string,
+  flight: Flight,
+  modelId: string,
+  { onDelta, signal }: GenerateOptions
+): Promise<AIResponse> {
+  flight.callers += 1;
+  if (onDelta) {
+    if (flight.content) onDelta(flight.content);
+    flight.listeners.add(onDelta);
+  }
+
+  return new Promise<AIResponse>((resolve) => {
+    let settled = false;
+    const settle = () => {
+      settled = true;
+      if (onDelta) flight.listeners.delete(onDelta);
+      flight.callers -= 1;
+    };
+    const leave = () => {
+      if (settled) return;
+      settle();
+      if (flight.callers === 0) {
+        if (inFlight.get(key) === flight) inFlight.delete(key);
+        flight.controller.abort();
+      }
+      resolve(cancelledResponse(modelId, flight.content));
     };
-  } catch (error) {
+    signal?.addEventListener("abort", leave, { once: true });
+    flight.result.then((response) => {
+      signal?.removeEventListener("abort", leave);
+      if (settled) return;
+      settle();
+      if (flight.billed) {
+        resolve({ ...response, usage: undefined });
+      } else {
+        flight.billed = true;
+        resolve(response);
+      }
+    });
+  });
+}
+
+export async function generateAIResponse(
+  modelId: string,
+  message: string,
+  options: GenerateOptions = {}
+): Promise<AIResponse> {
+  const { history = [], userId, signal } = options;
+  if (signal?.aborted) return cancelledResponse(modelId, "");
+
+  // A model whose circuit is open fails fast rather than holding up the
+  // other columns until its error arrives.
+  if (!isCallAllowed(modelId)) {
+    const { retryAt } = circuitStatus(modelId);
+    const seconds = retryAt
+      ? Math.max(1, Math.ceil((retryAt - Date.now()) / 1000))
+      : undefined;
     return {
       id: crypto.randomUUID(),
       modelId,
       content: "",
       timestamp: new Date(),
       isLoading: false,
-      error: error instanceof Error ? error.message : "Unknown error occurred",
+      error:
+        `${getModelById(modelId)?.name ?? modelId} is temporarily unavailable` +
+        (seconds ? `, retrying in ${seconds}s` : ""),
     };
   }
+
+  const key = JSON.stringify([userId ?? null, modelId, message, history]);
+  const pending = inFlight.get(key);
+  if (pending) {
+    return withSpan(
+      "generate",
+      async () => {
+        // Each caller gets its own id, since it keys the stored message and
+        // its usage row.
+        const shared = await join(key, pending, modelId, options);
+        return { ...shared, id: crypto.randomUUID(), timestamp: new Date() };
+      },
+      { "model.id": modelId, "ai.coalesced": true }
+    );
+  }
+
+  const messages = buildMessages(modelId, message, history);
+  const controller = new AbortController();
+  const flight: Flight = {
+    content: "",
+    listeners: new Set(),
+    callers: 0,
+    controller,
+    billed: false,
+    result: callModel(
+      modelId,
+      messages,
+      (text) => {
+        flight.content += text;
+        flight.listeners.forEach((listener) => listener(text));
+      },
+      controller.signal
+    ).finally(() => {
+      if (inFlight.get(key) === flight) inFlight.delete(key);
+    }),
+  };
+  inFlight.set(key, flight);
+  return join(key, flight, modelId, options);
+}
+
+async function callModel(
+  modelId: string,
+  messages: ModelMessage[],
+  onDelta: DeltaListener,
+  signal: AbortSignal
+): Promise<AIResponse> {
+  return withSpan(
+    "generate",
+    async (span) => {
+      const startedAt = performance.now();
+      let firstTokenAt: number | undefined;
+      // Reasoning models think before they answer; their reasoning counts
+      // as output for the circuit breaker.
+      let firstOutputAt: number | undefined;
+      let content = "";
+      const firstTokenMs = () =>
+        Math.round((firstOutputAt ?? performance.now()) - startedAt);
+
+      try {
+        // Streamed internally so time-to-first-token can be measured.
+        const result = streamText({
+          model: openrouter(modelId),
+          messages,
+          abortSignal: signal,
+        });
+
+        let promptTokens = 0;
+        let cachedPromptTokens = 0;
+        let completionTokens = 0;
+        for await (const part of result.fullStream) {
+          if (part.type === "reasoning-delta") {
+            firstOutputAt ??= performance.now();
+          } else if (part.type === "text-delta") {
+            firstTokenAt ??= performance.now();
+            firstOutputAt ??= firstTokenAt;
+            content += part.text;
+            onDelta(part.text);
+          } else if (part.type === "error") {
+            throw part.error;
+          } else if (part.type === "finish") {
+            promptTokens = part.totalUsage.inputTokens ?? 0;
+            cachedPromptTokens = part.totalUsage.cachedInputTokens ?? 0;
+            completionTokens = part.totalUsage.outputTokens ?? 0;
+          }
+        }
+        if (signal.aborted) throw signal.reason;
+
+        const latencyMs = Math.round(performance.now() - startedAt);
+        recordOutcome(modelId, {
+          latencyMs,
+          ok: true,
+          promptTokens,
+          cachedPromptTokens,
+        });
+        recordCall(
+          modelId,
+          { firstTokenMs: firstTokenMs(), ok: true },
+          () => probe(modelId)
+        );
+        span.attributes["http.response.status_code"] = 200;
+        span.attributes["ai.usage.input_tokens"] = promptTokens;
+        span.attributes["ai.usage.cached_input_tokens"] = cachedPromptTokens;
+        span.attributes["ai.usage.output_tokens"] = completionTokens;
+        if (firstTokenAt !== undefined) {
+          span.attributes["ai.ttft_ms"] = Math.round(firstTokenAt - startedAt);
+        }
+
+        return {
+          id: crypto.randomUUID(),
+          modelId,
+          content,
+          timestamp: new Date(),
+          isLoading: false,
+          usage: {
+            promptTokens,
+            cachedPromptTokens,
+            completionTokens,
+            latencyMs,
+            costUsd: estimateCost(
+              modelId,
+              promptTokens,
+              completionTokens,
+              cachedPromptTokens
+            ),
+          },
+        };
+      } catch (error) {
+        // Cancelled by its callers: not a failure of the model.
+        if (signal.aborted) {
+          span.attributes["ai.cancelled"] = true;
+          return cancelledResponse(modelId, content);
+        }
+
+        const latencyMs = Math.round(performance.now() - startedAt);
+        recordOutcome(modelId, { latencyMs, ok: false });
+        // A rejected request (bad input, content policy) says nothing about
+        // the model's health; timeouts, rate limits and 5xx do.
+        const status = APICallError.isInstance(error) ? error.statusCode : 0;
+        const rejected =
+          !!status &&
+          status >= 400 &&
+          status < 500 &&
+          ![408, 429].includes(status);
+        recordCall(
+          modelId,
+          { firstTokenMs: firstTokenMs(), ok: rejected },
+          () => probe(modelId)
+        );
+        span.attributes["http.response.status_code"] =
+          APICallError.isInstance(error) ? error.statusCode ?? 0 : 0;
+        span.error = error instanceof Error ? error.message : String(error);
+
+        return {
+          id: crypto.randomUUID(),
+          modelId,
+          content: "",
+          timestamp: new Date(),
+          isLoading: false,
+          error:
+            error instanceof Error ? error.message : "Unknown error occurred",
+        };
+      }
+    },
+    { "model.id": modelId }
+  );
+}
+
+// Minimal request used by the circuit breaker to test whether a model has
+// recovered; throws if it has not.
+async function probe(modelId: string): Promise<void> {
+  const result = streamText({
+    model: openrouter(modelId),
+    prompt: "ping",
+    maxOutputTokens: 1,
+  });
+  for await (const part of result.fullStream) {
+    if (part.type === "error") throw part.error;
+  }
 }
 
 export async function generateMultipleResponses(
   modelIds: string[],
-  message: string
+  message: string,
+  onDelta?: (modelId: string, text: string) => void
 ): Promise<AIResponse[]> {
   const promises = modelIds.map((modelId) =>
-    generateAIResponse(modelId, message)
+    generateAIResponse(modelId, message, {
+      onDelta: onDelta && ((text) => onDelta(modelId, text)),
+    })
   );
 
   return Promise.all(promises);
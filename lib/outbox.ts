@@ -0,0 +1,117 @@
+import { ChatTurn } from "@/types/ai";
+
+// Sends made while offline wait here, in IndexedDB, until they can be
+// delivered: by the page when it sees the connection come back, or by the
+// service worker (public/sw.js) through Background Sync when the tab has
+// been closed. Delivery posts the send to /api/chat with `persist`, so the
+// server saves the prompt and answers itself; the prompt's client-generated
+// id makes a second delivery of the same send a no-op.
+//
+// public/sw.js cannot import this module; keep the database layout and the
+// request built by outboxRequest in step with it.
+
+const DB_NAME = "polymind";
+const DB_VERSION = 1;
+const STORE = "outbox";
+export const OUTBOX_SYNC_TAG = "chat-outbox";
+
+export interface OutboxEntry {
+  sendId: string;
+  sessionId: string;
+  // Id of the user message, which the server saves under it
+  messageId: string;
+  message: string;
+  modelIds: string[];
+  // The conversation as it stood when the message was written
+  history: Record<string, ChatTurn[]>;
+  queuedAt: number;
+}
+
+let db: Promise<IDBDatabase> | undefined;
+
+function openOutbox(): Promise<IDBDatabase> {
+  db ??= new Promise((resolve, reject) => {
+    const request = indexedDB.open(DB_NAME, DB_VERSION);
+    request.onupgradeneeded = () =>
+      request.result.createObjectStore(STORE, { keyPath: "sendId" });
+    request.onsuccess = () => resolve(request.result);
+    request.onerror = () => reject(request.error);
+  });
+  return db;
+}
+
+// Runs `body` in one transaction over the store and resolves once it has
+// committed.
+async function transact<T>(
+  mode: IDBTransactionMode,
+  body: (store: IDBObjectStore) => IDBRequest<T> | void
+): Promise<T | undefined> {
+  const transaction = (await openOutbox()).transaction(STORE, mode);
+  const request = body(transaction.objectStore(STORE));
+  return new Promise((resolve, reject) => {
+    transaction.oncomplete = () => resolve(request?.result);
+    transaction.onerror = () => reject(transaction.error);
+    transaction.onabort = () => reject(transaction.error);
+  });
+}
+
+export async function addToOutbox(entry: OutboxEntry) {
+  await transact("readwrite", (store) => store.put(entry));
+  // Lets the service worker deliver the send even if this tab is closed
+  // before the connection returns (Chromium only; elsewhere the page
+  // delivers it when it is next open and online).
+  try {
+    const registration = await navigator.serviceWorker?.ready;
+    await (registration as any)?.sync?.register(OUTBOX_SYNC_TAG);
+  } catch (error) {
+    console.error("Failed to register outbox sync:", error);
+  }
+}
+
+export async function countOutbox(): Promise<number> {
+  return (await transact("readonly", (store) => store.count())) ?? 0;
+}
+
+// Removes the oldest entry and returns it, or undefined if the outbox is
+// empty. Reading and removing happen in one transaction, so the page and the
+// service worker never both take the same entry.
+export async function takeFromOutbox(): Promise<OutboxEntry | undefined> {
+  let entry: OutboxEntry | undefined;
+  await transact("readwrite", (store) => {
+    const request = store.getAll();
+    request.onsuccess = () => {
+      entry = (request.result as OutboxEntry[]).sort(
+        (a, b) => a.queuedAt - b.queuedAt
+      )[0];
+      if (entry) store.delete(entry.sendId);
+    };
+  });
+  return entry;
+}
+
+// Puts back an entry that could not be delivered yet.
+export async function returnToOutbox(entry: OutboxEntry) {
+  await transact("readwrite", (store) => store.put(entry));
+}
+
+export const outboxRequest = (entry: OutboxEntry): RequestInit => ({
+  method: "POST",
+  headers: { "Content-Type": "application/json" },
+  body: JSON.stringify({
+    message: entry.message,
+    modelIds: entry.modelIds,
+    history: entry.history,
+    sendId: entry.sendId,
+    persist: {
+      sessionId: entry.sessionId,
+      messageId: entry.messageId,
+      sentAt: entry.queuedAt,
+    },
+  }),
+});
+
+// Whether /api/chat's answer to a delivery settles the entry: it was
+// accepted, was already delivered (409), or can never be (400). Anything
+// else (signed out, over quota, server errors) is worth retrying later.
+export const isDelivered = (response: Response) =>
+  response.ok || response.status === 409 || response.status === 400;
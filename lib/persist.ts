@@ -0,0 +1,78 @@
+import type { SupabaseClient } from "@supabase/supabase-js";
+import { AIResponse } from "@/types/ai";
+
+// Server-side saving of a send's messages, for sends delivered from the
+// offline outbox (lib/outbox.ts) where no page may be around to save them.
+
+export interface PersistTarget {
+  sessionId: string;
+  // Client-generated id of the user message and when it was sent (epoch
+  // ms). Messages are keyed by (id, timestamp), so the prompt is saved with
+  // `sentAt` as its timestamp for re-deliveries to collide.
+  messageId: string;
+  sentAt: number;
+}
+
+export const isPersistTarget = (value: any): value is PersistTarget =>
+  typeof value?.sessionId === "string" &&
+  typeof value?.messageId === "string" &&
+  Number.isFinite(value?.sentAt);
+
+// Saves the prompt, creating its session if this send starts one. Resolves
+// to false if the prompt was already saved: the send has been delivered
+// before and must not be generated again.
+export async function persistPrompt(
+  supabase: SupabaseClient,
+  userId: string,
+  { sessionId, messageId, sentAt }: PersistTarget,
+  message: string
+): Promise<boolean> {
+  const { error: sessionError } = await supabase.from("chat_sessions").upsert(
+    {
+      id: sessionId,
+      user_id: userId,
+      title: message.slice(0, 50) + (message.length > 50 ? "..." : ""),
+    },
+    { onConflict: "id", ignoreDuplicates: true }
+  );
+  if (sessionError) throw sessionError;
+
+  const { data, error } = await supabase
+    .from("messages")
+    .upsert(
+      {
+        id: messageId,
+        session_id: sessionId,
+        content: message,
+        is_user: true,
+        timestamp: new Date(sentAt).toISOString(),
+      },
+      { onConflict: "id,timestamp", ignoreDuplicates: true }
+    )
+    .select("id");
+  if (error) throw error;
+  return data.length > 0;
+}
+
+// Saves the answers under their response ids, like the page does. Empty
+// ones (failures, models stopped before they wrote anything) are skipped.
+// Each send's answers are saved once: its prompt deduplicates deliveries.
+export async function persistResponses(
+  supabase: SupabaseClient,
+  sessionId: string,
+  responses: AIResponse[]
+) {
+  const rows = responses
+    .filter((response) => response.content)
+    .map((response) => ({
+      id: response.id,
+      session_id: sessionId,
+      content: response.content,
+      is_user: false,
+      model_id: response.modelId,
+    }));
+  if (rows.length === 0) return;
+
+  const { error } = await supabase.from("messages").insert(rows);
+  if (error) throw error;
+}
@@ -0,0 +1,143 @@
+import type { SupabaseClient } from "@supabase/supabase-js";
+import { AIResponse } from "@/types/ai";
+
+// Per-user daily limits; 0 (the default) disables a limit.
+const DAILY_TOKEN_QUOTA = Number(process.env.DAILY_TOKEN_QUOTA) || 0;
+const DAILY_COST_QUOTA_USD = Number(process.env.DAILY_COST_QUOTA_USD) || 0;
+
+// A cached counter is served as-is for this long, then refreshed from
+// usage_daily in the background so other instances' usage is picked up.
+const SYNC_INTERVAL_MS = 60000;
+const MAX_COUNTERS = 10000;
+
+interface UsageCounter {
+  day: string;
+  tokens: number;
+  costUsd: number;
+  syncedAt: number;
+  syncing?: Promise<void>;
+}
+
+export interface QuotaStatus {
+  allowed: boolean;
+  tokens: number;
+  costUsd: number;
+}
+
+const counters = new Map<string, UsageCounter>();
+
+const today = () => new Date().toISOString().slice(0, 10);
+
+export const quotaEnabled = () =>
+  DAILY_TOKEN_QUOTA > 0 || DAILY_COST_QUOTA_USD > 0;
+
+async function sync(
+  supabase: SupabaseClient,
+  userId: string,
+  counter: UsageCounter
+) {
+  const { data, error } = await supabase
+    .from("usage_daily")
+    .select("prompt_tokens, completion_tokens, cost_usd")
+    .eq("user_id", userId)
+    .eq("day", counter.day)
+    .maybeSingle();
+  if (error) throw error;
+
+  // Local increments land before their rows are persisted, so the larger of
+  // the two is the better estimate.
+  const tokens = data ? data.prompt_tokens + data.completion_tokens : 0;
+  counter.tokens = Math.max(counter.tokens, tokens);
+  counter.costUsd = Math.max(counter.costUsd, Number(data?.cost_usd ?? 0));
+  counter.syncedAt = Date.now();
+}
+
+function counterFor(userId: string): UsageCounter | undefined {
+  const counter = counters.get(userId);
+  if (counter?.day === today()) return counter;
+  counters.delete(userId);
+  return undefined;
+}
+
+function evictStale() {
+  if (counters.size < MAX_COUNTERS) return;
+  const day = today();
+  for (const [userId, counter] of counters) {
+    if (counter.day !== day) counters.delete(userId);
+  }
+  // Still full: drop the oldest insertion.
+  if (counters.size >= MAX_COUNTERS) {
+    counters.delete(counters.keys().next().value!);
+  }
+}
+
+// Checks the user's usage for today against the configured quotas. Only
+// the first request per user per day waits on the database; afterwards the
+// in-memory counter answers immediately.
+export async function checkQuota(
+  supabase: SupabaseClient,
+  userId: string
+): Promise<QuotaStatus> {
+  if (!quotaEnabled()) return { allowed: true, tokens: 0, costUsd: 0 };
+
+  let counter = counterFor(userId);
+  if (!counter) {
+    evictStale();
+    counter = { day: today(), tokens: 0, costUsd: 0, syncedAt: 0 };
+    counters.set(userId, counter);
+    // Fails open: a database hiccup should not block chatting.
+    await sync(supabase, userId, counter).catch((error) =>
+      console.error("Error loading usage:", error)
+    );
+  } else if (
+    Date.now() - counter.syncedAt > SYNC_INTERVAL_MS &&
+    !counter.syncing
+  ) {
+    const stale = counter;
+    stale.syncing = sync(supabase, userId, stale)
+      .catch((error) => console.error("Error syncing usage:", error))
+      .finally(() => {
+        stale.syncing = undefined;
+      });
+  }
+
+  const allowed =
+    (!DAILY_TOKEN_QUOTA || counter.tokens < DAILY_TOKEN_QUOTA) &&
+    (!DAILY_COST_QUOTA_USD || counter.costUsd < DAILY_COST_QUOTA_USD);
+  return { allowed, tokens: counter.tokens, costUsd: counter.costUsd };
+}
+
+// Counts a request's usage against the quota right away, ahead of the
+// usage rows being persisted.
+export function recordUsage(userId: string, responses: AIResponse[]) {
+  const counter = counterFor(userId);
+  if (!counter) return;
+  for (const { usage } of responses) {
+    if (!usage) continue;
+    counter.tokens += usage.promptTokens + usage.completionTokens;
+    counter.costUsd += usage.costUsd;
+  }
+}
+
+export async function persistUsage(
+  supabase: SupabaseClient,
+  userId: string,
+  responses: AIResponse[]
+) {
+  const rows = responses
+    .filter((response) => response.usage)
+    .map(({ id, modelId, usage }) => ({
+      id,
+      user_id: userId,
+      model_id: modelId,
+      prompt_tokens: usage!.promptTokens,
+      cached_prompt_tokens: usage!.cachedPromptTokens,
+      completion_tokens: usage!.completionTokens,
+      latency_ms: usage!.latencyMs,
+      cost_usd: usage!.costUsd,
+    }));
+  if (rows.length === 0) return;
+
+  const { error } = await supabase.from("message_usage").insert(rows);
+  if (error) throw error;
+}
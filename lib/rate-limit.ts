@@ -0,0 +1,33 @@
+// Token buckets keyed by model id. A caller that finds the bucket empty
+// reserves the next token anyway and sleeps until it has accrued, so
+// waiters are served in arrival order without polling.
+
+interface Bucket {
+  tokens: number;
+  refilledAt: number;
+}
+
+const buckets = new Map<string, Bucket>();
+
+const sleep = (ms: number) => new Promise((resolve) => setTimeout(resolve, ms));
+
+export async function acquire(
+  key: string,
+  requestsPerMinute: number,
+  burst = Math.max(1, Math.ceil(requestsPerMinute / 60))
+): Promise<void> {
+  if (requestsPerMinute <= 0) return;
+
+  const ratePerMs = requestsPerMinute / 60000;
+  const now = Date.now();
+  const bucket = buckets.get(key) ?? { tokens: burst, refilledAt: now };
+  bucket.tokens = Math.min(
+    burst,
+    bucket.tokens + (now - bucket.refilledAt) * ratePerMs
+  );
+  bucket.refilledAt = now;
+  bucket.tokens -= 1;
+  buckets.set(key, bucket);
+
+  if (bucket.tokens < 0) await sleep(-bucket.tokens / ratePerMs);
+}
@@ -0,0 +1,169 @@
+// Real User Monitoring: collects perceived-latency samples in the browser and
+// ships them in batches to /api/rum, which folds them into `rum_aggregates`.
+
+export interface RumSample {
+  metric: string;
+  value: number;
+  route: string;
+  modelId?: string;
+}
+
+// Everything the app records; /api/rum is public, so it drops any other
+// metric, and folds routes other than the app's own into "other".
+export const RUM_METRICS = new Set([
+  "web_vital_lcp",
+  "web_vital_inp",
+  "web_vital_cls",
+  "web_vital_ttfb",
+  "web_vital_fcp",
+  "longtask",
+  "send_to_request",
+  "send_to_first_content",
+  "send_to_complete",
+  "send_to_error",
+  "send_to_cancel",
+  "sw_shell_cache_hit",
+  "sw_shell_cache_miss",
+  "sw_static_cache_hit",
+  "sw_static_cache_miss",
+]);
+export const RUM_ROUTES = new Set([
+  "/",
+  "/chat/[id]",
+  "/history",
+  "/login",
+  "/signup",
+]);
+
+const ENDPOINT = "/api/rum";
+const FLUSH_INTERVAL_MS = 10000;
+const MAX_BATCH = 50;
+
+let queue: RumSample[] = [];
+let flushTimer: ReturnType<typeof setTimeout> | null = null;
+let listening = false;
+let activeSends = 0;
+let longTaskObserver: PerformanceObserver | null = null;
+
+// `/chat/3f2b...` and `/chat/9a1c...` are the same route for aggregation.
+export const routeOf = (pathname: string) =>
+  pathname.replace(
+    /\/[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}/gi,
+    "/[id]"
+  );
+
+const currentRoute = () =>
+  typeof window === "undefined" ? "" : routeOf(window.location.pathname);
+
+export function flush() {
+  if (flushTimer) {
+    clearTimeout(flushTimer);
+    flushTimer = null;
+  }
+  if (queue.length === 0 || typeof navigator === "undefined") return;
+
+  const body = JSON.stringify({ samples: queue });
+  queue = [];
+  const blob = new Blob([body], { type: "application/json" });
+  if (!navigator.sendBeacon?.(ENDPOINT, blob)) {
+    fetch(ENDPOINT, { method: "POST", body, keepalive: true }).catch(() => {});
+  }
+}
+
+function listen() {
+  if (listening || typeof window === "undefined") return;
+  listening = true;
+  // Last chance to send before the page is frozen or unloaded.
+  document.addEventListener("visibilitychange", () => {
+    if (document.visibilityState === "hidden") flush();
+  });
+  window.addEventListener("pagehide", flush);
+}
+
+export function record(sample: Omit<RumSample, "route"> & { route?: string }) {
+  if (typeof window === "undefined" || !Number.isFinite(sample.value)) return;
+  listen();
+  queue.push({ ...sample, route: sample.route ?? currentRoute() });
+  if (queue.length >= MAX_BATCH) {
+    flush();
+  } else if (!flushTimer) {
+    flushTimer = setTimeout(flush, FLUSH_INTERVAL_MS);
+  }
+}
+
+// Long tasks only matter while responses are rendering, so the observer is
+// attached for the lifetime of in-flight sends and dropped afterwards.
+function observeLongTasks() {
+  if (
+    longTaskObserver ||
+    typeof PerformanceObserver === "undefined" ||
+    !PerformanceObserver.supportedEntryTypes?.includes("longtask")
+  ) {
+    return;
+  }
+  longTaskObserver = new PerformanceObserver((list) => {
+    for (const entry of list.getEntries()) {
+      record({ metric: "longtask", value: entry.duration });
+    }
+  });
+  longTaskObserver.observe({ type: "longtask" });
+}
+
+function stopLongTasks() {
+  longTaskObserver?.disconnect();
+  longTaskObserver = null;
+}
+
+export interface SendTiming {
+  requestStarted: () => void;
+  firstContent: (modelId: string) => void;
+  complete: (modelId: string, failed?: boolean) => void;
+  cancelled: (modelId: string) => void;
+}
+
+// Tracks one send: time from submit to the request leaving the browser, to
+// each model's first visible content and to its completion.
+export function startSend(modelIds: string[]): SendTiming {
+  const startedAt = performance.now();
+  const pending = new Set(modelIds);
+  const seen = new Set<string>();
+
+  activeSends += 1;
+  observeLongTasks();
+
+  let requested = false;
+  const requestStarted = () => {
+    if (requested) return;
+    requested = true;
+    record({ metric: "send_to_request", value: performance.now() - startedAt });
+  };
+
+  const firstContent = (modelId: string) => {
+    if (seen.has(modelId)) return;
+    seen.add(modelId);
+    record({
+      metric: "send_to_first_content",
+      value: performance.now() - startedAt,
+      modelId,
+    });
+  };
+
+  const finish = (modelId: string, metric: string) => {
+    if (!pending.delete(modelId)) return;
+    record({ metric, value: performance.now() - startedAt, modelId });
+    if (pending.size === 0) {
+      activeSends -= 1;
+      if (activeSends === 0) stopLongTasks();
+    }
+  };
+
+  const complete = (modelId: string, failed = false) => {
+    if (pending.has(modelId) && !failed) firstContent(modelId);
+    finish(modelId, failed ? "send_to_error" : "send_to_complete");
+  };
+
+  // Stopped by the user, or replaced by their next send.
+  const cancelled = (modelId: string) => finish(modelId, "send_to_cancel");
+
+  return { requestStarted, firstContent, complete, cancelled };
+}
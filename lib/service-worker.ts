@@ -0,0 +1,68 @@
+import { record } from "@/lib/rum";
+
+// The page's side of public/sw.js, which delivers the offline outbox
+// (lib/outbox.ts) and, in production builds, keeps the app shell cached so
+// repeat visits paint without waiting for the network.
+
+// Names the build the worker caches for; a new build installs a new worker
+// with fresh caches. Left out in development, where nothing is cached.
+const CACHE_VERSION =
+  process.env.NODE_ENV === "production"
+    ? process.env.NEXT_PUBLIC_BUILD_ID
+    : undefined;
+
+// Kept in step with public/sw.js, which appends the version.
+const SHELL_CACHE_PREFIX = "polymind-shell-";
+
+interface CacheStats {
+  [kind: string]: { hits: number; misses: number };
+}
+
+export function registerServiceWorker() {
+  if (!("serviceWorker" in navigator)) return;
+  const url = CACHE_VERSION ? `/sw.js?v=${CACHE_VERSION}` : "/sw.js";
+  navigator.serviceWorker
+    .register(url)
+    .then(reportCacheStats)
+    .catch((error) =>
+      console.error("Failed to register service worker:", error)
+    );
+}
+
+// Asks the worker controlling this page how its cache lookups went since it
+// was last asked, and records them per kind (`shell`, `static`) as RUM
+// samples; the hit rate is hits / (hits + misses) summed over samples.
+async function reportCacheStats() {
+  const worker = navigator.serviceWorker.controller;
+  if (!worker) return;
+
+  const channel = new MessageChannel();
+  const stats = await new Promise<CacheStats>((resolve) => {
+    channel.port1.onmessage = (event) => resolve(event.data);
+    worker.postMessage({ type: "cache-stats" }, [channel.port2]);
+  });
+  Object.entries(stats).forEach(([kind, { hits, misses }]) => {
+    if (hits) record({ metric: `sw_${kind}_cache_hit`, value: hits });
+    if (misses) record({ metric: `sw_${kind}_cache_miss`, value: misses });
+  });
+}
+
+// Kept in localStorage: the user the cached shell was last rendered for.
+const SHELL_USER_KEY = "polymind-shell-user";
+
+// The cached shell was rendered for the signed-in user, so it is dropped
+// whenever a different user (or nobody) is signed in; the next visit is
+// never painted with someone else's page, even offline.
+export async function syncShellCacheUser(userId: string | null) {
+  if (typeof caches === "undefined") return;
+  const cachedFor = localStorage.getItem(SHELL_USER_KEY);
+  localStorage.setItem(SHELL_USER_KEY, userId ?? "");
+  // Unset on the first visit, whose shell was fetched for this user
+  if (cachedFor === null || cachedFor === (userId ?? "")) return;
+  const names = await caches.keys();
+  await Promise.all(
+    names
+      .filter((name) => name.startsWith(SHELL_CACHE_PREFIX))
+      .map((name) => caches.delete(name))
+  );
+}
@@ -0,0 +1,102 @@
+import {
+  ChatSessionWithMessages,
+  getChatSessionWithMessages,
+} from "@/lib/database";
+
+// Chat sessions fetched ahead of navigation. The history page prefetches the
+// sessions in view (the one under the pointer first), so opening one renders
+// from memory while the full session loads behind it.
+
+// Messages prefetched per session, enough to fill the first screen.
+export const PREFETCH_MESSAGES = 50;
+// Prefetches running at once. Scrolling a long history queues the rest, and
+// those scrolled past before their turn are dropped.
+const MAX_CONCURRENT = 2;
+// How long a fetched session is served from memory
+const TTL_MS = 60000;
+
+interface Prefetch {
+  sessionId: string;
+  // Started together with the data, such as prefetching the route
+  alongside?: () => void;
+}
+
+interface CachedSession {
+  session: ChatSessionWithMessages | null;
+  fetchedAt: number;
+}
+
+const cache = new Map<string, CachedSession>();
+const inFlight = new Set<string>();
+let queue: Prefetch[] = [];
+
+function pump() {
+  while (inFlight.size < MAX_CONCURRENT && queue.length > 0) {
+    const { sessionId, alongside } = queue.shift()!;
+    inFlight.add(sessionId);
+    alongside?.();
+    getChatSessionWithMessages(sessionId, PREFETCH_MESSAGES)
+      .then((session) => {
+        // A full load may have landed meanwhile; keep it.
+        if (!cachedSession(sessionId)) storeSession(sessionId, session);
+      })
+      .catch((error) => console.error("Failed to prefetch session:", error))
+      .finally(() => {
+        inFlight.delete(sessionId);
+        pump();
+      });
+  }
+}
+
+// Queues a prefetch unless the session is cached, queued or loading.
+// `urgent` ones (hover, focus) jump the queue.
+export function prefetchSession(
+  sessionId: string,
+  { urgent = false, alongside }: { urgent?: boolean; alongside?: () => void }
+) {
+  if (cachedSession(sessionId) !== undefined || inFlight.has(sessionId)) {
+    return;
+  }
+  const queued = queue.find((prefetch) => prefetch.sessionId === sessionId);
+  if (queued && !urgent) return;
+  queue = queue.filter((prefetch) => prefetch !== queued);
+  if (urgent) queue.unshift({ sessionId, alongside });
+  else queue.push({ sessionId, alongside });
+  pump();
+}
+
+// Drops a prefetch that has not started yet.
+export function cancelPrefetch(sessionId: string) {
+  queue = queue.filter((prefetch) => prefetch.sessionId !== sessionId);
+}
+
+// The session if it was fetched recently (null: it does not exist), or
+// undefined. A prefetched session holds only its first PREFETCH_MESSAGES
+// messages.
+export function cachedSession(
+  sessionId: string
+): ChatSessionWithMessages | null | undefined {
+  const cached = cache.get(sessionId);
+  if (!cached) return undefined;
+  if (Date.now() - cached.fetchedAt > TTL_MS) {
+    cache.delete(sessionId);
+    return undefined;
+  }
+  return cached.session;
+}
+
+export function storeSession(
+  sessionId: string,
+  session: ChatSessionWithMessages | null
+) {
+  const now = Date.now();
+  cache.forEach((cached, id) => {
+    if (now - cached.fetchedAt > TTL_MS) cache.delete(id);
+  });
+  cache.set(sessionId, { session, fetchedAt: now });
+}
+
+export function forgetSession(sessionId: string) {
+  cache.delete(sessionId);
+  cancelPrefetch(sessionId);
+}
@@ -0,0 +1,37 @@
+import { createServiceClient } from "@/utils/supabase/server";
+
+// Removes soft-deleted chat sessions (migration 009) in the background:
+// purge_deleted_chat_sessions deletes one bounded batch per call, so no
+// transaction holds its locks for long however big a deleted session was.
+// Started from instrumentation.ts when SESSION_PURGE=1; one process is
+// enough, more are harmless (batches skip each other's locked rows). Node
+// only.
+
+const BATCH_SIZE = Number(process.env.SESSION_PURGE_BATCH) || 1000;
+// Pause between batches while there is a backlog, leaving room for the
+// app's own queries
+const BATCH_PAUSE_MS = 200;
+const IDLE_INTERVAL_MS =
+  Number(process.env.SESSION_PURGE_INTERVAL_MS) || 60000;
+
+export function startSessionPurge() {
+  const supabase = createServiceClient();
+
+  async function purge() {
+    let delay = IDLE_INTERVAL_MS;
+    try {
+      const { data, error } = await supabase.rpc(
+        "purge_deleted_chat_sessions",
+        { batch_size: BATCH_SIZE }
+      );
+      if (error) throw error;
+      if ((data as number) >= BATCH_SIZE) delay = BATCH_PAUSE_MS;
+    } catch (error) {
+      console.error("Error purging deleted chat sessions:", error);
+    }
+    setTimeout(purge, delay);
+  }
+
+  console.log(`Session purge started (batches of ${BATCH_SIZE})`);
+  purge();
+}
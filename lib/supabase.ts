@@ -3,7 +3,30 @@ import { createBrowserClient } from "@supabase/ssr";
 const supabaseUrl = process.env.NEXT_PUBLIC_SUPABASE_URL!;
 const supabaseAnonKey = process.env.NEXT_PUBLIC_SUPABASE_ANON_KEY!;
 
-export const supabase = createBrowserClient(supabaseUrl, supabaseAnonKey);
+// Records every PostgREST/GoTrue round-trip made by lib/database.ts and
+// lib/auth.ts as a `db:<METHOD> <path>` measure on the browser performance
+// timeline, so queries show up in the Performance panel's flame view.
+const tracedFetch: typeof fetch = async (input, init) => {
+  const start = performance.now();
+  try {
+    return await fetch(input, init);
+  } finally {
+    const url = input instanceof Request ? input.url : input.toString();
+    const path = new URL(url).pathname.replace(/^\/(rest|auth)\/v1/, "");
+    performance.measure(`db:${init?.method ?? "GET"} ${path}`, {
+      start,
+      end: performance.now(),
+    });
+  }
+};
+
+// The page's one client: each client runs its own token-refresh timer and
+// auth listeners, so nothing else should create one (isSingleton also
+// makes repeated evaluations of this module share it).
+export const supabase = createBrowserClient(supabaseUrl, supabaseAnonKey, {
+  global: { fetch: tracedFetch },
+  isSingleton: true,
+});
 
 // Database types
 export interface Database {
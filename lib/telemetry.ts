@@ -0,0 +1,182 @@
+import { AsyncLocalStorage } from "node:async_hooks";
+
+type AttributeValue = string | number | boolean;
+
+export interface Span {
+  traceId: string;
+  spanId: string;
+  parentSpanId?: string;
+  name: string;
+  startTime: number;
+  endTime?: number;
+  attributes: Record<string, AttributeValue>;
+  error?: string;
+}
+
+export interface Trace {
+  traceId: string;
+  rootSpanId: string;
+  parentSpanId?: string;
+  spans: Span[];
+}
+
+interface TelemetryContext {
+  trace: Trace;
+  span: Span;
+}
+
+const storage = new AsyncLocalStorage<TelemetryContext>();
+
+const OTLP_ENDPOINT = process.env.OTEL_EXPORTER_OTLP_ENDPOINT;
+const SERVICE_NAME = process.env.OTEL_SERVICE_NAME || "polymind";
+
+const now = () => performance.timeOrigin + performance.now();
+
+const randomHex = (bytes: number) =>
+  Array.from(crypto.getRandomValues(new Uint8Array(bytes)), (b) =>
+    b.toString(16).padStart(2, "0")
+  ).join("");
+
+const parseTraceparent = (header: string | null) => {
+  const match = header?.match(/^00-([0-9a-f]{32})-([0-9a-f]{16})-[0-9a-f]{2}$/);
+  return match ? { traceId: match[1], parentSpanId: match[2] } : null;
+};
+
+export const traceparent = (span: Span) =>
+  `00-${span.traceId}-${span.spanId}-01`;
+
+export const currentSpan = () => storage.getStore()?.span;
+
+// Starts a new trace (or continues one from an incoming `traceparent`
+// header) and runs `fn` with its root span as the active span.
+export async function withTrace<T>(
+  name: string,
+  headers: Headers | null,
+  fn: (span: Span, trace: Trace) => Promise<T>,
+  attributes: Record<string, AttributeValue> = {}
+): Promise<T> {
+  const parent = parseTraceparent(headers?.get("traceparent") ?? null);
+  const root: Span = {
+    traceId: parent?.traceId ?? randomHex(16),
+    spanId: randomHex(8),
+    parentSpanId: parent?.parentSpanId,
+    name,
+    startTime: now(),
+    attributes,
+  };
+  const trace: Trace = {
+    traceId: root.traceId,
+    rootSpanId: root.spanId,
+    parentSpanId: parent?.parentSpanId,
+    spans: [root],
+  };
+
+  try {
+    return await storage.run({ trace, span: root }, () => fn(root, trace));
+  } catch (error) {
+    root.error = error instanceof Error ? error.message : String(error);
+    throw error;
+  } finally {
+    root.endTime = now();
+    exportTrace(trace);
+  }
+}
+
+// Runs `fn` as a child of the active span. Outside a trace this is a plain
+// call, so instrumented helpers stay usable from scripts and tests.
+export async function withSpan<T>(
+  name: string,
+  fn: (span: Span) => Promise<T>,
+  attributes: Record<string, AttributeValue> = {}
+): Promise<T> {
+  const context = storage.getStore();
+  const span: Span = {
+    traceId: context?.trace.traceId ?? randomHex(16),
+    spanId: randomHex(8),
+    parentSpanId: context?.span.spanId,
+    name,
+    startTime: now(),
+    attributes,
+  };
+  if (!context) return fn(span);
+
+  context.trace.spans.push(span);
+  try {
+    return await storage.run({ trace: context.trace, span }, () => fn(span));
+  } catch (error) {
+    span.error = error instanceof Error ? error.message : String(error);
+    throw error;
+  } finally {
+    span.endTime = now();
+  }
+}
+
+const metricName = (name: string) =>
+  name.replace(/[^A-Za-z0-9!#$%&'*+.^_`|~-]/g, "_");
+
+// Summarizes finished spans as a Server-Timing header value, e.g.
+// `parse;dur=0.4, generate_openai_gpt-5-chat;dur=812.3;desc="ttft 301ms"`.
+export function serverTiming(trace: Trace): string {
+  return trace.spans
+    .filter((span) => span.endTime !== undefined)
+    .map((span) => {
+      const duration = (span.endTime! - span.startTime).toFixed(1);
+      const model = span.attributes["model.id"];
+      const name = metricName(model ? `${span.name}_${model}` : span.name);
+      const ttft = span.attributes["ai.ttft_ms"];
+      const desc = ttft !== undefined ? `;desc="ttft ${ttft}ms"` : "";
+      return `${name};dur=${duration}${desc}`;
+    })
+    .join(", ");
+}
+
+const toOtlpValue = (value: AttributeValue) =>
+  typeof value === "string"
+    ? { stringValue: value }
+    : typeof value === "boolean"
+    ? { boolValue: value }
+    : Number.isInteger(value)
+    ? { intValue: String(value) }
+    : { doubleValue: value };
+
+const toUnixNano = (ms: number) =>
+  (BigInt(Math.round(ms * 1000)) * BigInt(1000)).toString();
+
+// Sends the trace to an OTLP/HTTP collector when
+// OTEL_EXPORTER_OTLP_ENDPOINT is set. Fire-and-forget: telemetry must never
+// add latency to, or fail, the request being measured.
+function exportTrace(trace: Trace) {
+  if (!OTLP_ENDPOINT) return;
+
+  const spans = trace.spans.map((span) => ({
+    traceId: span.traceId,
+    spanId: span.spanId,
+    parentSpanId: span.parentSpanId ?? "",
+    name: span.name,
+    kind: span.spanId === trace.rootSpanId ? 2 : 1,
+    startTimeUnixNano: toUnixNano(span.startTime),
+    endTimeUnixNano: toUnixNano(span.endTime ?? now()),
+    attributes: Object.entries(span.attributes).map(([key, value]) => ({
+      key,
+      value: toOtlpValue(value),
+    })),
+    status: span.error ? { code: 2, message: span.error } : { code: 1 },
+  }));
+
+  fetch(`${OTLP_ENDPOINT.replace(/\/$/, "")}/v1/traces`, {
+    method: "POST",
+    headers: { "Content-Type": "application/json" },
+    body: JSON.stringify({
+      resourceSpans: [
+        {
+          resource: {
+            attributes: [
+              { key: "service.name", value: { stringValue: SERVICE_NAME } },
+            ],
+          },
+          scopeSpans: [{ scope: { name: "polymind" }, spans }],
+        },
+      ],
+    }),
+  }).catch(() => {});
+}
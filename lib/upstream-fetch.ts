@@ -0,0 +1,252 @@
+import http from "node:http";
+import http2 from "node:http2";
+import https from "node:https";
+import { Readable } from "node:stream";
+import { currentSpan } from "@/lib/telemetry";
+
+// fetch for upstream model calls over long-lived connections. HTTPS origins
+// get one multiplexed HTTP/2 session, so a send fanning out to four models
+// costs at most one TLS handshake; origins that don't negotiate h2 (and
+// plain-HTTP ones such as tools/mock_openrouter.py) use a keep-alive agent.
+// Node only.
+
+const HTTP2_ENABLED = process.env.UPSTREAM_HTTP2 !== "0";
+const MAX_SOCKETS = Number(process.env.UPSTREAM_MAX_SOCKETS) || 16;
+const IDLE_TIMEOUT_MS = Number(process.env.UPSTREAM_IDLE_TIMEOUT_MS) || 60000;
+
+const agentOptions = {
+  keepAlive: true,
+  maxSockets: MAX_SOCKETS,
+  maxFreeSockets: MAX_SOCKETS,
+  timeout: IDLE_TIMEOUT_MS,
+};
+const agents = {
+  "http:": new http.Agent(agentOptions),
+  "https:": new https.Agent(agentOptions),
+};
+
+const sessions = new Map<string, Promise<http2.ClientHttp2Session>>();
+// Origins whose server turned h2 down in ALPN. Other connect failures (DNS,
+// resets, timeouts) only send that one request over HTTP/1.1.
+const http1Origins = new Set<string>();
+
+// The TLS alert a server sends when it shares no ALPN protocol with us
+const NO_APPLICATION_PROTOCOL = "ERR_SSL_TLSV1_ALERT_NO_APPLICATION_PROTOCOL";
+
+class NoHttp2Error extends Error {}
+
+// Hop-by-hop headers, and Accept-Encoding: responses are left uncompressed
+// since this fetch does not decode them (streamed SSE gains nothing anyway).
+const DROPPED_HEADERS = [
+  "connection",
+  "keep-alive",
+  "host",
+  "transfer-encoding",
+  "accept-encoding",
+];
+const NULL_BODY_STATUSES = [101, 204, 205, 304];
+
+export interface UpstreamPoolStats {
+  origin: string;
+  protocol: "h2" | "http/1.1";
+  requests: number;
+  connections: number;
+  reuseRate: number;
+}
+
+const stats = new Map<string, Omit<UpstreamPoolStats, "reuseRate">>();
+
+function count(origin: string, protocol: "h2" | "http/1.1", reused: boolean) {
+  const entry = stats.get(origin) ?? {
+    origin,
+    protocol,
+    requests: 0,
+    connections: 0,
+  };
+  entry.protocol = protocol;
+  entry.requests += 1;
+  if (!reused) entry.connections += 1;
+  stats.set(origin, entry);
+
+  const span = currentSpan();
+  if (span) {
+    span.attributes["network.protocol.name"] = protocol;
+    span.attributes["network.connection.reused"] = reused;
+  }
+}
+
+export const upstreamPoolStats = (): UpstreamPoolStats[] =>
+  Array.from(stats.values(), (entry) => ({
+    ...entry,
+    reuseRate:
+      entry.requests === 0
+        ? 0
+        : Math.round((1 - entry.connections / entry.requests) * 1000) / 1000,
+  }));
+
+function connect(origin: string): Promise<http2.ClientHttp2Session> {
+  const pending = new Promise<http2.ClientHttp2Session>((resolve, reject) => {
+    const session = http2.connect(origin);
+    const forget = () => {
+      if (sessions.get(origin) === pending) sessions.delete(origin);
+    };
+    session.once("connect", () => {
+      // A server without ALPN still completes the handshake
+      if (session.alpnProtocol !== "h2") {
+        forget();
+        session.destroy();
+        reject(new NoHttp2Error(`${origin} did not negotiate h2`));
+        return;
+      }
+      session.setTimeout(IDLE_TIMEOUT_MS, () => session.close());
+      session.unref();
+      resolve(session);
+    });
+    session.once("error", (error: NodeJS.ErrnoException) => {
+      forget();
+      reject(
+        error.code === NO_APPLICATION_PROTOCOL
+          ? new NoHttp2Error(`${origin} does not offer h2`)
+          : error
+      );
+    });
+    session.once("goaway", forget);
+    session.once("close", forget);
+  });
+  sessions.set(origin, pending);
+  return pending;
+}
+
+// Resolves to a live session (and whether it already existed), or null when
+// the origin should be spoken to over HTTP/1.1.
+async function sessionFor(
+  url: URL
+): Promise<{ session: http2.ClientHttp2Session; reused: boolean } | null> {
+  if (!HTTP2_ENABLED || url.protocol !== "https:") return null;
+  if (http1Origins.has(url.origin)) return null;
+
+  const existing = sessions.get(url.origin);
+  try {
+    const session = await (existing ?? connect(url.origin));
+    if (session.closed || session.destroyed) {
+      sessions.delete(url.origin);
+      return sessionFor(url);
+    }
+    return { session, reused: Boolean(existing) };
+  } catch (error) {
+    // No h2 via ALPN: stick to HTTP/1.1 for the origin. Any other failure
+    // may be a blip, so the next request tries h2 again.
+    if (error instanceof NoHttp2Error) http1Origins.add(url.origin);
+    return null;
+  }
+}
+
+function toHeaders(
+  source: http.IncomingHttpHeaders | http2.IncomingHttpHeaders
+) {
+  const headers = new Headers();
+  for (const [name, value] of Object.entries(source)) {
+    if (name.startsWith(":") || value === undefined) continue;
+    for (const item of Array.isArray(value) ? value : [value]) {
+      headers.append(name, String(item));
+    }
+  }
+  return headers;
+}
+
+const toResponse = (
+  status: number,
+  statusText: string,
+  headers: Headers,
+  body: Readable
+) =>
+  new Response(
+    NULL_BODY_STATUSES.includes(status)
+      ? null
+      : (Readable.toWeb(body) as ReadableStream<Uint8Array>),
+    { status, statusText, headers }
+  );
+
+export const pooledFetch: typeof fetch = async (input, init) => {
+  const request = new Request(input, init);
+  const url = new URL(request.url);
+  const signal = request.signal;
+  signal.throwIfAborted();
+
+  const headers: Record<string, string> = {};
+  request.headers.forEach((value, name) => {
+    if (!DROPPED_HEADERS.includes(name)) headers[name] = value;
+  });
+  const body =
+    request.body === null ? null : Buffer.from(await request.arrayBuffer());
+  if (body) headers["content-length"] = String(body.length);
+
+  const h2 = await sessionFor(url);
+  if (h2) {
+    count(url.origin, "h2", h2.reused);
+    return new Promise<Response>((resolve, reject) => {
+      const stream = h2.session.request({
+        ...headers,
+        ":method": request.method,
+        ":path": url.pathname + url.search,
+      });
+      const abort = () => {
+        stream.close(http2.constants.NGHTTP2_CANCEL);
+        reject(signal.reason);
+      };
+      signal.addEventListener("abort", abort, { once: true });
+      stream.once("response", (responseHeaders) => {
+        resolve(
+          toResponse(
+            Number(responseHeaders[":status"]),
+            "",
+            toHeaders(responseHeaders),
+            stream
+          )
+        );
+      });
+      stream.once("error", reject);
+      stream.once("close", () => signal.removeEventListener("abort", abort));
+      stream.end(body ?? undefined);
+    });
+  }
+
+  const protocol = url.protocol as keyof typeof agents;
+  return new Promise<Response>((resolve, reject) => {
+    const client = protocol === "https:" ? https : http;
+    const req = client.request(url, {
+      method: request.method,
+      headers,
+      agent: agents[protocol],
+      signal,
+    });
+    req.once("socket", () => count(url.origin, "http/1.1", req.reusedSocket));
+    req.once("response", (res) => {
+      resolve(
+        toResponse(
+          res.statusCode ?? 0,
+          res.statusMessage ?? "",
+          toHeaders(res.headers),
+          res
+        )
+      );
+    });
+    req.once("error", reject);
+    req.end(body ?? undefined);
+  });
+};
+
+// Opens the connection to `baseURL` ahead of the first user request so it
+// does not pay for DNS, TCP and TLS setup.
+export async function warmUpstream(baseURL: string) {
+  const url = new URL(baseURL);
+  try {
+    if (await sessionFor(url)) return;
+    const modelsURL = `${baseURL.replace(/\/$/, "")}/models`;
+    const response = await pooledFetch(modelsURL, { method: "HEAD" });
+    // Drained rather than cancelled, which would destroy the socket.
+    await response.arrayBuffer();
+  } catch (error) {
+    console.warn(`Upstream warm-up for ${url.origin} failed:`, error);
+  }
+}
@@ -5,8 +5,11 @@ export async function middleware(request: NextRequest) {
   return await updateSession(request);
 }
 
+// Images are skipped only at the top level, where public/ serves them: any
+// path that reaches a page or route handler must pass through here, since
+// that is what strips client-sent copies of the user headers.
 export const config = {
   matcher: [
-    "/((?!_next/static|_next/image|favicon.ico|.*\\.(?:svg|png|jpg|jpeg|gif|webp)$).*)",
+    "/((?!_next/static|_next/image|favicon.ico|api/rum|sw\\.js|[^/]+\\.(?:svg|png|jpg|jpeg|gif|webp)$).*)",
   ],
 };
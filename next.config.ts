@@ -1,7 +1,39 @@
 import type { NextConfig } from "next";
 
+// Versions the service worker's caches (public/sw.js): each build's static
+// assets and shell are cached apart from the previous build's.
+const BUILD_ID = process.env.BUILD_ID || Date.now().toString(36);
+
 const nextConfig: NextConfig = {
-  /* config options here */
+  generateBuildId: async () => BUILD_ID,
+  env: { NEXT_PUBLIC_BUILD_ID: BUILD_ID },
+  // CHAT_RUNTIME=edge serves /api/chat from the Edge copy of the route.
+  // Rewrites are resolved at build time, so set it for `next build`.
+  async rewrites() {
+    return {
+      beforeFiles:
+        process.env.CHAT_RUNTIME === "edge"
+          ? [
+              { source: "/api/chat", destination: "/api/chat/edge" },
+              {
+                source: "/api/chat/:action(cancel|resume)",
+                destination: "/api/chat/edge/:action",
+              },
+            ]
+          : [],
+      afterFiles: [],
+      fallback: [],
+    };
+  },
+  // The service worker is checked for updates on every visit.
+  async headers() {
+    return [
+      {
+        source: "/sw.js",
+        headers: [{ key: "Cache-Control", value: "no-cache" }],
+      },
+    ];
+  },
 };
 
 export default nextConfig;
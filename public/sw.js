@@ -0,0 +1,210 @@
+// PolyMind service worker.
+//
+// - Delivers chat sends queued while offline (see lib/outbox.ts, whose
+//   database layout and request this mirrors) when Background Sync reports
+//   the connection is back, even if no tab is open.
+// - In production builds, registered as `/sw.js?v=<build id>` (see
+//   lib/service-worker.ts), keeps the app shell and the build's static
+//   assets cached: `/` is fetched from the network and kept for when the
+//   network is unreachable, and the content-hashed files under
+//   `/_next/static/` are served from the cache outright. Each build gets
+//   its own caches; older ones are dropped when it activates.
+
+const DB_NAME = "polymind";
+const DB_VERSION = 1;
+const STORE = "outbox";
+const OUTBOX_SYNC_TAG = "chat-outbox";
+
+const VERSION = new URL(self.location.href).searchParams.get("v");
+const SHELL_CACHE = `polymind-shell-${VERSION}`;
+const STATIC_CACHE = `polymind-static-${VERSION}`;
+// Pages served from the shell cache
+const SHELL_ROUTES = ["/"];
+
+// Cache lookups since a page last asked for them
+const emptyStats = () => ({
+  shell: { hits: 0, misses: 0 },
+  static: { hits: 0, misses: 0 },
+});
+let stats = emptyStats();
+
+self.addEventListener("install", (event) => {
+  self.skipWaiting();
+  if (VERSION) event.waitUntil(precache().catch(() => {}));
+});
+
+self.addEventListener("activate", (event) =>
+  event.waitUntil(
+    (async () => {
+      const current = [SHELL_CACHE, STATIC_CACHE];
+      const names = await caches.keys();
+      await Promise.all(
+        names
+          .filter((name) => name.startsWith("polymind-"))
+          .filter((name) => !current.includes(name))
+          .map((name) => caches.delete(name))
+      );
+      await self.clients.claim();
+    })()
+  )
+);
+
+self.addEventListener("fetch", (event) => {
+  const { request } = event;
+  if (!VERSION || request.method !== "GET") return;
+  const url = new URL(request.url);
+  if (url.origin !== self.location.origin) return;
+
+  if (request.mode === "navigate" && SHELL_ROUTES.includes(url.pathname)) {
+    event.respondWith(serveShell(event, url.pathname));
+  } else if (url.pathname.startsWith("/_next/static/")) {
+    event.respondWith(serveStatic(request));
+  }
+});
+
+self.addEventListener("message", (event) => {
+  if (event.data?.type !== "cache-stats") return;
+  event.ports[0]?.postMessage(stats);
+  stats = emptyStats();
+});
+
+// Only the page itself is worth keeping: not a redirect (to /login) and not
+// an error page.
+const isCacheable = (response) =>
+  response.ok && !response.redirected && response.type === "basic";
+
+// Fetches a shell page and keeps the copy for next time.
+async function refreshShell(request, path) {
+  const response = await fetch(request);
+  if (isCacheable(response)) {
+    const cache = await caches.open(SHELL_CACHE);
+    await cache.put(path, response.clone());
+  }
+  return response;
+}
+
+// The shell embeds the signed-in user, so the network copy always wins and
+// the cached one only stands in when the network is unreachable (offline).
+// lib/service-worker.ts drops the cache whenever the user changes.
+async function serveShell(event, path) {
+  try {
+    return await refreshShell(event.request, path);
+  } catch (error) {
+    const cached = await caches.match(path, { cacheName: SHELL_CACHE });
+    if (!cached) {
+      stats.shell.misses += 1;
+      throw error;
+    }
+    stats.shell.hits += 1;
+    return cached;
+  }
+}
+
+async function serveStatic(request) {
+  const cache = await caches.open(STATIC_CACHE);
+  const cached = await cache.match(request);
+  if (cached) {
+    stats.static.hits += 1;
+    return cached;
+  }
+  stats.static.misses += 1;
+  const response = await fetch(request);
+  if (response.ok) cache.put(request, response.clone());
+  return response;
+}
+
+// Caches the shell and every static asset it references, so the first
+// repeat visit is already served locally.
+async function precache() {
+  const response = await refreshShell("/", "/");
+  if (!isCacheable(response)) return;
+  const html = await response.text();
+  const assets = new Set(html.match(/\/_next\/static\/[^"'\s)\\]+/g));
+  const cache = await caches.open(STATIC_CACHE);
+  await Promise.allSettled(Array.from(assets, (asset) => cache.add(asset)));
+}
+
+function openOutbox() {
+  return new Promise((resolve, reject) => {
+    const request = indexedDB.open(DB_NAME, DB_VERSION);
+    request.onupgradeneeded = () =>
+      request.result.createObjectStore(STORE, { keyPath: "sendId" });
+    request.onsuccess = () => resolve(request.result);
+    request.onerror = () => reject(request.error);
+  });
+}
+
+function transact(db, mode, body) {
+  const transaction = db.transaction(STORE, mode);
+  body(transaction.objectStore(STORE));
+  return new Promise((resolve, reject) => {
+    transaction.oncomplete = () => resolve();
+    transaction.onerror = () => reject(transaction.error);
+    transaction.onabort = () => reject(transaction.error);
+  });
+}
+
+// Removes and returns the oldest entry, in one transaction so a page
+// delivering at the same time never takes it too.
+async function takeFromOutbox(db) {
+  let entry;
+  await transact(db, "readwrite", (store) => {
+    const request = store.getAll();
+    request.onsuccess = () => {
+      entry = request.result.sort((a, b) => a.queuedAt - b.queuedAt)[0];
+      if (entry) store.delete(entry.sendId);
+    };
+  });
+  return entry;
+}
+
+async function notifyClients(message) {
+  const clients = await self.clients.matchAll({ type: "window" });
+  clients.forEach((client) => client.postMessage(message));
+}
+
+// Delivers the queued sends oldest first. The server saves each send's
+// prompt and answers; reading the answers to the end only tells open tabs
+// when they are in. Throwing leaves the rest queued and has the browser
+// retry the sync later.
+async function deliverOutbox() {
+  const db = await openOutbox();
+  for (;;) {
+    const entry = await takeFromOutbox(db);
+    if (!entry) return;
+
+    const response = await fetch("/api/chat", {
+      method: "POST",
+      headers: { "Content-Type": "application/json" },
+      body: JSON.stringify({
+        message: entry.message,
+        modelIds: entry.modelIds,
+        history: entry.history,
+        sendId: entry.sendId,
+        persist: {
+          sessionId: entry.sessionId,
+          messageId: entry.messageId,
+          sentAt: entry.queuedAt,
+        },
+      }),
+    }).catch(() => undefined);
+    const delivered =
+      response &&
+      (response.ok || response.status === 409 || response.status === 400);
+    if (!delivered) {
+      await transact(db, "readwrite", (store) => store.put(entry));
+      throw new Error("Outbox delivery failed; will retry");
+    }
+
+    await response.text().catch(() => {});
+    await notifyClients({
+      type: "outbox-delivered",
+      sendId: entry.sendId,
+      sessionId: entry.sessionId,
+    });
+  }
+}
+
+self.addEventListener("sync", (event) => {
+  if (event.tag === OUTBOX_SYNC_TAG) event.waitUntil(deliverOutbox());
+});
@@ -0,0 +1,56 @@
+-- Create rum_aggregates table: perceived-latency samples from /api/rum,
+-- folded per day, route, metric and model. `histogram` holds counts for the
+-- bucket upper bounds defined in app/api/rum/route.ts (last bucket = overflow).
+CREATE TABLE IF NOT EXISTS rum_aggregates (
+  day DATE NOT NULL,
+  route TEXT NOT NULL,
+  metric TEXT NOT NULL,
+  model_id TEXT NOT NULL DEFAULT '',
+  count BIGINT NOT NULL DEFAULT 0,
+  sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+  max DOUBLE PRECISION NOT NULL DEFAULT 0,
+  histogram BIGINT[] NOT NULL,
+  updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+  PRIMARY KEY (day, route, metric, model_id)
+);
+
+-- Enable RLS (no policies: rows are only written through record_rum_samples)
+ALTER TABLE rum_aggregates ENABLE ROW LEVEL SECURITY;
+
+-- Merge a batch of pre-aggregated samples into the daily rows
+CREATE OR REPLACE FUNCTION public.record_rum_samples(samples JSONB)
+RETURNS VOID AS $$
+BEGIN
+  INSERT INTO public.rum_aggregates AS r
+    (day, route, metric, model_id, count, sum, max, histogram)
+  SELECT
+    CURRENT_DATE,
+    LEFT(s.route, 200),
+    LEFT(s.metric, 64),
+    LEFT(COALESCE(s.model_id, ''), 200),
+    s.count,
+    s.sum,
+    s.max,
+    s.histogram
+  FROM jsonb_to_recordset(samples) AS s(
+    route TEXT,
+    metric TEXT,
+    model_id TEXT,
+    count BIGINT,
+    sum DOUBLE PRECISION,
+    max DOUBLE PRECISION,
+    histogram BIGINT[]
+  )
+  ON CONFLICT (day, route, metric, model_id) DO UPDATE SET
+    count = r.count + EXCLUDED.count,
+    sum = r.sum + EXCLUDED.sum,
+    max = GREATEST(r.max, EXCLUDED.max),
+    histogram = (
+      SELECT ARRAY_AGG(COALESCE(a, 0) + COALESCE(b, 0) ORDER BY i)
+      FROM UNNEST(r.histogram, EXCLUDED.histogram) WITH ORDINALITY AS t(a, b, i)
+    ),
+    updated_at = NOW();
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
+
+GRANT EXECUTE ON FUNCTION public.record_rum_samples(JSONB) TO anon, authenticated;
@@ -0,0 +1,72 @@
+-- Create message_usage table: one row per AI response. `id` is the
+-- response id, which is also the id the AI message is stored under in
+-- messages (rows are written before the client persists the message, so
+-- there is no foreign key).
+CREATE TABLE IF NOT EXISTS message_usage (
+  id UUID PRIMARY KEY,
+  user_id UUID REFERENCES users(id) ON DELETE CASCADE NOT NULL,
+  model_id TEXT NOT NULL,
+  prompt_tokens INTEGER NOT NULL DEFAULT 0,
+  completion_tokens INTEGER NOT NULL DEFAULT 0,
+  latency_ms INTEGER NOT NULL DEFAULT 0,
+  cost_usd NUMERIC(12, 6) NOT NULL DEFAULT 0,
+  created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+-- Create usage_daily table: per user per day rollup of message_usage
+CREATE TABLE IF NOT EXISTS usage_daily (
+  user_id UUID REFERENCES users(id) ON DELETE CASCADE NOT NULL,
+  day DATE NOT NULL,
+  requests INTEGER NOT NULL DEFAULT 0,
+  prompt_tokens BIGINT NOT NULL DEFAULT 0,
+  completion_tokens BIGINT NOT NULL DEFAULT 0,
+  cost_usd NUMERIC(14, 6) NOT NULL DEFAULT 0,
+  updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+  PRIMARY KEY (user_id, day)
+);
+
+-- Enable RLS
+ALTER TABLE message_usage ENABLE ROW LEVEL SECURITY;
+ALTER TABLE usage_daily ENABLE ROW LEVEL SECURITY;
+
+-- Create policies
+CREATE POLICY "Users can view own usage" ON message_usage
+  FOR SELECT USING (auth.uid() = user_id);
+
+CREATE POLICY "Users can insert own usage" ON message_usage
+  FOR INSERT WITH CHECK (auth.uid() = user_id);
+
+CREATE POLICY "Users can view own daily usage" ON usage_daily
+  FOR SELECT USING (auth.uid() = user_id);
+
+-- Incremental rollup: fold each new usage row into its day instead of
+-- re-aggregating message_usage
+CREATE OR REPLACE FUNCTION public.rollup_message_usage()
+RETURNS TRIGGER AS $$
+BEGIN
+  INSERT INTO public.usage_daily AS d
+    (user_id, day, requests, prompt_tokens, completion_tokens, cost_usd)
+  VALUES (
+    NEW.user_id,
+    (NEW.created_at AT TIME ZONE 'UTC')::DATE,
+    1,
+    NEW.prompt_tokens,
+    NEW.completion_tokens,
+    NEW.cost_usd
+  )
+  ON CONFLICT (user_id, day) DO UPDATE SET
+    requests = d.requests + 1,
+    prompt_tokens = d.prompt_tokens + EXCLUDED.prompt_tokens,
+    completion_tokens = d.completion_tokens + EXCLUDED.completion_tokens,
+    cost_usd = d.cost_usd + EXCLUDED.cost_usd,
+    updated_at = NOW();
+  RETURN NEW;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
+
+CREATE TRIGGER on_message_usage_created
+  AFTER INSERT ON message_usage
+  FOR EACH ROW EXECUTE FUNCTION public.rollup_message_usage();
+
+-- Create indexes for better performance
+CREATE INDEX idx_message_usage_user_id_created_at ON message_usage(user_id, created_at DESC);
@@ -0,0 +1,35 @@
+-- Track prompt tokens served from provider prompt caches. They are a
+-- subset of prompt_tokens, so cache hit rate = cached / prompt.
+ALTER TABLE message_usage
+  ADD COLUMN IF NOT EXISTS cached_prompt_tokens INTEGER NOT NULL DEFAULT 0;
+
+ALTER TABLE usage_daily
+  ADD COLUMN IF NOT EXISTS cached_prompt_tokens BIGINT NOT NULL DEFAULT 0;
+
+-- Fold the new column into the daily rollup
+CREATE OR REPLACE FUNCTION public.rollup_message_usage()
+RETURNS TRIGGER AS $$
+BEGIN
+  INSERT INTO public.usage_daily AS d
+    (user_id, day, requests, prompt_tokens, cached_prompt_tokens,
+     completion_tokens, cost_usd)
+  VALUES (
+    NEW.user_id,
+    (NEW.created_at AT TIME ZONE 'UTC')::DATE,
+    1,
+    NEW.prompt_tokens,
+    NEW.cached_prompt_tokens,
+    NEW.completion_tokens,
+    NEW.cost_usd
+  )
+  ON CONFLICT (user_id, day) DO UPDATE SET
+    requests = d.requests + 1,
+    prompt_tokens = d.prompt_tokens + EXCLUDED.prompt_tokens,
+    cached_prompt_tokens =
+      d.cached_prompt_tokens + EXCLUDED.cached_prompt_tokens,
+    completion_tokens = d.completion_tokens + EXCLUDED.completion_tokens,
+    cost_usd = d.cost_usd + EXCLUDED.cost_usd,
+    updated_at = NOW();
+  RETURN NEW;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
@@ -0,0 +1,102 @@
+-- Create chat_jobs table: one row per model per send when /api/chat runs in
+-- queue mode (CHAT_QUEUE=1). Workers (CHAT_WORKER=1) claim queued rows,
+-- stream the model's text into `content` as it arrives and store the final
+-- AIResponse in `response`; clients follow their rows over Realtime.
+CREATE TABLE IF NOT EXISTS chat_jobs (
+  id UUID DEFAULT gen_random_uuid() PRIMARY KEY,
+  user_id UUID REFERENCES users(id) ON DELETE CASCADE NOT NULL,
+  send_id UUID NOT NULL,
+  model_id TEXT NOT NULL,
+  message TEXT NOT NULL,
+  history JSONB NOT NULL DEFAULT '[]',
+  status TEXT NOT NULL DEFAULT 'queued'
+    CHECK (status IN ('queued', 'running', 'done', 'failed', 'cancelled')),
+  content TEXT NOT NULL DEFAULT '',
+  response JSONB,
+  attempts INTEGER NOT NULL DEFAULT 0,
+  locked_by TEXT,
+  -- Refreshed by the worker while it runs the job; a running job whose
+  -- lock goes stale is handed to another worker.
+  locked_at TIMESTAMP WITH TIME ZONE,
+  created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+  updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+-- Enable RLS (workers use the service role, which bypasses it)
+ALTER TABLE chat_jobs ENABLE ROW LEVEL SECURITY;
+
+-- Create policies
+CREATE POLICY "Users can view own jobs" ON chat_jobs
+  FOR SELECT USING (auth.uid() = user_id);
+
+CREATE POLICY "Users can queue own jobs" ON chat_jobs
+  FOR INSERT WITH CHECK (auth.uid() = user_id AND status = 'queued');
+
+-- Claim up to `max_jobs` jobs for `worker`, oldest first. SKIP LOCKED lets
+-- any number of workers poll at once without blocking on, or double
+-- claiming, each other's rows. Jobs whose lock went stale are retried
+-- until they have been attempted `max_attempts` times, then failed.
+CREATE OR REPLACE FUNCTION public.claim_chat_jobs(
+  worker TEXT,
+  max_jobs INTEGER,
+  stale_after INTERVAL DEFAULT INTERVAL '2 minutes',
+  max_attempts INTEGER DEFAULT 3
+)
+RETURNS SETOF public.chat_jobs AS $$
+BEGIN
+  UPDATE public.chat_jobs
+  SET status = 'failed', locked_by = NULL, updated_at = NOW()
+  WHERE status = 'running'
+    AND locked_at < NOW() - stale_after
+    AND attempts >= max_attempts;
+
+  RETURN QUERY
+  UPDATE public.chat_jobs AS j
+  SET status = 'running',
+      locked_by = worker,
+      locked_at = NOW(),
+      attempts = j.attempts + 1,
+      updated_at = NOW()
+  WHERE j.id IN (
+    SELECT c.id FROM public.chat_jobs AS c
+    WHERE c.status = 'queued'
+      OR (c.status = 'running' AND c.locked_at < NOW() - stale_after)
+    ORDER BY c.created_at
+    LIMIT max_jobs
+    FOR UPDATE SKIP LOCKED
+  )
+  RETURNING j.*;
+END;
+$$ LANGUAGE plpgsql SET search_path = public;
+
+REVOKE EXECUTE ON FUNCTION public.claim_chat_jobs(TEXT, INTEGER, INTERVAL, INTEGER)
+  FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION public.claim_chat_jobs(TEXT, INTEGER, INTERVAL, INTEGER)
+  TO service_role;
+
+-- Cancel the caller's unfinished jobs of a send (all models when
+-- `model_ids` is NULL). A running job's worker notices on its next write
+-- and aborts the upstream call. Returns the model ids that were cancelled.
+CREATE OR REPLACE FUNCTION public.cancel_chat_jobs(
+  cancel_send_id UUID,
+  model_ids TEXT[] DEFAULT NULL
+)
+RETURNS SETOF TEXT AS $$
+  UPDATE public.chat_jobs
+  SET status = 'cancelled', updated_at = NOW()
+  WHERE send_id = cancel_send_id
+    AND user_id = auth.uid()
+    AND status IN ('queued', 'running')
+    AND (model_ids IS NULL OR model_id = ANY (model_ids))
+  RETURNING model_id;
+$$ LANGUAGE sql SECURITY DEFINER SET search_path = public;
+
+GRANT EXECUTE ON FUNCTION public.cancel_chat_jobs(UUID, TEXT[]) TO authenticated;
+
+-- Create indexes for better performance
+CREATE INDEX idx_chat_jobs_queued ON chat_jobs(created_at) WHERE status = 'queued';
+CREATE INDEX idx_chat_jobs_running ON chat_jobs(locked_at) WHERE status = 'running';
+CREATE INDEX idx_chat_jobs_send_id ON chat_jobs(send_id);
+
+-- Stream row changes to subscribed clients (subject to the policies above)
+ALTER PUBLICATION supabase_realtime ADD TABLE chat_jobs;
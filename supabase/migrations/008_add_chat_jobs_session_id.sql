@@ -0,0 +1,5 @@
+-- Sends delivered from the offline outbox are saved by the server. In queue
+-- mode that falls to the workers: each job of such a send names the session
+-- its answer is saved into.
+ALTER TABLE chat_jobs
+  ADD COLUMN IF NOT EXISTS session_id UUID REFERENCES chat_sessions(id) ON DELETE CASCADE;
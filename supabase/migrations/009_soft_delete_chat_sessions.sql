@@ -0,0 +1,89 @@
+-- Soft delete for chat sessions. Deleting a session only stamps
+-- `deleted_at`, a one-row update; its messages are removed later, in
+-- bounded batches, by purge_deleted_chat_sessions. A cascading DELETE of a
+-- long session instead held its locks (and evaluated the messages policy
+-- per row) for as long as the whole cascade took.
+ALTER TABLE chat_sessions
+  ADD COLUMN IF NOT EXISTS deleted_at TIMESTAMP WITH TIME ZONE;
+
+-- The sessions the app shows. security_invoker keeps the table's policies
+-- in force for whoever queries the view.
+CREATE OR REPLACE VIEW live_chat_sessions
+WITH (security_invoker = true) AS
+  SELECT * FROM chat_sessions WHERE deleted_at IS NULL;
+
+GRANT SELECT ON live_chat_sessions TO authenticated;
+
+-- Messages of a deleted session are hidden and closed to new writes
+DROP POLICY IF EXISTS "Users can view messages from own sessions" ON messages;
+CREATE POLICY "Users can view messages from own sessions" ON messages
+  FOR SELECT USING (
+    EXISTS (
+      SELECT 1 FROM chat_sessions
+      WHERE chat_sessions.id = messages.session_id
+      AND chat_sessions.user_id = auth.uid()
+      AND chat_sessions.deleted_at IS NULL
+    )
+  );
+
+DROP POLICY IF EXISTS "Users can insert messages to own sessions" ON messages;
+CREATE POLICY "Users can insert messages to own sessions" ON messages
+  FOR INSERT WITH CHECK (
+    EXISTS (
+      SELECT 1 FROM chat_sessions
+      WHERE chat_sessions.id = messages.session_id
+      AND chat_sessions.user_id = auth.uid()
+      AND chat_sessions.deleted_at IS NULL
+    )
+  );
+
+-- Live sessions are listed per user, newest first; deleted ones are only
+-- looked up by the purge. Each index covers just its side.
+DROP INDEX IF EXISTS idx_chat_sessions_user_id;
+CREATE INDEX idx_chat_sessions_live ON chat_sessions(user_id, created_at DESC)
+  WHERE deleted_at IS NULL;
+CREATE INDEX idx_chat_sessions_deleted ON chat_sessions(deleted_at)
+  WHERE deleted_at IS NOT NULL;
+
+-- Deletes up to `batch_size` messages of deleted sessions, then the deleted
+-- sessions left without messages. Each call is one short transaction;
+-- callers repeat it while it reports a full batch. Returns the number of
+-- rows deleted.
+CREATE OR REPLACE FUNCTION public.purge_deleted_chat_sessions(
+  batch_size INTEGER DEFAULT 1000
+)
+RETURNS INTEGER AS $$
+DECLARE
+  purged_messages INTEGER;
+  purged_sessions INTEGER;
+BEGIN
+  DELETE FROM public.messages
+  WHERE id IN (
+    SELECT m.id FROM public.messages AS m
+    JOIN public.chat_sessions AS s ON s.id = m.session_id
+    WHERE s.deleted_at IS NOT NULL
+    LIMIT batch_size
+    FOR UPDATE OF m SKIP LOCKED
+  );
+  GET DIAGNOSTICS purged_messages = ROW_COUNT;
+
+  DELETE FROM public.chat_sessions
+  WHERE id IN (
+    SELECT s.id FROM public.chat_sessions AS s
+    WHERE s.deleted_at IS NOT NULL
+      AND NOT EXISTS (
+        SELECT 1 FROM public.messages AS m WHERE m.session_id = s.id
+      )
+    LIMIT GREATEST(batch_size - purged_messages, 1)
+    FOR UPDATE SKIP LOCKED
+  );
+  GET DIAGNOSTICS purged_sessions = ROW_COUNT;
+
+  RETURN purged_messages + purged_sessions;
+END;
+$$ LANGUAGE plpgsql SET search_path = public;
+
+REVOKE EXECUTE ON FUNCTION public.purge_deleted_chat_sessions(INTEGER)
+  FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION public.purge_deleted_chat_sessions(INTEGER)
+  TO service_role;
@@ -0,0 +1,332 @@
+-- Range-partition messages by month of `timestamp`. Every index of the old
+-- table grew with the total volume; now each month has its own, and months
+-- older than the archive cutoff leave the database (exported as gzipped
+-- NDJSON by lib/message-archive.ts), so the hot set stays the same size
+-- however much history piles up. Rehydrated messages of an archived month
+-- land in the default partition until they are evicted again.
+
+ALTER TABLE messages RENAME TO messages_unpartitioned;
+
+-- A partitioned table's keys must include the partition column, so a
+-- message is identified by (id, timestamp). Prompts delivered from the
+-- offline outbox carry the time they were sent, which keeps re-deliveries
+-- colliding on that key (lib/persist.ts).
+CREATE TABLE messages (
+  id UUID DEFAULT gen_random_uuid() NOT NULL,
+  session_id UUID REFERENCES chat_sessions(id) ON DELETE CASCADE NOT NULL,
+  content TEXT NOT NULL,
+  is_user BOOLEAN NOT NULL,
+  model_id TEXT,
+  timestamp TIMESTAMP WITH TIME ZONE DEFAULT NOW() NOT NULL,
+  created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+  PRIMARY KEY (id, timestamp)
+) PARTITION BY RANGE (timestamp);
+
+-- Catches rows outside every monthly partition: rehydrated messages of
+-- archived months, and anything written before its month's partition was
+-- created (create_message_partition moves those out).
+CREATE TABLE messages_default PARTITION OF messages DEFAULT;
+
+-- Partitions are only read and written through `messages`, whose policies
+-- apply; RLS without policies closes them to direct API access.
+ALTER TABLE messages_default ENABLE ROW LEVEL SECURITY;
+
+-- Creates the partition (messages_YYYY_MM) for the month containing `month`
+-- unless it exists, moving in any rows of that month from the default
+-- partition. Returns the partition's name. Months are UTC.
+CREATE OR REPLACE FUNCTION public.create_message_partition(month DATE)
+RETURNS TEXT AS $$
+DECLARE
+  starts_at TIMESTAMP WITH TIME ZONE := date_trunc('month', month);
+  ends_at TIMESTAMP WITH TIME ZONE := starts_at + INTERVAL '1 month';
+  partition_name TEXT := 'messages_' || to_char(starts_at, 'YYYY_MM');
+BEGIN
+  IF to_regclass('public.' || partition_name) IS NOT NULL THEN
+    RETURN partition_name;
+  END IF;
+
+  EXECUTE format(
+    'CREATE TABLE public.%I (LIKE public.messages INCLUDING DEFAULTS)',
+    partition_name
+  );
+  EXECUTE format(
+    'WITH moved AS (
+       DELETE FROM public.messages_default
+       WHERE timestamp >= %L AND timestamp < %L
+       RETURNING *
+     )
+     INSERT INTO public.%I SELECT * FROM moved',
+    starts_at, ends_at, partition_name
+  );
+  EXECUTE format(
+    'ALTER TABLE public.messages ATTACH PARTITION public.%I
+     FOR VALUES FROM (%L) TO (%L)',
+    partition_name, starts_at, ends_at
+  );
+  EXECUTE format(
+    'ALTER TABLE public.%I ENABLE ROW LEVEL SECURITY', partition_name
+  );
+  RETURN partition_name;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER
+  SET search_path = public SET timezone = 'UTC';
+
+-- Keeps partitions ready for this month and the next `months_ahead`.
+-- Called by the archive job (or pg_cron); if it stops running, new rows
+-- fall back to the default partition rather than failing.
+CREATE OR REPLACE FUNCTION public.create_message_partitions(
+  months_ahead INTEGER DEFAULT 3
+)
+RETURNS VOID AS $$
+BEGIN
+  FOR i IN 0..months_ahead LOOP
+    PERFORM public.create_message_partition(
+      (date_trunc('month', NOW()) + make_interval(months => i))::date
+    );
+  END LOOP;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER
+  SET search_path = public SET timezone = 'UTC';
+
+-- Move the existing messages over, one partition per month they span
+DO $$
+DECLARE
+  month DATE;
+BEGIN
+  FOR month IN
+    SELECT DISTINCT date_trunc(
+      'month', COALESCE(timestamp, created_at, NOW()) AT TIME ZONE 'UTC'
+    )::date
+    FROM messages_unpartitioned
+  LOOP
+    PERFORM public.create_message_partition(month);
+  END LOOP;
+  PERFORM public.create_message_partitions();
+END;
+$$;
+
+INSERT INTO messages (
+  id, session_id, content, is_user, model_id, timestamp, created_at
+)
+SELECT
+  id, session_id, content, is_user, model_id,
+  COALESCE(timestamp, created_at, NOW()), created_at
+FROM messages_unpartitioned;
+
+DROP TABLE messages_unpartitioned;
+
+-- Messages are read per session in time order; the primary key covers
+-- lookups by id.
+CREATE INDEX idx_messages_session_id ON messages(session_id, timestamp);
+
+ALTER TABLE messages ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Users can view messages from own sessions" ON messages
+  FOR SELECT USING (
+    EXISTS (
+      SELECT 1 FROM chat_sessions
+      WHERE chat_sessions.id = messages.session_id
+      AND chat_sessions.user_id = auth.uid()
+      AND chat_sessions.deleted_at IS NULL
+    )
+  );
+
+CREATE POLICY "Users can insert messages to own sessions" ON messages
+  FOR INSERT WITH CHECK (
+    EXISTS (
+      SELECT 1 FROM chat_sessions
+      WHERE chat_sessions.id = messages.session_id
+      AND chat_sessions.user_id = auth.uid()
+      AND chat_sessions.deleted_at IS NULL
+    )
+  );
+
+CREATE POLICY "Users can update messages from own sessions" ON messages
+  FOR UPDATE USING (
+    EXISTS (
+      SELECT 1 FROM chat_sessions
+      WHERE chat_sessions.id = messages.session_id
+      AND chat_sessions.user_id = auth.uid()
+    )
+  );
+
+CREATE POLICY "Users can delete messages from own sessions" ON messages
+  FOR DELETE USING (
+    EXISTS (
+      SELECT 1 FROM chat_sessions
+      WHERE chat_sessions.id = messages.session_id
+      AND chat_sessions.user_id = auth.uid()
+    )
+  );
+
+-- Months whose partitions have been exported. `location` is the archive
+-- file's name under ARCHIVE_DIR.
+CREATE TABLE IF NOT EXISTS message_archives (
+  month DATE PRIMARY KEY,
+  location TEXT NOT NULL,
+  message_count BIGINT NOT NULL,
+  archived_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+-- Enable RLS (no policies: only the archive job reads or writes it)
+ALTER TABLE message_archives ENABLE ROW LEVEL SECURITY;
+
+-- Which sessions have messages in which archived month. `rehydrated_at` is
+-- set while those messages are back in the database.
+CREATE TABLE IF NOT EXISTS archived_message_sessions (
+  session_id UUID REFERENCES chat_sessions(id) ON DELETE CASCADE NOT NULL,
+  month DATE REFERENCES message_archives(month) NOT NULL,
+  rehydrated_at TIMESTAMP WITH TIME ZONE,
+  PRIMARY KEY (session_id, month)
+);
+
+ALTER TABLE archived_message_sessions ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Users can view own archived sessions"
+  ON archived_message_sessions
+  FOR SELECT USING (
+    EXISTS (
+      SELECT 1 FROM chat_sessions
+      WHERE chat_sessions.id = archived_message_sessions.session_id
+      AND chat_sessions.user_id = auth.uid()
+    )
+  );
+
+CREATE INDEX idx_archived_message_sessions_rehydrated
+  ON archived_message_sessions(rehydrated_at)
+  WHERE rehydrated_at IS NOT NULL;
+
+-- Months with a partition that ends at least `keep_months` before the
+-- current month begins, oldest first.
+CREATE OR REPLACE FUNCTION public.message_partitions_to_archive(
+  keep_months INTEGER
+)
+RETURNS SETOF DATE AS $$
+  SELECT to_date(substr(c.relname, 10), 'YYYY_MM')
+  FROM pg_inherits AS i
+  JOIN pg_class AS c ON c.oid = i.inhrelid
+  WHERE i.inhparent = 'public.messages'::regclass
+    AND c.relname ~ '^messages_[0-9]{4}_[0-9]{2}$'
+    AND to_date(substr(c.relname, 10), 'YYYY_MM')
+      < date_trunc('month', NOW()) - make_interval(months => keep_months)
+  ORDER BY 1;
+$$ LANGUAGE sql STABLE SET search_path = public SET timezone = 'UTC';
+
+-- Records an exported month and drops its partition. `message_count` is
+-- what the export wrote; if the partition no longer holds exactly that many
+-- rows, something wrote to it meanwhile and nothing is dropped.
+CREATE OR REPLACE FUNCTION public.drop_archived_message_partition(
+  month DATE,
+  location TEXT,
+  message_count BIGINT
+)
+RETURNS VOID AS $$
+DECLARE
+  partition_name TEXT := 'messages_' || to_char(month, 'YYYY_MM');
+  current_count BIGINT;
+BEGIN
+  EXECUTE format(
+    'LOCK TABLE public.%I IN SHARE MODE', partition_name
+  );
+  EXECUTE format('SELECT count(*) FROM public.%I', partition_name)
+    INTO current_count;
+  IF current_count <> message_count THEN
+    RAISE EXCEPTION 'Partition % holds % rows, % were archived',
+      partition_name, current_count, message_count;
+  END IF;
+
+  INSERT INTO public.message_archives (month, location, message_count)
+  VALUES (month, location, message_count);
+  EXECUTE format(
+    'INSERT INTO public.archived_message_sessions (session_id, month)
+     SELECT DISTINCT session_id, %L::date FROM public.%I',
+    month, partition_name
+  );
+  EXECUTE format('DROP TABLE public.%I', partition_name);
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER
+  SET search_path = public SET timezone = 'UTC';
+
+-- Removes rehydrated messages again once they were brought back longer than
+-- `older_than` ago; the archive still holds them. Returns the rows removed.
+CREATE OR REPLACE FUNCTION public.evict_rehydrated_messages(
+  older_than INTERVAL
+)
+RETURNS INTEGER AS $$
+DECLARE
+  evicted_count INTEGER;
+BEGIN
+  WITH evicted AS (
+    UPDATE public.archived_message_sessions
+    SET rehydrated_at = NULL
+    WHERE rehydrated_at < NOW() - older_than
+    RETURNING session_id, month
+  )
+  DELETE FROM public.messages_default AS m
+  USING evicted AS e
+  WHERE m.session_id = e.session_id
+    AND m.timestamp >= e.month
+    AND m.timestamp < e.month + INTERVAL '1 month';
+  GET DIAGNOSTICS evicted_count = ROW_COUNT;
+  RETURN evicted_count;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER
+  SET search_path = public SET timezone = 'UTC';
+
+-- Same as in 009, with messages now keyed by (id, timestamp)
+CREATE OR REPLACE FUNCTION public.purge_deleted_chat_sessions(
+  batch_size INTEGER DEFAULT 1000
+)
+RETURNS INTEGER AS $$
+DECLARE
+  purged_messages INTEGER;
+  purged_sessions INTEGER;
+BEGIN
+  DELETE FROM public.messages
+  WHERE (id, timestamp) IN (
+    SELECT m.id, m.timestamp FROM public.messages AS m
+    JOIN public.chat_sessions AS s ON s.id = m.session_id
+    WHERE s.deleted_at IS NOT NULL
+    LIMIT batch_size
+    FOR UPDATE OF m SKIP LOCKED
+  );
+  GET DIAGNOSTICS purged_messages = ROW_COUNT;
+
+  DELETE FROM public.chat_sessions
+  WHERE id IN (
+    SELECT s.id FROM public.chat_sessions AS s
+    WHERE s.deleted_at IS NOT NULL
+      AND NOT EXISTS (
+        SELECT 1 FROM public.messages AS m WHERE m.session_id = s.id
+      )
+    LIMIT GREATEST(batch_size - purged_messages, 1)
+    FOR UPDATE SKIP LOCKED
+  );
+  GET DIAGNOSTICS purged_sessions = ROW_COUNT;
+
+  RETURN purged_messages + purged_sessions;
+END;
+$$ LANGUAGE plpgsql SET search_path = public;
+
+REVOKE EXECUTE ON FUNCTION public.create_message_partition(DATE)
+  FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION public.create_message_partitions(INTEGER)
+  FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION public.message_partitions_to_archive(INTEGER)
+  FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE
+  ON FUNCTION public.drop_archived_message_partition(DATE, TEXT, BIGINT)
+  FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION public.evict_rehydrated_messages(INTERVAL)
+  FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION public.create_message_partition(DATE)
+  TO service_role;
+GRANT EXECUTE ON FUNCTION public.create_message_partitions(INTEGER)
+  TO service_role;
+GRANT EXECUTE ON FUNCTION public.message_partitions_to_archive(INTEGER)
+  TO service_role;
+GRANT EXECUTE
+  ON FUNCTION public.drop_archived_message_partition(DATE, TEXT, BIGINT)
+  TO service_role;
+GRANT EXECUTE ON FUNCTION public.evict_rehydrated_messages(INTERVAL)
+  TO service_role;
@@ -0,0 +1,173 @@
+-- Long model outputs (code, reasoning) can be tens of kilobytes, and every
+-- `select("*")` on messages dragged them along. A message whose text is
+-- longer than 4000 characters now keeps only a preview inline; the full
+-- text moves to message_bodies, compressed, and is fetched when the
+-- message is actually shown. Writers are unchanged: a trigger does the
+-- move, so inserts and updates keep passing the full `content`.
+
+-- NULL `content` means the text is in message_bodies; `preview` holds its
+-- first 500 characters and `content_length` its full length.
+ALTER TABLE messages ALTER COLUMN content DROP NOT NULL;
+ALTER TABLE messages
+  ADD COLUMN IF NOT EXISTS preview TEXT,
+  ADD COLUMN IF NOT EXISTS content_length INTEGER;
+ALTER TABLE messages ADD CONSTRAINT messages_content_or_body
+  CHECK (content IS NOT NULL OR content_length IS NOT NULL);
+
+CREATE TABLE IF NOT EXISTS message_bodies (
+  message_id UUID NOT NULL,
+  message_timestamp TIMESTAMP WITH TIME ZONE NOT NULL,
+  session_id UUID NOT NULL,
+  content TEXT COMPRESSION lz4 NOT NULL,
+  PRIMARY KEY (message_id, message_timestamp),
+  -- Deferred: the trigger writes the body before its message row exists
+  FOREIGN KEY (message_id, message_timestamp)
+    REFERENCES messages(id, timestamp) ON DELETE CASCADE
+    DEFERRABLE INITIALLY DEFERRED
+);
+
+-- Enable RLS (written only by the trigger below)
+ALTER TABLE message_bodies ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Users can view bodies from own sessions" ON message_bodies
+  FOR SELECT USING (
+    EXISTS (
+      SELECT 1 FROM chat_sessions
+      WHERE chat_sessions.id = message_bodies.session_id
+      AND chat_sessions.user_id = auth.uid()
+      AND chat_sessions.deleted_at IS NULL
+    )
+  );
+
+-- Moves long text out of the row, and back in when an update shortens it.
+-- Runs as its owner to write message_bodies; the row itself still has to
+-- pass the messages policies, or the statement (body included) fails.
+CREATE OR REPLACE FUNCTION public.offload_message_body()
+RETURNS TRIGGER AS $$
+BEGIN
+  IF NEW.content IS NULL THEN
+    RETURN NEW;
+  END IF;
+
+  IF length(NEW.content) > 4000 THEN
+    INSERT INTO public.message_bodies
+      (message_id, message_timestamp, session_id, content)
+    VALUES (NEW.id, NEW.timestamp, NEW.session_id, NEW.content)
+    ON CONFLICT (message_id, message_timestamp)
+      DO UPDATE SET content = EXCLUDED.content;
+    NEW.preview := left(NEW.content, 500);
+    NEW.content_length := length(NEW.content);
+    NEW.content := NULL;
+  ELSIF TG_OP = 'UPDATE' AND OLD.content IS NULL THEN
+    DELETE FROM public.message_bodies
+    WHERE message_id = OLD.id AND message_timestamp = OLD.timestamp;
+    NEW.preview := NULL;
+    NEW.content_length := NULL;
+  END IF;
+  RETURN NEW;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
+
+CREATE TRIGGER offload_message_body
+  BEFORE INSERT OR UPDATE OF content ON messages
+  FOR EACH ROW EXECUTE FUNCTION public.offload_message_body();
+
+-- Offload the long messages already stored
+UPDATE messages SET content = content WHERE length(content) > 4000;
+
+-- Same as in 010, but new partitions copy the CHECK constraint above,
+-- which attaching requires. Rows moved in from the default partition lose
+-- their bodies to the cascade, so they move with the full text and are
+-- offloaded again once the partition is attached.
+CREATE OR REPLACE FUNCTION public.create_message_partition(month DATE)
+RETURNS TEXT AS $$
+DECLARE
+  starts_at TIMESTAMP WITH TIME ZONE := date_trunc('month', month);
+  ends_at TIMESTAMP WITH TIME ZONE := starts_at + INTERVAL '1 month';
+  partition_name TEXT := 'messages_' || to_char(starts_at, 'YYYY_MM');
+BEGIN
+  IF to_regclass('public.' || partition_name) IS NOT NULL THEN
+    RETURN partition_name;
+  END IF;
+
+  EXECUTE format(
+    'CREATE TABLE public.%I (LIKE public.messages INCLUDING DEFAULTS
+       INCLUDING CONSTRAINTS)',
+    partition_name
+  );
+  EXECUTE format(
+    'WITH moved AS (
+       DELETE FROM public.messages_default
+       WHERE timestamp >= %L AND timestamp < %L
+       RETURNING *
+     )
+     INSERT INTO public.%I
+       (id, session_id, content, is_user, model_id, timestamp, created_at)
+     SELECT
+       m.id, m.session_id, COALESCE(m.content, b.content), m.is_user,
+       m.model_id, m.timestamp, m.created_at
+     FROM moved AS m
+     LEFT JOIN public.message_bodies AS b
+       ON b.message_id = m.id AND b.message_timestamp = m.timestamp',
+    starts_at, ends_at, partition_name
+  );
+  EXECUTE format(
+    'ALTER TABLE public.messages ATTACH PARTITION public.%I
+     FOR VALUES FROM (%L) TO (%L)',
+    partition_name, starts_at, ends_at
+  );
+  EXECUTE format(
+    'UPDATE public.%I SET content = content WHERE length(content) > 4000',
+    partition_name
+  );
+  EXECUTE format(
+    'ALTER TABLE public.%I ENABLE ROW LEVEL SECURITY', partition_name
+  );
+  RETURN partition_name;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER
+  SET search_path = public SET timezone = 'UTC';
+
+-- Same as in 010, except that the month's offloaded bodies are removed
+-- first and the partition is detached before being dropped: message_bodies
+-- references it.
+CREATE OR REPLACE FUNCTION public.drop_archived_message_partition(
+  month DATE,
+  location TEXT,
+  message_count BIGINT
+)
+RETURNS VOID AS $$
+DECLARE
+  partition_name TEXT := 'messages_' || to_char(month, 'YYYY_MM');
+  current_count BIGINT;
+BEGIN
+  EXECUTE format(
+    'LOCK TABLE public.%I IN SHARE MODE', partition_name
+  );
+  EXECUTE format('SELECT count(*) FROM public.%I', partition_name)
+    INTO current_count;
+  IF current_count <> message_count THEN
+    RAISE EXCEPTION 'Partition % holds % rows, % were archived',
+      partition_name, current_count, message_count;
+  END IF;
+
+  INSERT INTO public.message_archives (month, location, message_count)
+  VALUES (month, location, message_count);
+  EXECUTE format(
+    'INSERT INTO public.archived_message_sessions (session_id, month)
+     SELECT DISTINCT session_id, %L::date FROM public.%I',
+    month, partition_name
+  );
+  EXECUTE format(
+    'DELETE FROM public.message_bodies AS b
+     USING public.%I AS m
+     WHERE b.message_id = m.id AND b.message_timestamp = m.timestamp',
+    partition_name
+  );
+  EXECUTE format(
+    'ALTER TABLE public.messages DETACH PARTITION public.%I', partition_name
+  );
+  EXECUTE format('DROP TABLE public.%I', partition_name);
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER
+  SET search_path = public SET timezone = 'UTC';
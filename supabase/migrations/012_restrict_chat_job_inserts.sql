@@ -0,0 +1,4 @@
+-- Jobs are queued only by /api/chat, with the service role, after its
+-- quota check, model whitelist and history cap. A client insert policy let
+-- signed-in users queue rows directly through PostgREST and skip all three.
+DROP POLICY IF EXISTS "Users can queue own jobs" ON chat_jobs;
@@ -0,0 +1,12 @@
+-- Usage rows are written with the user's own client, so their values are
+-- only as trustworthy as the caller. Negative tokens or cost would be folded
+-- into usage_daily by the rollup trigger and lower the user's quota.
+ALTER TABLE message_usage
+  ADD CONSTRAINT message_usage_non_negative CHECK (
+    prompt_tokens >= 0
+    AND cached_prompt_tokens >= 0
+    AND cached_prompt_tokens <= prompt_tokens
+    AND completion_tokens >= 0
+    AND latency_ms >= 0
+    AND cost_usd >= 0
+  );
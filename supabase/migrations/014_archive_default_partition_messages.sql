@@ -0,0 +1,127 @@
+-- Two gaps in the cold archive (010). Eviction removed every default-
+-- partition row of a rehydrated session's month, including rows that were
+-- never archived (imported, or delivered late from the offline outbox).
+-- And such rows of a month without a partition stayed in the default
+-- partition forever. Rows restored from an archive are now flagged, only
+-- those are evicted, and the archive job appends the others to their
+-- month's archive (lib/message-archive.ts).
+
+ALTER TABLE messages
+  ADD COLUMN IF NOT EXISTS rehydrated BOOLEAN DEFAULT FALSE NOT NULL;
+
+CREATE INDEX IF NOT EXISTS idx_messages_default_unarchived
+  ON messages_default(timestamp) WHERE NOT rehydrated;
+
+-- Same as in 010, but only rows restored from the archive are removed
+CREATE OR REPLACE FUNCTION public.evict_rehydrated_messages(
+  older_than INTERVAL
+)
+RETURNS INTEGER AS $$
+DECLARE
+  evicted_count INTEGER;
+BEGIN
+  WITH evicted AS (
+    UPDATE public.archived_message_sessions
+    SET rehydrated_at = NULL
+    WHERE rehydrated_at < NOW() - older_than
+    RETURNING session_id, month
+  )
+  DELETE FROM public.messages_default AS m
+  USING evicted AS e
+  WHERE m.session_id = e.session_id
+    AND m.rehydrated
+    AND m.timestamp >= e.month
+    AND m.timestamp < e.month + INTERVAL '1 month';
+  GET DIAGNOSTICS evicted_count = ROW_COUNT;
+  RETURN evicted_count;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER
+  SET search_path = public SET timezone = 'UTC';
+
+-- Months with default-partition rows that belong in the archive: months
+-- already archived, and months without a partition that are at least
+-- `keep_months` before the current one. Oldest first.
+CREATE OR REPLACE FUNCTION public.default_message_months_to_archive(
+  keep_months INTEGER
+)
+RETURNS SETOF DATE AS $$
+  SELECT DISTINCT date_trunc('month', m.timestamp)::date
+  FROM public.messages_default AS m
+  WHERE NOT m.rehydrated
+    AND (
+      m.timestamp
+        < date_trunc('month', NOW()) - make_interval(months => keep_months)
+      OR date_trunc('month', m.timestamp)::date
+        IN (SELECT a.month FROM public.message_archives AS a)
+    )
+  ORDER BY 1;
+$$ LANGUAGE sql STABLE SET search_path = public SET timezone = 'UTC';
+
+-- Records that the default-partition rows keyed by (`ids`, `timestamps`)
+-- were written, with the month's earlier archive if any, to `location`.
+-- They are deleted, except in sessions whose month is rehydrated right now,
+-- where they are flagged as rehydrated and evicted with the rest. Returns
+-- the month's previous location, whose file the caller removes. If any of
+-- the rows changed meanwhile, nothing is recorded.
+CREATE OR REPLACE FUNCTION public.archive_default_messages(
+  month DATE,
+  location TEXT,
+  ids UUID[],
+  timestamps TIMESTAMP WITH TIME ZONE[]
+)
+RETURNS TEXT AS $$
+DECLARE
+  previous_location TEXT;
+  found_count BIGINT;
+BEGIN
+  CREATE TEMPORARY TABLE archived_keys ON COMMIT DROP AS
+  SELECT k.id, k.timestamp, m.session_id
+  FROM unnest(ids, timestamps) AS k(id, timestamp)
+  JOIN public.messages_default AS m
+    ON m.id = k.id AND m.timestamp = k.timestamp AND NOT m.rehydrated;
+  SELECT count(*) INTO found_count FROM archived_keys;
+  IF found_count <> cardinality(ids) THEN
+    RAISE EXCEPTION 'Only % of % archived rows are left to remove',
+      found_count, cardinality(ids);
+  END IF;
+
+  SELECT a.location INTO previous_location
+  FROM public.message_archives AS a
+  WHERE a.month = archive_default_messages.month
+  FOR UPDATE;
+  INSERT INTO public.message_archives AS a (month, location, message_count)
+  VALUES (month, location, found_count)
+  ON CONFLICT ON CONSTRAINT message_archives_pkey DO UPDATE
+    SET location = EXCLUDED.location,
+        message_count = a.message_count + EXCLUDED.message_count;
+  INSERT INTO public.archived_message_sessions (session_id, month)
+  SELECT DISTINCT k.session_id, month FROM archived_keys AS k
+  ON CONFLICT DO NOTHING;
+
+  UPDATE public.messages_default AS m
+  SET rehydrated = TRUE
+  FROM archived_keys AS k
+  JOIN public.archived_message_sessions AS s
+    ON s.session_id = k.session_id
+    AND s.month = archive_default_messages.month
+    AND s.rehydrated_at IS NOT NULL
+  WHERE m.id = k.id AND m.timestamp = k.timestamp;
+  DELETE FROM public.messages_default AS m
+  USING archived_keys AS k
+  WHERE m.id = k.id AND m.timestamp = k.timestamp AND NOT m.rehydrated;
+
+  RETURN previous_location;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER
+  SET search_path = public SET timezone = 'UTC';
+
+REVOKE EXECUTE ON FUNCTION public.default_message_months_to_archive(INTEGER)
+  FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION public.archive_default_messages(
+  DATE, TEXT, UUID[], TIMESTAMP WITH TIME ZONE[]
+) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION public.default_message_months_to_archive(INTEGER)
+  TO service_role;
+GRANT EXECUTE ON FUNCTION public.archive_default_messages(
+  DATE, TEXT, UUID[], TIMESTAMP WITH TIME ZONE[]
+) TO service_role;
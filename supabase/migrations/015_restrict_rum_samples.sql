@@ -0,0 +1,7 @@
+-- RUM samples are recorded only by /api/rum, with the service role, after
+-- its metric, route and model whitelists, sample cap and value checks. The
+-- grant to anon let anyone call record_rum_samples directly through
+-- PostgREST and write arbitrary rows (or negative counts) past all of them.
+REVOKE EXECUTE ON FUNCTION public.record_rum_samples(JSONB)
+  FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION public.record_rum_samples(JSONB) TO service_role;
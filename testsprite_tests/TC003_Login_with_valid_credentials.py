@@ -1,78 +1,36 @@
 import asyncio
-from playwright import async_api
 
-async def run_test():
-    pw = None
-    browser = None
-    context = None
-    
-    try:
-        # Start a Playwright session in asynchronous mode
-        pw = await async_api.async_playwright().start()
-        
-        # Launch a Chromium browser in headless mode with custom arguments
-        browser = await pw.chromium.launch(
-            headless=True,
-            args=[
-                "--window-size=1280,720",         # Set the browser window size
-                "--disable-dev-shm-usage",        # Avoid using /dev/shm which can cause issues in containers
-                "--ipc=host",                     # Use host-level IPC for better stability
-                "--single-process"                # Run the browser in a single process mode
-            ],
-        )
-        
-        # Create a new browser context (like an incognito window)
-        context = await browser.new_context()
-        context.set_default_timeout(5000)
-        
-        # Open a new page in the browser context
-        page = await context.new_page()
-        
-        # Navigate to your target URL and wait until the network request is committed
-        await page.goto("http://localhost:3000", wait_until="commit", timeout=10000)
-        
-        # Wait for the main page to reach DOMContentLoaded state (optional for stability)
-        try:
-            await page.wait_for_load_state("domcontentloaded", timeout=3000)
-        except async_api.Error:
-            pass
-        
-        # Iterate through all iframes and wait for them to load as well
-        for frame in page.frames:
-            try:
-                await frame.wait_for_load_state("domcontentloaded", timeout=3000)
-            except async_api.Error:
-                pass
-        
-        # Interact with the page elements to simulate user flow
-        # Input valid email and password
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div[2]/div/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('gvarad2001@gmail.com')
-        
+from harness import BASE_URL, run_standalone
 
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div[2]/div/div/input[2]').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('vC5:m7tS')
-        
 
-        # Submit login form by clicking Sign in button
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div[2]/div/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
+async def run_test(context):
+    # Open a new page in the browser context
+    page = await context.new_page()
 
-        # Final failing assertion since test plan execution failed
-        assert False, 'Test plan execution failed, marking test as failed intentionally.'
-        await asyncio.sleep(5)
-    
-    finally:
-        if context:
-            await context.close()
-        if browser:
-            await browser.close()
-        if pw:
-            await pw.stop()
-            
-asyncio.run(run_test())
-    
\ No newline at end of file
+    # Navigate to your target URL and wait for the DOM to be ready
+    await page.goto(BASE_URL, wait_until="domcontentloaded", timeout=10000)
+
+    # Interact with the page elements to simulate user flow
+    # Input valid email and password
+    frame = context.pages[-1]
+    elem = frame.locator('xpath=html/body/div[2]/div/div/input').nth(0)
+    await elem.fill('gvarad2001@gmail.com')
+
+
+    frame = context.pages[-1]
+    elem = frame.locator('xpath=html/body/div[2]/div/div/input[2]').nth(0)
+    await elem.fill('vC5:m7tS')
+
+
+    # Submit login form by clicking Sign in button
+    frame = context.pages[-1]
+    elem = frame.locator('xpath=html/body/div[2]/div/div/button').nth(0)
+    await elem.click(timeout=5000)
+
+
+    # Final failing assertion since test plan execution failed
+    assert False, 'Test plan execution failed, marking test as failed intentionally.'
+
+
+if __name__ == "__main__":
+    asyncio.run(run_standalone(run_test, authenticated=False))
@@ -1,153 +1,33 @@
 import asyncio
-from playwright import async_api
+import uuid
 
-async def run_test():
-    pw = None
-    browser = None
-    context = None
-    
-    try:
-        # Start a Playwright session in asynchronous mode
-        pw = await async_api.async_playwright().start()
-        
-        # Launch a Chromium browser in headless mode with custom arguments
-        browser = await pw.chromium.launch(
-            headless=True,
-            args=[
-                "--window-size=1280,720",         # Set the browser window size
-                "--disable-dev-shm-usage",        # Avoid using /dev/shm which can cause issues in containers
-                "--ipc=host",                     # Use host-level IPC for better stability
-                "--single-process"                # Run the browser in a single process mode
-            ],
-        )
-        
-        # Create a new browser context (like an incognito window)
-        context = await browser.new_context()
-        context.set_default_timeout(5000)
-        
-        # Open a new page in the browser context
-        page = await context.new_page()
-        
-        # Navigate to your target URL and wait until the network request is committed
-        await page.goto("http://localhost:3000", wait_until="commit", timeout=10000)
-        
-        # Wait for the main page to reach DOMContentLoaded state (optional for stability)
-        try:
-            await page.wait_for_load_state("domcontentloaded", timeout=3000)
-        except async_api.Error:
-            pass
-        
-        # Iterate through all iframes and wait for them to load as well
-        for frame in page.frames:
-            try:
-                await frame.wait_for_load_state("domcontentloaded", timeout=3000)
-            except async_api.Error:
-                pass
-        
-        # Interact with the page elements to simulate user flow
-        # Input email and password, then click Sign in button
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div[2]/div/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('gvarad2001@gmail.com')
-        
+from harness import BASE_URL, run_standalone
 
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div[2]/div/div/input[2]').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('vC5:m7tS')
-        
+# Starts signed in from the runner's shared storage state.
+AUTHENTICATED = True
 
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div[2]/div/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
 
-        # Check if there is an option to reset password or create a new account, or retry login with corrected credentials
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div[2]/div/div/div[2]/a').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
+async def run_test(context):
+    page = await context.new_page()
+    await page.goto(BASE_URL, wait_until="domcontentloaded", timeout=10000)
 
-        # Check if user wants to create a new account or go back to sign in
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div[2]/div/div/div/a').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
+    # Sessions are titled with their first message, so a unique one is
+    # easy to find among earlier runs'
+    title = f"History check {uuid.uuid4().hex[:8]}"
+    await page.get_by_role("button", name="New Chat").click()
+    message = page.get_by_placeholder("Ask me anything...")
+    await message.fill(title)
+    await message.press("Enter")
+    await page.wait_for_function(
+        "() => !!localStorage.getItem('currentSessionId')"
+    )
 
-        # Input email and password again and click Sign in to attempt login
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div[2]/div/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('gvarad2001@gmail.com')
-        
+    await page.goto(f"{BASE_URL}/history", wait_until="domcontentloaded")
+    await page.get_by_role("heading", name="Chat History").wait_for()
+    session = page.get_by_role("checkbox", name=f"Select {title}")
+    await session.wait_for(timeout=10000)
+    assert await session.count() == 1, f"'{title}' is listed more than once"
 
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div[2]/div/div/input[2]').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('vC5:m7tS')
-        
 
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div[2]/div/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # Since login failed, click 'Create one' link to navigate to account creation page to check if a new account can be created for testing
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div[2]/div/div/div[2]/a').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # Decide whether to create a new account or go back to sign in page
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div[2]/div/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('gvarad2001@gmail.com')
-        
-
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div[2]/div/div/input[2]').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('vC5:m7tS')
-        
-
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div[2]/div/div/input[3]').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('vC5:m7tS')
-        
-
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div[2]/div/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # Click 'Sign in' link to navigate back to login page and attempt login again or check for password recovery options
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div[2]/div/div/div[2]/a').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # Input email and password again and click Sign in to attempt login once more before concluding
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div[2]/div/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('gvarad2001@gmail.com')
-        
-
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div[2]/div/div/input[2]').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('vC5:m7tS')
-        
-
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div[2]/div/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        assert False, 'Test plan execution failed: generic failure assertion'
-        await asyncio.sleep(5)
-    
-    finally:
-        if context:
-            await context.close()
-        if browser:
-            await browser.close()
-        if pw:
-            await pw.stop()
-            
-asyncio.run(run_test())
-    
\ No newline at end of file
+if __name__ == "__main__":
+    asyncio.run(run_standalone(run_test, authenticated=True))
@@ -1,118 +1,76 @@
 import asyncio
-from playwright import async_api
-
-async def run_test():
-    pw = None
-    browser = None
-    context = None
-    
-    try:
-        # Start a Playwright session in asynchronous mode
-        pw = await async_api.async_playwright().start()
-        
-        # Launch a Chromium browser in headless mode with custom arguments
-        browser = await pw.chromium.launch(
-            headless=True,
-            args=[
-                "--window-size=1280,720",         # Set the browser window size
-                "--disable-dev-shm-usage",        # Avoid using /dev/shm which can cause issues in containers
-                "--ipc=host",                     # Use host-level IPC for better stability
-                "--single-process"                # Run the browser in a single process mode
-            ],
-        )
-        
-        # Create a new browser context (like an incognito window)
-        context = await browser.new_context()
-        context.set_default_timeout(5000)
-        
-        # Open a new page in the browser context
-        page = await context.new_page()
-        
-        # Navigate to your target URL and wait until the network request is committed
-        await page.goto("http://localhost:3000", wait_until="commit", timeout=10000)
-        
-        # Wait for the main page to reach DOMContentLoaded state (optional for stability)
-        try:
-            await page.wait_for_load_state("domcontentloaded", timeout=3000)
-        except async_api.Error:
-            pass
-        
-        # Iterate through all iframes and wait for them to load as well
-        for frame in page.frames:
-            try:
-                await frame.wait_for_load_state("domcontentloaded", timeout=3000)
-            except async_api.Error:
-                pass
-        
-        # Interact with the page elements to simulate user flow
-        # Test keyboard navigation using Tab and Shift+Tab to verify focus order and visible focus indicators on login page inputs and buttons, then check ARIA labels for these elements.
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div[2]/div/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # Proceed to signup page to test keyboard navigation and ARIA labels there.
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div[2]/div/div/div/a').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # Navigate to login page to test keyboard navigation and ARIA labels on login page again, then proceed to chat page.
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div[2]/div/div/div/a').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # Fill login form with provided credentials and submit to access chat page.
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div[2]/div/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('gvarad2001@gmail.com')
-        
-
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div[2]/div/div/input[2]').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('vC5:m7tS')
-        
-
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div[2]/div/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # Verify keyboard navigation focus order and visible focus indicators on login page
-        focusable_elements = await frame.locator('input, button, a, select, textarea, [tabindex]:not([tabindex="-1"])').all()
-        previous_tabindex = -1
-        for i, elem in enumerate(focusable_elements):
-            await elem.focus()
-            # Check element is focused
-            assert await elem.evaluate('el => el === document.activeElement'), f"Element at index {i} did not receive focus"
-            # Check visible focus indicator by checking outline or box-shadow style
-            box_shadow = await elem.evaluate('el => window.getComputedStyle(el).getPropertyValue("box-shadow")')
-            outline = await elem.evaluate('el => window.getComputedStyle(el).getPropertyValue("outline-style")')
-            assert box_shadow != 'none' or outline != 'none', f"Element at index {i} does not have visible focus indicator"
-            # Check tabindex order is logical (non-negative and increasing or equal)
-            tabindex = await elem.get_attribute('tabindex')
-            tabindex_val = int(tabindex) if tabindex is not None else 0
-            assert tabindex_val >= 0, f"Element at index {i} has negative tabindex"
-            assert tabindex_val >= previous_tabindex, f"Element at index {i} tabindex {tabindex_val} is less than previous {previous_tabindex}"
-            previous_tabindex = tabindex_val
-        # Verify ARIA labels presence and descriptiveness for screen reader users
-        for elem in focusable_elements:
-            aria_label = await elem.get_attribute('aria-label')
-            aria_labelledby = await elem.get_attribute('aria-labelledby')
-            aria_describedby = await elem.get_attribute('aria-describedby')
-            role = await elem.get_attribute('role')
-            # At least one ARIA label attribute or role should be present and non-empty
-            assert (aria_label and aria_label.strip()) or (aria_labelledby and aria_labelledby.strip()) or (aria_describedby and aria_describedby.strip()) or (role and role.strip()), f"Element {await elem.evaluate('el => el.outerHTML')} lacks descriptive ARIA attributes or role"
-        await asyncio.sleep(5)
-    
-    finally:
-        if context:
-            await context.close()
-        if browser:
-            await browser.close()
-        if pw:
-            await pw.stop()
-            
-asyncio.run(run_test())
-    
\ No newline at end of file
+
+from harness import BASE_URL, run_standalone
+
+
+async def run_test(context):
+    # Open a new page in the browser context
+    page = await context.new_page()
+
+    # Navigate to your target URL and wait for the DOM to be ready
+    await page.goto(BASE_URL, wait_until="domcontentloaded", timeout=10000)
+
+    # Interact with the page elements to simulate user flow
+    # Test keyboard navigation using Tab and Shift+Tab to verify focus order and visible focus indicators on login page inputs and buttons, then check ARIA labels for these elements.
+    frame = context.pages[-1]
+    elem = frame.locator('xpath=html/body/div[2]/div/div/input').nth(0)
+    await elem.click(timeout=5000)
+
+
+    # Proceed to signup page to test keyboard navigation and ARIA labels there.
+    frame = context.pages[-1]
+    elem = frame.locator('xpath=html/body/div[2]/div/div/div/a').nth(0)
+    await elem.click(timeout=5000)
+
+
+    # Navigate to login page to test keyboard navigation and ARIA labels on login page again, then proceed to chat page.
+    frame = context.pages[-1]
+    elem = frame.locator('xpath=html/body/div[2]/div/div/div/a').nth(0)
+    await elem.click(timeout=5000)
+
+
+    # Fill login form with provided credentials and submit to access chat page.
+    frame = context.pages[-1]
+    elem = frame.locator('xpath=html/body/div[2]/div/div/input').nth(0)
+    await elem.fill('gvarad2001@gmail.com')
+
+
+    frame = context.pages[-1]
+    elem = frame.locator('xpath=html/body/div[2]/div/div/input[2]').nth(0)
+    await elem.fill('vC5:m7tS')
+
+
+    frame = context.pages[-1]
+    elem = frame.locator('xpath=html/body/div[2]/div/div/button').nth(0)
+    await elem.click(timeout=5000)
+
+
+    # Verify keyboard navigation focus order and visible focus indicators on login page
+    focusable_elements = await frame.locator('input, button, a, select, textarea, [tabindex]:not([tabindex="-1"])').all()
+    previous_tabindex = -1
+    for i, elem in enumerate(focusable_elements):
+        await elem.focus()
+        # Check element is focused
+        assert await elem.evaluate('el => el === document.activeElement'), f"Element at index {i} did not receive focus"
+        # Check visible focus indicator by checking outline or box-shadow style
+        box_shadow = await elem.evaluate('el => window.getComputedStyle(el).getPropertyValue("box-shadow")')
+        outline = await elem.evaluate('el => window.getComputedStyle(el).getPropertyValue("outline-style")')
+        assert box_shadow != 'none' or outline != 'none', f"Element at index {i} does not have visible focus indicator"
+        # Check tabindex order is logical (non-negative and increasing or equal)
+        tabindex = await elem.get_attribute('tabindex')
+        tabindex_val = int(tabindex) if tabindex is not None else 0
+        assert tabindex_val >= 0, f"Element at index {i} has negative tabindex"
+        assert tabindex_val >= previous_tabindex, f"Element at index {i} tabindex {tabindex_val} is less than previous {previous_tabindex}"
+        previous_tabindex = tabindex_val
+    # Verify ARIA labels presence and descriptiveness for screen reader users
+    for elem in focusable_elements:
+        aria_label = await elem.get_attribute('aria-label')
+        aria_labelledby = await elem.get_attribute('aria-labelledby')
+        aria_describedby = await elem.get_attribute('aria-describedby')
+        role = await elem.get_attribute('role')
+        # At least one ARIA label attribute or role should be present and non-empty
+        assert (aria_label and aria_label.strip()) or (aria_labelledby and aria_labelledby.strip()) or (aria_describedby and aria_describedby.strip()) or (role and role.strip()), f"Element {await elem.evaluate('el => el.outerHTML')} lacks descriptive ARIA attributes or role"
+
+
+if __name__ == "__main__":
+    asyncio.run(run_standalone(run_test, authenticated=False))
@@ -0,0 +1,48 @@
+import asyncio
+
+from harness import BASE_URL, run_standalone
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+
+# Starts signed in from the runner's shared storage state.
+AUTHENTICATED = True
+
+# Repeat visits load the build's static assets from the service worker's
+# cache, which only production builds (`npm run build && npm start`) fill.
+REPEAT_VISIT_FCP_BUDGET_MS = 500
+
+FIRST_CONTENTFUL_PAINT = """() => new Promise((resolve) => {
+    const entry = performance.getEntriesByName("first-contentful-paint")[0];
+    if (entry) return resolve(entry.startTime);
+    new PerformanceObserver((list) => resolve(list.getEntries()[0].startTime))
+        .observe({ type: "paint", buffered: true });
+})"""
+
+
+async def run_test(context):
+    # First visit: installs the service worker, which precaches the shell
+    page = await context.new_page()
+    await page.goto(BASE_URL, wait_until="load", timeout=10000)
+    try:
+        await page.wait_for_function(
+            """async () => {
+                const registration = await navigator.serviceWorker.ready;
+                return !!registration.active && !!(await caches.match("/"));
+            }""",
+            timeout=15000,
+        )
+    except PlaywrightTimeoutError:
+        assert False, "App shell was never cached (is this a production build?)"
+    await page.close()
+
+    # Repeat visit in the same context, so the worker and caches are reused
+    page = await context.new_page()
+    await page.goto(BASE_URL, wait_until="domcontentloaded", timeout=10000)
+    fcp = await page.evaluate(FIRST_CONTENTFUL_PAINT)
+    assert fcp < REPEAT_VISIT_FCP_BUDGET_MS, (
+        f"Repeat-visit first contentful paint took {fcp:.0f} ms "
+        f"(budget {REPEAT_VISIT_FCP_BUDGET_MS} ms)"
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(run_standalone(run_test, authenticated=True))
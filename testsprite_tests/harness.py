@@ -0,0 +1,82 @@
+"""Shared Playwright setup for the TC*.py test cases.
+
+Every test case exposes `async def run_test(context)` and receives an
+isolated browser context; `runner.py` runs many of them in parallel on one
+browser, while `run_standalone` keeps `python TC0xx_....py` working for a
+single case. Test cases that set `AUTHENTICATED = True` get a context seeded
+from a storage state captured by one real sign-in, instead of logging in
+through the UI themselves.
+"""
+
+import os
+import time
+from pathlib import Path
+
+from playwright import async_api
+
+BASE_URL = os.environ.get("POLYMIND_BASE_URL", "http://localhost:3000").rstrip("/")
+TEST_EMAIL = os.environ.get("POLYMIND_TEST_EMAIL", "loadtest@polymind.local")
+TEST_PASSWORD = os.environ.get("POLYMIND_TEST_PASSWORD", "polymind-local")
+AUTH_STATE = Path(os.environ.get(
+    "POLYMIND_AUTH_STATE", Path(__file__).parent / "tmp" / "storage_state.json"
+))
+AUTH_STATE_MAX_AGE = 30 * 60
+DEFAULT_TIMEOUT = 5000
+
+
+async def launch_browser(pw):
+    return await pw.chromium.launch(
+        headless=True,
+        args=[
+            "--window-size=1280,720",
+            "--disable-dev-shm-usage",
+        ],
+    )
+
+
+async def new_context(browser, authenticated=False):
+    context = await browser.new_context(
+        viewport={"width": 1280, "height": 720},
+        storage_state=str(AUTH_STATE) if authenticated else None,
+    )
+    context.set_default_timeout(DEFAULT_TIMEOUT)
+    return context
+
+
+async def ensure_auth_state(browser, force=False):
+    """Sign in once and persist cookies/localStorage for AUTHENTICATED tests."""
+    if (
+        not force
+        and AUTH_STATE.exists()
+        and time.time() - AUTH_STATE.stat().st_mtime < AUTH_STATE_MAX_AGE
+    ):
+        return AUTH_STATE
+
+    context = await new_context(browser)
+    try:
+        page = await context.new_page()
+        await page.goto(f"{BASE_URL}/login", wait_until="domcontentloaded")
+        await page.get_by_placeholder("Email").fill(TEST_EMAIL)
+        await page.get_by_placeholder("Password").fill(TEST_PASSWORD)
+        await page.get_by_role("button", name="Sign in").click()
+        await page.wait_for_url(f"{BASE_URL}/", timeout=15000)
+        AUTH_STATE.parent.mkdir(parents=True, exist_ok=True)
+        await context.storage_state(path=str(AUTH_STATE))
+    finally:
+        await context.close()
+    return AUTH_STATE
+
+
+async def run_standalone(run_test, authenticated=False):
+    async with async_api.async_playwright() as pw:
+        browser = await launch_browser(pw)
+        try:
+            if authenticated:
+                await ensure_auth_state(browser)
+            context = await new_context(browser, authenticated)
+            try:
+                await run_test(context)
+            finally:
+                await context.close()
+        finally:
+            await browser.close()
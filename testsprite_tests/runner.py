@@ -0,0 +1,110 @@
+"""Run the TC*.py test cases in parallel on a single shared browser.
+
+    python testsprite_tests/runner.py                 # all test cases
+    python testsprite_tests/runner.py -k TC00 -w 8    # subset, 8 in flight
+    python testsprite_tests/runner.py --json results.json
+
+Each test case gets its own browser context, so cookies and storage never
+leak between cases, while Chromium spreads the contexts' renderers across
+cores. Authenticated cases share one storage state captured up front.
+"""
+
+import argparse
+import asyncio
+import importlib.util
+import json
+import os
+import sys
+import time
+import traceback
+from pathlib import Path
+
+from playwright import async_api
+
+HERE = Path(__file__).resolve().parent
+sys.path.insert(0, str(HERE))
+
+import harness  # noqa: E402
+
+
+def load_cases(pattern):
+    cases, broken = [], []
+    for path in sorted(HERE.glob("TC*.py")):
+        if pattern and pattern not in path.stem:
+            continue
+        spec = importlib.util.spec_from_file_location(path.stem, path)
+        module = importlib.util.module_from_spec(spec)
+        try:
+            spec.loader.exec_module(module)
+        except Exception as exc:  # noqa: BLE001 - a broken case must not hide the rest
+            detail = "".join(traceback.format_exception_only(type(exc), exc)).strip()
+            print(f"ERROR   {path.stem} (load) {detail}", flush=True)
+            broken.append({"name": path.stem, "status": "error", "seconds": 0, "detail": detail})
+            continue
+        cases.append(module)
+    return cases, broken
+
+
+async def run_case(browser, module, semaphore, timeout):
+    async with semaphore:
+        authenticated = getattr(module, "AUTHENTICATED", False)
+        started = time.perf_counter()
+        context = await harness.new_context(browser, authenticated)
+        try:
+            await asyncio.wait_for(module.run_test(context), timeout)
+            status, detail = "passed", ""
+        except AssertionError as exc:
+            status, detail = "failed", str(exc)
+        except Exception as exc:  # noqa: BLE001 - report, don't abort the suite
+            status, detail = "error", "".join(traceback.format_exception_only(type(exc), exc)).strip()
+        finally:
+            await context.close()
+        elapsed = time.perf_counter() - started
+        print(f"{status.upper():7} {module.__name__} ({elapsed:.1f}s) {detail}".rstrip(), flush=True)
+        return {"name": module.__name__, "status": status, "seconds": round(elapsed, 2), "detail": detail}
+
+
+async def main(args):
+    cases, broken = load_cases(args.k)
+    if not cases and not broken:
+        print("no test cases matched", file=sys.stderr)
+        return 2
+
+    started = time.perf_counter()
+    async with async_api.async_playwright() as pw:
+        browser = await harness.launch_browser(pw)
+        try:
+            if any(getattr(m, "AUTHENTICATED", False) for m in cases):
+                await harness.ensure_auth_state(browser, force=args.fresh_auth)
+            semaphore = asyncio.Semaphore(args.workers)
+            results = broken + list(await asyncio.gather(
+                *(run_case(browser, m, semaphore, args.timeout) for m in cases)
+            ))
+        finally:
+            await browser.close()
+    wall = time.perf_counter() - started
+
+    counts = {s: sum(r["status"] == s for r in results) for s in ("passed", "failed", "error")}
+    print(
+        f"\n{counts['passed']} passed, {counts['failed']} failed, {counts['error']} errors "
+        f"in {wall:.1f}s with {args.workers} workers"
+    )
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"wall_seconds": round(wall, 2), "results": results}, f, indent=2)
+    return 0 if counts["failed"] == counts["error"] == 0 else 1
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("-k", help="only run test cases whose file name contains this")
+    parser.add_argument("-w", "--workers", type=int, default=os.cpu_count() or 4,
+                        help="test cases in flight at once (default: CPU count)")
+    parser.add_argument("--timeout", type=float, default=60, help="per-case timeout in seconds")
+    parser.add_argument("--fresh-auth", action="store_true", help="ignore a cached storage state")
+    parser.add_argument("--json", help="write results to this file")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main(parse_args())))
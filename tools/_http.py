@@ -0,0 +1,124 @@
+"""Minimal asyncio HTTP/1.1 client shared by the tools in this package.
+
+Kept dependency-free on purpose: the load generator has to run on any
+machine that can run the app, and it needs byte-level timing (TTFB, per-line
+arrival of streamed NDJSON) that higher-level clients hide.
+"""
+
+import asyncio
+import json
+import ssl
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Dict, Optional
+from urllib.parse import urlsplit
+
+
+@dataclass
+class Response:
+    status: int
+    headers: Dict[str, str]
+    reader: asyncio.StreamReader
+    writer: asyncio.StreamWriter
+    _chunked: bool = field(default=False, repr=False)
+    _length: Optional[int] = field(default=None, repr=False)
+
+    async def iter_chunks(self) -> AsyncIterator[bytes]:
+        if self._chunked:
+            while True:
+                size_line = await self.reader.readline()
+                size = int(size_line.split(b";", 1)[0].strip() or b"0", 16)
+                if size == 0:
+                    await self.reader.readline()
+                    return
+                data = await self.reader.readexactly(size)
+                await self.reader.readexactly(2)
+                yield data
+        elif self._length is not None:
+            remaining = self._length
+            while remaining > 0:
+                data = await self.reader.read(min(remaining, 65536))
+                if not data:
+                    return
+                remaining -= len(data)
+                yield data
+        else:
+            while True:
+                data = await self.reader.read(65536)
+                if not data:
+                    return
+                yield data
+
+    async def iter_lines(self) -> AsyncIterator[bytes]:
+        buffer = b""
+        async for chunk in self.iter_chunks():
+            buffer += chunk
+            while b"\n" in buffer:
+                line, buffer = buffer.split(b"\n", 1)
+                if line.strip():
+                    yield line
+        if buffer.strip():
+            yield buffer
+
+    async def read(self) -> bytes:
+        return b"".join([chunk async for chunk in self.iter_chunks()])
+
+    async def json(self):
+        return json.loads(await self.read())
+
+    def close(self) -> None:
+        self.writer.close()
+
+
+async def request(
+    method: str,
+    url: str,
+    *,
+    headers: Optional[Dict[str, str]] = None,
+    body: Optional[bytes] = None,
+    json_body=None,
+) -> Response:
+    """Send one request on a fresh connection and return once headers arrive."""
+    parts = urlsplit(url)
+    secure = parts.scheme == "https"
+    port = parts.port or (443 if secure else 80)
+    reader, writer = await asyncio.open_connection(
+        parts.hostname, port, ssl=ssl.create_default_context() if secure else None, limit=2**22
+    )
+
+    if json_body is not None:
+        body = json.dumps(json_body).encode()
+        headers = {"Content-Type": "application/json", **(headers or {})}
+    path = parts.path or "/"
+    if parts.query:
+        path += "?" + parts.query
+
+    lines = [f"{method} {path} HTTP/1.1", f"Host: {parts.netloc}", "Connection: close"]
+    for name, value in (headers or {}).items():
+        lines.append(f"{name}: {value}")
+    if body is not None:
+        lines.append(f"Content-Length: {len(body)}")
+    writer.write(("\r\n".join(lines) + "\r\n\r\n").encode() + (body or b""))
+    await writer.drain()
+
+    status_line = await reader.readline()
+    if not status_line:
+        writer.close()
+        raise ConnectionError(f"Empty response from {url}")
+    status = int(status_line.split(b" ", 2)[1])
+    response_headers: Dict[str, str] = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        response_headers[name.strip().lower()] = value.strip()
+
+    length = response_headers.get("content-length")
+    return Response(
+        status=status,
+        headers=response_headers,
+        reader=reader,
+        writer=writer,
+        _chunked=response_headers.get("transfer-encoding", "").lower() == "chunked",
+        _length=int(length) if length is not None else None,
+    )
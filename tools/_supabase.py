@@ -0,0 +1,49 @@
+"""Supabase Auth sign-in for the tools that call authenticated routes.
+
+The app's API routes accept `Authorization: Bearer <access token>` in place
+of session cookies, so a script signs in once with the password grant and
+reuses the token. Defaults match the user created by `supabase/seed.sql`.
+"""
+
+import argparse
+import os
+
+from tools import _http
+
+DEFAULT_EMAIL = "loadtest@polymind.local"
+DEFAULT_PASSWORD = "polymind-local"
+
+
+def add_auth_arguments(parser: argparse.ArgumentParser) -> None:
+    group = parser.add_argument_group("authentication")
+    group.add_argument("--supabase-url", default=os.environ.get("NEXT_PUBLIC_SUPABASE_URL"))
+    group.add_argument("--anon-key", default=os.environ.get("NEXT_PUBLIC_SUPABASE_ANON_KEY"))
+    group.add_argument("--email", default=os.environ.get("POLYMIND_TEST_EMAIL", DEFAULT_EMAIL))
+    group.add_argument(
+        "--password", default=os.environ.get("POLYMIND_TEST_PASSWORD", DEFAULT_PASSWORD)
+    )
+
+
+async def sign_in(supabase_url: str, anon_key: str, email: str, password: str) -> str:
+    response = await _http.request(
+        "POST",
+        f"{supabase_url.rstrip('/')}/auth/v1/token?grant_type=password",
+        headers={"apikey": anon_key},
+        json_body={"email": email, "password": password},
+    )
+    try:
+        body = await response.json()
+    finally:
+        response.close()
+    if response.status != 200:
+        message = body.get("error_description") or body.get("msg") or response.status
+        raise RuntimeError(f"sign-in as {email} failed: {message}")
+    return body["access_token"]
+
+
+async def auth_headers(args: argparse.Namespace) -> dict:
+    """Bearer header for `args`, or none when Supabase is not configured."""
+    if not (args.supabase_url and args.anon_key):
+        return {}
+    token = await sign_in(args.supabase_url, args.anon_key, args.email, args.password)
+    return {"Authorization": f"Bearer {token}"}
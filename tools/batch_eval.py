@@ -0,0 +1,153 @@
+"""Run a JSONL prompt set across models through `POST /api/batch`.
+
+    python -m tools.batch_eval prompts.jsonl --models openai/gpt-5-chat,google/gemini-2.5-pro \\
+        --out results.jsonl
+
+Each input line is `{"id": "...", "prompt": "..."}` (`id` defaults to the
+line number). Prompts are sent in chunks; the server runs every chunk with
+a bounded worker pool per model, honouring each model's rate limit, and
+streams results back as they finish. Every result is appended to `--out`
+as soon as it arrives, so the output file doubles as the checkpoint:
+re-running the same command after a crash or Ctrl-C skips the
+(prompt, model) pairs already recorded and carries on. Pass
+`--retry-errors` to also redo pairs that previously failed.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+from typing import Dict, Iterable, List, Set, Tuple
+
+from tools import _http, _supabase
+
+
+def load_prompts(path: str) -> List[dict]:
+    items, seen = [], set()
+    with open(path) as f:
+        for number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            item_id = str(record.get("id", number))
+            if item_id in seen:
+                raise ValueError(f"{path}:{number}: duplicate id {item_id!r}")
+            seen.add(item_id)
+            items.append({"id": item_id, "prompt": record["prompt"]})
+    return items
+
+
+def load_checkpoint(path: str, retry_errors: bool) -> Set[Tuple[str, str]]:
+    """(item id, model id) pairs already in the output file.
+
+    A crash can leave a partial last line; it is cut off so that appending
+    resumes on a clean line boundary.
+    """
+    done: Set[Tuple[str, str]] = set()
+    if not os.path.exists(path):
+        return done
+    with open(path, "rb+") as f:
+        data = f.read()
+        end = data.rfind(b"\n") + 1
+        if end < len(data):
+            f.truncate(end)
+    for line in data[:end].splitlines():
+        if not line.strip():
+            continue
+        result = json.loads(line)
+        if retry_errors and result.get("error"):
+            continue
+        done.add((result["itemId"], result["modelId"]))
+    return done
+
+
+def pending_chunks(
+    items: List[dict], models: List[str], done: Set[Tuple[str, str]], size: int
+) -> Iterable[Tuple[List[dict], List[str]]]:
+    """Groups outstanding work into chunks that share the same model list."""
+    by_models: Dict[Tuple[str, ...], List[dict]] = {}
+    for item in items:
+        missing = tuple(m for m in models if (item["id"], m) not in done)
+        if missing:
+            by_models.setdefault(missing, []).append(item)
+    for missing, group in by_models.items():
+        for start in range(0, len(group), size):
+            yield group[start:start + size], list(missing)
+
+
+async def run_chunk(args, headers, items, models, out) -> Tuple[int, int]:
+    response = await _http.request(
+        "POST",
+        f"{args.url}/api/batch",
+        headers=headers,
+        json_body={"items": items, "modelIds": models, "concurrency": args.concurrency},
+    )
+    try:
+        if response.status != 200:
+            body = await response.read()
+            try:
+                message = json.loads(body).get("error")
+            except ValueError:
+                message = body[:200].decode(errors="replace")
+            raise RuntimeError(f"HTTP {response.status}: {message}")
+        ok = failed = 0
+        async for line in response.iter_lines():
+            result = json.loads(line)
+            out.write(json.dumps(result) + "\n")
+            out.flush()
+            if result.get("error"):
+                failed += 1
+            else:
+                ok += 1
+        return ok, failed
+    finally:
+        response.close()
+
+
+async def main(args) -> int:
+    items = load_prompts(args.prompts)
+    done = load_checkpoint(args.out, args.retry_errors)
+    total = len(items) * len(args.models)
+    remaining = total - sum((i["id"], m) in done for i in items for m in args.models)
+    print(f"{total} results wanted, {total - remaining} already in {args.out}", file=sys.stderr)
+    if remaining == 0:
+        return 0
+
+    headers = await _supabase.auth_headers(args)
+    completed = failures = 0
+    with open(args.out, "a") as out:
+        for chunk, models in pending_chunks(items, args.models, done, args.chunk_size):
+            try:
+                ok, failed = await run_chunk(args, headers, chunk, models, out)
+            except (OSError, RuntimeError) as exc:
+                print(f"stopping: {exc}; re-run to resume", file=sys.stderr)
+                return 1
+            completed += ok + failed
+            failures += failed
+            print(
+                f"  {total - remaining + completed}/{total} done ({failures} errors)",
+                file=sys.stderr,
+                flush=True,
+            )
+    return 1 if failures else 0
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("prompts", help="JSONL file of {id, prompt} records")
+    parser.add_argument("--models", type=lambda s: s.split(","), required=True)
+    parser.add_argument("--out", required=True, help="JSONL results file (appended, used to resume)")
+    parser.add_argument("--url", default="http://localhost:3000")
+    parser.add_argument("--chunk-size", type=int, default=20, help="prompts per request")
+    parser.add_argument("--concurrency", type=int, default=4, help="requests in flight per model")
+    parser.add_argument("--retry-errors", action="store_true", help="redo previously failed pairs")
+    _supabase.add_auth_arguments(parser)
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    try:
+        sys.exit(asyncio.run(main(parse_args())))
+    except KeyboardInterrupt:
+        sys.exit(130)
@@ -0,0 +1,160 @@
+"""Compare cold-start latency of the chat route on the Node and Edge runtimes.
+
+    npm run build
+    python -m tools.cold_start --runs 5 --out cold-start.json
+
+Both copies of the route exist in every build (`/api/chat` on Node,
+`/api/chat/edge` on Edge), so one build serves both. For each run and
+runtime a fresh `next start` is launched, and the first request it serves
+is timed (time to response headers, to the first streamed text, and to
+completion), followed by one warm request for reference. Point the app at
+`tools.mock_openrouter` to keep upstream latency out of the comparison.
+Whichever runtime wins can then be selected with `CHAT_RUNTIME` at build
+time, with no code changes.
+
+Note that `next start` runs Edge routes in Next's local Edge sandbox, which
+approximates but is not identical to a hosted Edge deployment.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import signal
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional
+
+from tools import _http, _supabase
+
+PATHS = {"node": "/api/chat", "edge": "/api/chat/edge"}
+
+
+async def wait_for_port(host: str, port: int, timeout: float) -> None:
+    deadline = time.perf_counter() + timeout
+    while True:
+        try:
+            _, writer = await asyncio.open_connection(host, port)
+            writer.close()
+            return
+        except OSError:
+            if time.perf_counter() > deadline:
+                raise TimeoutError(f"server did not listen on {host}:{port} within {timeout}s")
+            await asyncio.sleep(0.05)
+
+
+async def timed_chat(url: str, headers: Dict[str, str], payload: dict) -> dict:
+    started = time.perf_counter()
+    ms = lambda: round((time.perf_counter() - started) * 1000, 1)  # noqa: E731
+    response = await _http.request("POST", url, headers=headers, json_body=payload)
+    result: Dict[str, Optional[float]] = {"status": response.status, "ttfb_ms": ms(), "first_delta_ms": None}
+    try:
+        async for line in response.iter_lines():
+            if result["first_delta_ms"] is None and b'"delta"' in line:
+                result["first_delta_ms"] = ms()
+    finally:
+        response.close()
+    result["total_ms"] = ms()
+    return result
+
+
+async def measure(args, runtime: str, headers: Dict[str, str]) -> dict:
+    env = {**os.environ, "PORT": str(args.port)}
+    launched = time.perf_counter()
+    process = subprocess.Popen(
+        args.command.format(port=args.port),
+        shell=True,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+    try:
+        await wait_for_port("127.0.0.1", args.port, args.start_timeout)
+        listening_ms = round((time.perf_counter() - launched) * 1000, 1)
+        url = f"http://127.0.0.1:{args.port}{PATHS[runtime]}"
+        payload = {"message": args.prompt, "modelIds": args.models}
+        cold = await timed_chat(url, headers, payload)
+        warm = await timed_chat(url, headers, payload)
+        return {"runtime": runtime, "listening_ms": listening_ms, "cold": cold, "warm": warm}
+    finally:
+        os.killpg(process.pid, signal.SIGTERM)
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            os.killpg(process.pid, signal.SIGKILL)
+            process.wait()
+
+
+def median(values: List[Optional[float]]) -> Optional[float]:
+    present = [v for v in values if v is not None]
+    return round(statistics.median(present), 1) if present else None
+
+
+def summarize(runs: List[dict]) -> Dict[str, dict]:
+    summary = {}
+    for runtime in sorted({run["runtime"] for run in runs}):
+        mine = [run for run in runs if run["runtime"] == runtime]
+        summary[runtime] = {
+            "runs": len(mine),
+            "listening_ms": median([r["listening_ms"] for r in mine]),
+            **{
+                f"{phase}_{metric}": median([r[phase][metric] for r in mine])
+                for phase in ("cold", "warm")
+                for metric in ("ttfb_ms", "first_delta_ms", "total_ms")
+            },
+        }
+    return summary
+
+
+async def main(args) -> int:
+    headers = await _supabase.auth_headers(args)
+    runs = []
+    for number in range(1, args.runs + 1):
+        # Alternate which runtime goes first so neither benefits from a
+        # warmer disk cache.
+        order = args.runtimes if number % 2 else list(reversed(args.runtimes))
+        for runtime in order:
+            run = await measure(args, runtime, headers)
+            print(
+                f"run {number} {runtime:4}: listening {run['listening_ms']} ms, "
+                f"cold ttfb {run['cold']['ttfb_ms']} ms, first text {run['cold']['first_delta_ms']} ms, "
+                f"warm ttfb {run['warm']['ttfb_ms']} ms",
+                file=sys.stderr,
+                flush=True,
+            )
+            runs.append(run)
+
+    report = {"summary": summarize(runs), "runs": runs}
+    text = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    return 0
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--runtimes", type=lambda s: s.split(","), default=list(PATHS))
+    parser.add_argument("--port", type=int, default=3100)
+    parser.add_argument("--command", default="npx next start -p {port}",
+                        help="server start command; {port} is substituted")
+    parser.add_argument("--start-timeout", type=float, default=60)
+    parser.add_argument("--models", type=lambda s: s.split(","), default=["openai/gpt-5-chat"])
+    parser.add_argument("--prompt", default="Say hello.")
+    parser.add_argument("--out", help="write the JSON report here (default: stdout)")
+    _supabase.add_auth_arguments(parser)
+    args = parser.parse_args(argv)
+    unknown = set(args.runtimes) - set(PATHS)
+    if unknown:
+        parser.error(f"unknown runtime(s): {', '.join(sorted(unknown))}")
+    return args
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main(parse_args())))
@@ -0,0 +1,369 @@
+"""Load generator for `POST /api/chat` with concurrency sweeps.
+
+Drives the chat route with a closed-loop pool of workers at each requested
+concurrency level, picking how many models every request fans out to from a
+weighted mix, and records throughput, per-model latency percentiles, error
+rates and the server's resident memory. Intended to run against the local
+stand-ins from `tools.mock_openrouter` so that results are comparable (the
+route requires a signed-in user; with NEXT_PUBLIC_SUPABASE_URL and
+NEXT_PUBLIC_SUPABASE_ANON_KEY set, the seeded test user is used):
+
+    python -m tools.loadgen run --concurrency 1,8,32 --duration 30 \\
+        --mix 1:1,2:1,4:2 --server-pid $(pgrep -f "next start") \\
+        --mock-url http://127.0.0.1:8787 --out runs/baseline.json
+
+    python -m tools.loadgen compare runs/baseline.json runs/candidate.json \\
+        --max-regression 10
+
+`compare` exits non-zero when the candidate regresses beyond the thresholds,
+so it can gate a change in CI.
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import subprocess
+import sys
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from tools import _http, _supabase
+
+# The same registry the app reads (config/models.json).
+with open(Path(__file__).resolve().parent.parent / "config" / "models.json") as _f:
+    DEFAULT_MODELS = [model["id"] for model in json.load(_f)]
+
+
+@dataclass
+class Sample:
+    model_count: int
+    status: int
+    latency_ms: float
+    ttfb_ms: float
+    models: Dict[str, Tuple[float, bool]] = field(default_factory=dict)
+    error: Optional[str] = None
+    first_delta_ms: Optional[float] = None
+
+    @property
+    def failed(self) -> bool:
+        return self.error is not None or any(err for _, err in self.models.values())
+
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, math.ceil(pct / 100 * len(ordered)) - 1))
+    return round(ordered[rank], 2)
+
+
+def summarize_latencies(values: List[float]) -> dict:
+    return {
+        "count": len(values),
+        "p50": percentile(values, 50),
+        "p90": percentile(values, 90),
+        "p99": percentile(values, 99),
+        "max": round(max(values), 2) if values else None,
+    }
+
+
+def parse_mix(spec: str) -> List[Tuple[int, float]]:
+    mix = []
+    for part in spec.split(","):
+        count, _, weight = part.partition(":")
+        mix.append((int(count), float(weight or 1)))
+    return mix
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def sample_rss(pid: int, interval: float, out: List[float], stop: asyncio.Event) -> None:
+    """Poll the server's RSS in MB; `ps` keeps this portable across Linux and macOS."""
+    while not stop.is_set():
+        proc = await asyncio.create_subprocess_exec(
+            "ps", "-o", "rss=", "-p", str(pid), stdout=asyncio.subprocess.PIPE
+        )
+        stdout, _ = await proc.communicate()
+        if stdout.strip():
+            out.append(int(stdout.split()[0]) / 1024)
+        try:
+            await asyncio.wait_for(stop.wait(), timeout=interval)
+        except asyncio.TimeoutError:
+            pass
+
+
+async def mock_stats(mock_url: Optional[str]) -> Optional[dict]:
+    if not mock_url:
+        return None
+    try:
+        response = await _http.request("GET", f"{mock_url}/__mock/stats")
+        return await response.json()
+    except OSError:
+        return None
+
+
+async def send_chat(args: argparse.Namespace, models: List[str]) -> Sample:
+    payload = {"message": args.prompt, "modelIds": models}
+    started = time.perf_counter()
+    try:
+        response = await _http.request(
+            "POST", f"{args.url}/api/chat", json_body=payload, headers=args.headers
+        )
+    except OSError as exc:
+        elapsed = (time.perf_counter() - started) * 1000
+        return Sample(len(models), 0, elapsed, elapsed, error=str(exc))
+
+    ttfb = (time.perf_counter() - started) * 1000
+    sample = Sample(len(models), response.status, 0.0, ttfb)
+    try:
+        if response.status != 200:
+            await response.read()
+            sample.error = f"HTTP {response.status}"
+        elif "ndjson" in response.headers.get("content-type", ""):
+            # Streamed: each model completes at its own `done` line.
+            async for line in response.iter_lines():
+                event = json.loads(line)
+                if event["type"] == "delta" and sample.first_delta_ms is None:
+                    sample.first_delta_ms = (time.perf_counter() - started) * 1000
+                elif event["type"] == "done":
+                    item = event["response"]
+                    elapsed = (time.perf_counter() - started) * 1000
+                    sample.models[item["modelId"]] = (elapsed, bool(item.get("error")))
+                elif event["type"] == "error":
+                    sample.error = event["error"]
+        else:
+            body = await response.read()
+            elapsed = (time.perf_counter() - started) * 1000
+            for item in json.loads(body).get("responses", []):
+                sample.models[item["modelId"]] = (elapsed, bool(item.get("error")))
+    finally:
+        response.close()
+    sample.latency_ms = (time.perf_counter() - started) * 1000
+    return sample
+
+
+async def run_step(args: argparse.Namespace, concurrency: int, rng: random.Random) -> dict:
+    counts, weights = zip(*parse_mix(args.mix))
+    samples: List[Sample] = []
+    rss: List[float] = []
+    stop = asyncio.Event()
+    before = await mock_stats(args.mock_url)
+
+    warmup_until = time.perf_counter() + args.warmup
+    deadline = warmup_until + args.duration
+
+    async def worker() -> None:
+        while time.perf_counter() < deadline:
+            count = min(rng.choices(counts, weights)[0], len(args.models))
+            sample = await send_chat(args, rng.sample(args.models, count))
+            if time.perf_counter() - sample.latency_ms / 1000 >= warmup_until:
+                samples.append(sample)
+
+    rss_task = (
+        asyncio.create_task(sample_rss(args.server_pid, args.rss_interval, rss, stop))
+        if args.server_pid
+        else None
+    )
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    stop.set()
+    if rss_task:
+        await rss_task
+    after = await mock_stats(args.mock_url)
+
+    per_model: Dict[str, dict] = {}
+    for model in args.models:
+        observed = [s.models[model] for s in samples if model in s.models]
+        if not observed:
+            continue
+        per_model[model] = {
+            "latency_ms": summarize_latencies([lat for lat, _ in observed]),
+            "error_rate": round(sum(err for _, err in observed) / len(observed), 4),
+        }
+
+    by_count: Dict[str, dict] = {}
+    for count in sorted(set(s.model_count for s in samples)):
+        by_count[str(count)] = summarize_latencies(
+            [s.latency_ms for s in samples if s.model_count == count]
+        )
+
+    upstream_calls = upstream_connections = None
+    if before and after:
+        upstream_calls = sum(after["requests"].values()) - sum(before["requests"].values())
+        upstream_connections = after.get("connections", 0) - before.get("connections", 0)
+
+    return {
+        "concurrency": concurrency,
+        "requests": len(samples),
+        "throughput_rps": round(len(samples) / args.duration, 3),
+        "error_rate": round(sum(s.failed for s in samples) / len(samples), 4) if samples else None,
+        "http_errors": sum(1 for s in samples if s.error),
+        "latency_ms": summarize_latencies([s.latency_ms for s in samples]),
+        "ttfb_ms": summarize_latencies([s.ttfb_ms for s in samples]),
+        "first_delta_ms": summarize_latencies(
+            [s.first_delta_ms for s in samples if s.first_delta_ms is not None]
+        ),
+        "latency_by_model_count": by_count,
+        "models": per_model,
+        "rss_mb": {
+            "peak": round(max(rss), 1) if rss else None,
+            "mean": round(sum(rss) / len(rss), 1) if rss else None,
+        },
+        "upstream_calls": upstream_calls,
+        "upstream_connections": upstream_connections,
+    }
+
+
+async def run(args: argparse.Namespace) -> dict:
+    rng = random.Random(args.seed)
+    args.headers = await _supabase.auth_headers(args)
+    args.headers.update(
+        (name.strip(), value.strip()) for name, value in (h.split(":", 1) for h in args.header)
+    )
+    steps = []
+    for concurrency in args.concurrency:
+        print(f"concurrency={concurrency} ...", file=sys.stderr, flush=True)
+        step = await run_step(args, concurrency, rng)
+        print(
+            f"  {step['throughput_rps']} req/s, p50 {step['latency_ms']['p50']} ms, "
+            f"p99 {step['latency_ms']['p99']} ms, errors {step['error_rate']}",
+            file=sys.stderr,
+            flush=True,
+        )
+        steps.append(step)
+    return {
+        "meta": {
+            "started_at": datetime.now(timezone.utc).isoformat(),
+            "revision": git_revision(),
+            "url": args.url,
+            "mix": args.mix,
+            "models": args.models,
+            "duration_s": args.duration,
+            "warmup_s": args.warmup,
+            "seed": args.seed,
+        },
+        "steps": steps,
+    }
+
+
+def pct_change(old: Optional[float], new: Optional[float]) -> Optional[float]:
+    if old in (None, 0) or new is None:
+        return None
+    return round((new - old) / old * 100, 1)
+
+
+def compare(base: dict, candidate: dict, max_regression: float, max_error_increase: float) -> Tuple[str, List[str]]:
+    base_steps = {s["concurrency"]: s for s in base["steps"]}
+    rows = [
+        f"{'conc':>5} {'rps':>16} {'p50 ms':>22} {'p99 ms':>22} {'errors':>16} {'rss MB':>16}",
+    ]
+    failures = []
+
+    def cell(old, new, change):
+        suffix = f" ({change:+.1f}%)" if change is not None else ""
+        return f"{old}->{new}{suffix}"
+
+    for step in candidate["steps"]:
+        old = base_steps.get(step["concurrency"])
+        if not old:
+            continue
+        rps = pct_change(old["throughput_rps"], step["throughput_rps"])
+        p50 = pct_change(old["latency_ms"]["p50"], step["latency_ms"]["p50"])
+        p99 = pct_change(old["latency_ms"]["p99"], step["latency_ms"]["p99"])
+        rss = pct_change(old["rss_mb"]["peak"], step["rss_mb"]["peak"])
+        rows.append(
+            f"{step['concurrency']:>5} "
+            f"{cell(old['throughput_rps'], step['throughput_rps'], rps):>16} "
+            f"{cell(old['latency_ms']['p50'], step['latency_ms']['p50'], p50):>22} "
+            f"{cell(old['latency_ms']['p99'], step['latency_ms']['p99'], p99):>22} "
+            f"{cell(old['error_rate'], step['error_rate'], None):>16} "
+            f"{cell(old['rss_mb']['peak'], step['rss_mb']['peak'], rss):>16}"
+        )
+        if rps is not None and rps < -max_regression:
+            failures.append(f"c={step['concurrency']}: throughput {rps:+.1f}%")
+        if p99 is not None and p99 > max_regression:
+            failures.append(f"c={step['concurrency']}: p99 latency {p99:+.1f}%")
+        if (step["error_rate"] or 0) - (old["error_rate"] or 0) > max_error_increase:
+            failures.append(f"c={step['concurrency']}: error rate {old['error_rate']} -> {step['error_rate']}")
+
+        for model, stats in step["models"].items():
+            old_model = old["models"].get(model)
+            if not old_model:
+                continue
+            change = pct_change(old_model["latency_ms"]["p99"], stats["latency_ms"]["p99"])
+            rows.append(
+                f"{'':>5}   {model:<28} p99 "
+                f"{cell(old_model['latency_ms']['p99'], stats['latency_ms']['p99'], change)}"
+            )
+    return "\n".join(rows), failures
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = sub.add_parser("run", help="run a concurrency sweep")
+    run_parser.add_argument("--url", default="http://localhost:3000")
+    run_parser.add_argument(
+        "--concurrency", type=lambda s: [int(c) for c in s.split(",")], default=[1, 4, 16]
+    )
+    run_parser.add_argument("--duration", type=float, default=20, help="seconds measured per step")
+    run_parser.add_argument("--warmup", type=float, default=3, help="seconds discarded per step")
+    run_parser.add_argument("--mix", default="1:1,2:1,4:2", help="model-count:weight pairs")
+    run_parser.add_argument("--models", type=lambda s: s.split(","), default=DEFAULT_MODELS)
+    run_parser.add_argument("--prompt", default="Explain the difference between TCP and UDP.")
+    run_parser.add_argument("--header", action="append", default=[], help="extra 'Name: value' header")
+    run_parser.add_argument("--server-pid", type=int, help="PID of the Next.js server for RSS sampling")
+    run_parser.add_argument("--rss-interval", type=float, default=1.0)
+    run_parser.add_argument("--mock-url", help="tools.mock_openrouter base URL for upstream call counts")
+    run_parser.add_argument("--seed", type=int, default=0)
+    run_parser.add_argument("--out", help="write the JSON report here (default: stdout)")
+    _supabase.add_auth_arguments(run_parser)
+
+    compare_parser = sub.add_parser("compare", help="compare two run reports")
+    compare_parser.add_argument("base")
+    compare_parser.add_argument("candidate")
+    compare_parser.add_argument("--max-regression", type=float, default=10.0,
+                                help="allowed %% drop in throughput / rise in p99")
+    compare_parser.add_argument("--max-error-increase", type=float, default=0.01,
+                                help="allowed absolute rise in error rate")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    if args.command == "run":
+        report = asyncio.run(run(args))
+        data = json.dumps(report, indent=2)
+        if args.out:
+            with open(args.out, "w") as f:
+                f.write(data + "\n")
+        else:
+            print(data)
+        return 0
+
+    with open(args.base) as f:
+        base = json.load(f)
+    with open(args.candidate) as f:
+        candidate = json.load(f)
+    table, failures = compare(base, candidate, args.max_regression, args.max_error_increase)
+    print(f"base {base['meta'].get('revision')} vs candidate {candidate['meta'].get('revision')}")
+    print(table)
+    for failure in failures:
+        print(f"REGRESSION {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
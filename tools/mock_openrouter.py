@@ -0,0 +1,354 @@
+"""Local OpenRouter stand-in for deterministic load and latency testing.
+
+Speaks the subset of the OpenAI-compatible API that `lib/openrouter.ts` uses
+(`POST /api/v1/chat/completions`, streaming and non-streaming) and lets every
+latency characteristic be dialled in from the command line or at runtime:
+
+    python -m tools.mock_openrouter --port 8787 --ttft-ms 400 --tokens-per-sec 60
+
+Point the app at it with `OPENROUTER_BASE_URL=http://127.0.0.1:8787/api/v1`.
+
+Messages marked with `cache_control` emulate explicit prompt caching: a
+prefix the same model has seen before is reported as `cached_tokens` and
+shortens time-to-first-token.
+
+Per-model overrides are read from a JSON file (`--model-config`), e.g.
+`{"deepseek/deepseek-r1-0528": {"ttft_ms": 4000, "tokens_per_sec": 25}}`.
+Runtime inspection and reconfiguration go through `GET /__mock/stats` and
+`POST /__mock/config` (same keys as the JSON file, plus `"default"`).
+
+Only the standard library is used so the server runs anywhere Python does.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+import uuid
+from dataclasses import asdict, dataclass, field, replace
+from typing import Dict, Optional, Tuple
+
+WORDS = (
+    "the model considers your prompt carefully and responds with a "
+    "deterministic stream of tokens so that latency measurements stay "
+    "comparable between runs across every configured provider"
+).split()
+
+
+@dataclass
+class Profile:
+    ttft_ms: float = 300.0
+    tokens_per_sec: float = 80.0
+    output_tokens: int = 120
+    error_rate: float = 0.0
+    error_status: int = 502
+    jitter: float = 0.0
+    # TTFT saved per fully cached prompt, scaled by the cached share
+    cache_ttft_saving: float = 0.7
+
+
+@dataclass
+class MockState:
+    default: Profile
+    models: Dict[str, Profile] = field(default_factory=dict)
+    seed: int = 0
+    requests: Dict[str, int] = field(default_factory=dict)
+    errors: Dict[str, int] = field(default_factory=dict)
+    prompt_cache: Dict[str, None] = field(default_factory=dict)
+    cached_tokens: Dict[str, int] = field(default_factory=dict)
+    cancelled: Dict[str, int] = field(default_factory=dict)
+    in_flight: int = 0
+    peak_in_flight: int = 0
+    connections: int = 0
+
+    def profile(self, model: str) -> Profile:
+        return self.models.get(model, self.default)
+
+    def apply(self, config: dict) -> None:
+        if "default" in config:
+            self.default = replace(self.default, **config["default"])
+        for model, overrides in config.items():
+            if model == "default":
+                continue
+            self.models[model] = replace(self.profile(model), **overrides)
+
+    def snapshot(self) -> dict:
+        return {
+            "default": asdict(self.default),
+            "models": {k: asdict(v) for k, v in self.models.items()},
+            "requests": self.requests,
+            "errors": self.errors,
+            "in_flight": self.in_flight,
+            "peak_in_flight": self.peak_in_flight,
+            "connections": self.connections,
+            "cached_tokens": self.cached_tokens,
+            "cancelled": self.cancelled,
+        }
+
+
+def count_tokens(text: str) -> int:
+    return max(1, len(text.split()))
+
+
+def prompt_text(body: dict) -> str:
+    parts = []
+    for message in body.get("messages", []):
+        content = message.get("content", "")
+        if isinstance(content, list):
+            content = " ".join(p.get("text", "") for p in content)
+        parts.append(content)
+    return " ".join(parts)
+
+
+def completion_tokens(rng: random.Random, profile: Profile):
+    count = profile.output_tokens
+    if profile.jitter:
+        count = max(1, int(count * rng.uniform(1 - profile.jitter, 1 + profile.jitter)))
+    return [WORDS[i % len(WORDS)] + " " for i in range(count)]
+
+
+def usage(prompt: str, tokens, cached: int = 0) -> dict:
+    prompt_tokens = count_tokens(prompt)
+    return {
+        "prompt_tokens": prompt_tokens,
+        "prompt_tokens_details": {"cached_tokens": cached},
+        "completion_tokens": len(tokens),
+        "total_tokens": prompt_tokens + len(tokens),
+    }
+
+
+def has_cache_control(message: dict) -> bool:
+    content = message.get("content")
+    parts = content if isinstance(content, list) else []
+    return bool(message.get("cache_control")) or any(p.get("cache_control") for p in parts)
+
+
+MAX_CACHED_PREFIXES = 10000
+
+
+def cached_prefix_tokens(state: "MockState", model: str, body: dict) -> int:
+    """Emulates explicit prompt caching: the messages up to the last one
+    carrying `cache_control` are a hit when the same model saw that exact
+    prefix before, and are remembered for next time either way."""
+    messages = body.get("messages", [])
+    marked = [i for i, message in enumerate(messages) if has_cache_control(message)]
+    if not marked:
+        return 0
+    prefix = messages[: marked[-1] + 1]
+    key = model + json.dumps(prefix, sort_keys=True)
+    hit = key in state.prompt_cache
+    state.prompt_cache[key] = None
+    if len(state.prompt_cache) > MAX_CACHED_PREFIXES:
+        del state.prompt_cache[next(iter(state.prompt_cache))]
+    return count_tokens(prompt_text({"messages": prefix})) if hit else 0
+
+
+async def read_request(reader: asyncio.StreamReader) -> Optional[Tuple[str, str, dict, bytes]]:
+    request_line = await reader.readline()
+    if not request_line:
+        return None
+    method, path, _ = request_line.decode("latin-1").split(" ", 2)
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    body = b""
+    if "content-length" in headers:
+        body = await reader.readexactly(int(headers["content-length"]))
+    return method, path.split("?", 1)[0], headers, body
+
+
+def write_head(writer: asyncio.StreamWriter, status: int, content_type: str, length: Optional[int] = None) -> None:
+    head = [f"HTTP/1.1 {status} {'OK' if status < 400 else 'Error'}", f"Content-Type: {content_type}"]
+    if length is None:
+        head.append("Transfer-Encoding: chunked")
+    else:
+        head.append(f"Content-Length: {length}")
+    head.append("Connection: keep-alive")
+    writer.write(("\r\n".join(head) + "\r\n\r\n").encode())
+
+
+def write_json(writer: asyncio.StreamWriter, status: int, payload: dict) -> None:
+    data = json.dumps(payload).encode()
+    write_head(writer, status, "application/json", len(data))
+    writer.write(data)
+
+
+async def write_chunk(writer: asyncio.StreamWriter, data: bytes) -> None:
+    writer.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+    await writer.drain()
+
+
+async def handle_completion(state: MockState, body: dict, writer: asyncio.StreamWriter) -> None:
+    model = body.get("model", "unknown")
+    profile = state.profile(model)
+    n = state.requests.get(model, 0)
+    state.requests[model] = n + 1
+    rng = random.Random(f"{state.seed}:{model}:{n}")
+
+    prompt = prompt_text(body)
+    tokens = completion_tokens(rng, profile)
+    completion_id = f"gen-{uuid.UUID(int=rng.getrandbits(128)).hex}"
+    created = int(time.time())
+    cached = cached_prefix_tokens(state, model, body)
+    state.cached_tokens[model] = state.cached_tokens.get(model, 0) + cached
+
+    cached_share = cached / count_tokens(prompt)
+    await asyncio.sleep(profile.ttft_ms * (1 - profile.cache_ttft_saving * cached_share) / 1000)
+
+    if rng.random() < profile.error_rate:
+        state.errors[model] = state.errors.get(model, 0) + 1
+        write_json(writer, profile.error_status, {
+            "error": {"message": f"Mock upstream error for {model}", "code": profile.error_status},
+        })
+        await writer.drain()
+        return
+
+    interval = 1 / profile.tokens_per_sec if profile.tokens_per_sec > 0 else 0
+
+    if not body.get("stream"):
+        await asyncio.sleep(interval * len(tokens))
+        write_json(writer, 200, {
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": created,
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": "".join(tokens).strip()},
+                "finish_reason": "stop",
+            }],
+            "usage": usage(prompt, tokens, cached),
+        })
+        await writer.drain()
+        return
+
+    write_head(writer, 200, "text/event-stream")
+
+    def event(delta: dict, finish_reason=None, **extra) -> bytes:
+        chunk = {
+            "id": completion_id,
+            "object": "chat.completion.chunk",
+            "created": created,
+            "model": model,
+            "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+            **extra,
+        }
+        return f"data: {json.dumps(chunk)}\n\n".encode()
+
+    try:
+        await write_chunk(writer, event({"role": "assistant", "content": ""}))
+        for token in tokens:
+            await write_chunk(writer, event({"content": token}))
+            if interval:
+                await asyncio.sleep(interval)
+    except (ConnectionResetError, BrokenPipeError):
+        # The caller hung up mid-stream, i.e. cancelled the generation.
+        state.cancelled[model] = state.cancelled.get(model, 0) + 1
+        raise
+    await write_chunk(writer, event({}, "stop", usage=usage(prompt, tokens, cached)))
+    await write_chunk(writer, b"data: [DONE]\n\n")
+    await write_chunk(writer, b"")
+
+
+async def handle_connection(state: MockState, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    state.connections += 1
+    try:
+        while True:
+            request = await read_request(reader)
+            if request is None:
+                break
+            method, path, _, raw = request
+
+            if method == "POST" and path.endswith("/chat/completions"):
+                state.in_flight += 1
+                state.peak_in_flight = max(state.peak_in_flight, state.in_flight)
+                try:
+                    await handle_completion(state, json.loads(raw or b"{}"), writer)
+                finally:
+                    state.in_flight -= 1
+            elif method == "HEAD":
+                # Connection warm-up probes; no body may follow a HEAD response.
+                writer.write(b"HTTP/1.1 200 OK\r\nContent-Length: 0\r\nConnection: keep-alive\r\n\r\n")
+            elif method == "GET" and path.endswith("/models"):
+                known = set(state.models) | set(state.requests)
+                write_json(writer, 200, {"data": [{"id": m} for m in sorted(known)]})
+            elif method == "GET" and path == "/__mock/stats":
+                write_json(writer, 200, state.snapshot())
+            elif method == "POST" and path == "/__mock/config":
+                state.apply(json.loads(raw or b"{}"))
+                write_json(writer, 200, state.snapshot())
+            elif method == "POST" and path == "/__mock/reset":
+                state.requests.clear()
+                state.errors.clear()
+                state.prompt_cache.clear()
+                state.cached_tokens.clear()
+                state.cancelled.clear()
+                state.peak_in_flight = state.in_flight
+                state.connections = 0
+                write_json(writer, 200, state.snapshot())
+            else:
+                write_json(writer, 404, {"error": {"message": f"No route for {method} {path}"}})
+            await writer.drain()
+    except (ConnectionResetError, asyncio.IncompleteReadError, BrokenPipeError):
+        pass
+    finally:
+        writer.close()
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8787)
+    parser.add_argument("--ttft-ms", type=float, default=Profile.ttft_ms)
+    parser.add_argument("--tokens-per-sec", type=float, default=Profile.tokens_per_sec)
+    parser.add_argument("--output-tokens", type=int, default=Profile.output_tokens)
+    parser.add_argument("--error-rate", type=float, default=Profile.error_rate)
+    parser.add_argument("--error-status", type=int, default=Profile.error_status)
+    parser.add_argument("--jitter", type=float, default=Profile.jitter,
+                        help="relative +/- variation applied to output length")
+    parser.add_argument("--cache-ttft-saving", type=float, default=Profile.cache_ttft_saving,
+                        help="share of TTFT saved when the whole prompt is a cache hit")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--model-config", help="JSON file with per-model profile overrides")
+    return parser.parse_args(argv)
+
+
+async def serve(args: argparse.Namespace) -> None:
+    state = MockState(
+        default=Profile(
+            ttft_ms=args.ttft_ms,
+            tokens_per_sec=args.tokens_per_sec,
+            output_tokens=args.output_tokens,
+            error_rate=args.error_rate,
+            error_status=args.error_status,
+            jitter=args.jitter,
+            cache_ttft_saving=args.cache_ttft_saving,
+        ),
+        seed=args.seed,
+    )
+    if args.model_config:
+        with open(args.model_config) as f:
+            state.apply(json.load(f))
+
+    server = await asyncio.start_server(
+        lambda r, w: handle_connection(state, r, w), args.host, args.port, limit=2**20
+    )
+    print(f"Mock OpenRouter listening on http://{args.host}:{args.port}/api/v1", flush=True)
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv=None) -> None:
+    try:
+        asyncio.run(serve(parse_args(argv)))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,49 @@ export interface AIModel {
   name: string;
   provider: string;
   description: string;
+  color: string; // Tailwind background class for headers and avatars
+  greeting: string;
+  pricing: ModelPricing;
+  requestsPerMinute: number; // Upstream rate limit honoured by batch runs
+  cacheControl: boolean; // Accepts explicit prompt-cache breakpoints
+  slowFirstTokenMs?: number; // Circuit breaker's slow-call threshold
+}
+
+// USD per million tokens
+export interface ModelPricing {
+  prompt: number;
+  completion: number;
+  cachedPrompt?: number; // Prompt tokens served from the provider's cache
+}
+
+export interface TokenUsage {
+  promptTokens: number;
+  cachedPromptTokens: number; // Included in promptTokens
+  completionTokens: number;
+  latencyMs: number;
+  costUsd: number;
+}
+
+// Rolling health of a model on this server, from recent generate calls
+export interface ModelStats {
+  samples: number;
+  p50LatencyMs: number | null;
+  p95LatencyMs: number | null;
+  errorRate: number;
+  cacheHitRate: number | null; // Share of prompt tokens read from cache
+}
+
+export type CircuitState = "closed" | "open" | "half-open";
+
+export interface CircuitStatus {
+  state: CircuitState;
+  retryAt?: number; // Epoch ms of the next recovery probe while open
+}
+
+// Per-model entry of GET /api/models
+export interface ModelHealth {
+  stats: ModelStats;
+  circuit: CircuitStatus;
 }
 
 export interface AIResponse {
@@ -12,6 +55,43 @@ export interface AIResponse {
   timestamp: Date;
   isLoading: boolean;
   error?: string;
+  // Stopped before it finished; `content` is what had streamed by then.
+  cancelled?: boolean;
+  // Written offline; waiting in the outbox to be sent
+  queued?: boolean;
+  usage?: TokenUsage;
+}
+
+// Earlier turns of a conversation, sent along so the model has context
+export interface ChatTurn {
+  role: "user" | "assistant";
+  content: string;
+}
+
+// Lines of the NDJSON stream returned by POST /api/chat
+export type ChatStreamEvent =
+  | { type: "start"; sendId: string; modelIds: string[] }
+  | { type: "delta"; modelId: string; text: string }
+  | { type: "done"; response: AIResponse }
+  | { type: "timing"; serverTiming: string }
+  | { type: "error"; error: string };
+
+export type ChatJobStatus =
+  | "queued"
+  | "running"
+  | "done"
+  | "failed"
+  | "cancelled";
+
+// A chat_jobs row: one model's share of a send made in queue mode. `content`
+// is the text streamed so far; `response` is set once the job has finished.
+export interface ChatJob {
+  id: string;
+  send_id: string;
+  model_id: string;
+  status: ChatJobStatus;
+  content: string;
+  response: AIResponse | null;
 }
 
 export interface ChatMessage {
@@ -1,30 +1,82 @@
 import { createServerClient } from "@supabase/ssr";
 import { type NextRequest, NextResponse } from "next/server";
+import type { User } from "@supabase/supabase-js";
+import {
+  serverTiming,
+  traceparent,
+  withSpan,
+  withTrace,
+} from "@/lib/telemetry";
+
+// Set on the forwarded request to the id of the user whose session was just
+// verified (and stripped otherwise), so route handlers can trust it without
+// another round-trip to Supabase Auth. Their email comes along, URI-encoded,
+// so server components can seed the client's auth state (getServerUser).
+export const USER_ID_HEADER = "x-polymind-user-id";
+export const USER_EMAIL_HEADER = "x-polymind-user-email";
+
+// What pages know of the signed-in user
+export type ServerUser = Pick<User, "id" | "email">;
+
+export const bearerToken = (request: Request) =>
+  request.headers.get("authorization")?.match(/^Bearer (.+)$/i)?.[1];
 
 export async function updateSession(request: NextRequest) {
-  const response = NextResponse.next({ request });
-
-  const supabase = createServerClient(
-    process.env.NEXT_PUBLIC_SUPABASE_URL!,
-    process.env.NEXT_PUBLIC_SUPABASE_ANON_KEY!,
-    {
-      cookies: {
-        get(name: string) {
-          return request.cookies.get(name)?.value;
-        },
-        set(name: string, value: string, options: any) {
-          request.cookies.set({ name, value, ...options });
-          response.cookies.set({ name, value, ...options });
-        },
-        remove(name: string, options: any) {
-          request.cookies.set({ name, value: "", ...options });
-          response.cookies.set({ name, value: "", ...options });
-        },
-      },
-    }
-  );
+  return withTrace(
+    "middleware",
+    request.headers,
+    async (root, trace) => {
+      // Downstream layouts and route handlers continue this trace.
+      const requestHeaders = new Headers(request.headers);
+      requestHeaders.set("traceparent", traceparent(root));
+      requestHeaders.delete(USER_ID_HEADER);
+      requestHeaders.delete(USER_EMAIL_HEADER);
+      // The response can only be created once the user is known, so cookie
+      // writes from the session refresh are buffered until then.
+      const pendingCookies: Array<{ name: string; value: string }> = [];
 
-  // This will refresh the session if expired - required for Server Components
-  await supabase.auth.getUser();
-  return response;
+      const supabase = createServerClient(
+        process.env.NEXT_PUBLIC_SUPABASE_URL!,
+        process.env.NEXT_PUBLIC_SUPABASE_ANON_KEY!,
+        {
+          cookies: {
+            get(name: string) {
+              return request.cookies.get(name)?.value;
+            },
+            set(name: string, value: string, options: any) {
+              request.cookies.set({ name, value, ...options });
+              pendingCookies.push({ name, value, ...options });
+            },
+            remove(name: string, options: any) {
+              request.cookies.set({ name, value: "", ...options });
+              pendingCookies.push({ name, value: "", ...options });
+            },
+          },
+        }
+      );
+
+      // This will refresh the session if expired - required for Server Components.
+      // Scripts may send an access token instead of session cookies.
+      await withSpan("updateSession", async (span) => {
+        const { data } = await supabase.auth.getUser(bearerToken(request));
+        span.attributes["enduser.authenticated"] = Boolean(data.user);
+        if (data.user) {
+          requestHeaders.set(USER_ID_HEADER, data.user.id);
+          requestHeaders.set(
+            USER_EMAIL_HEADER,
+            encodeURIComponent(data.user.email ?? "")
+          );
+        }
+      });
+
+      const response = NextResponse.next({
+        request: { headers: requestHeaders },
+      });
+      pendingCookies.forEach((cookie) => response.cookies.set(cookie));
+
+      response.headers.set("Server-Timing", serverTiming(trace));
+      return response;
+    },
+    { "url.path": request.nextUrl.pathname }
+  );
 }
@@ -1,5 +1,13 @@
-import { cookies } from "next/headers";
+import { cache } from "react";
+import { cookies, headers } from "next/headers";
 import { createServerClient } from "@supabase/ssr";
+import { createClient as createSupabaseClient } from "@supabase/supabase-js";
+import {
+  USER_EMAIL_HEADER,
+  USER_ID_HEADER,
+  type ServerUser,
+  bearerToken,
+} from "./middleware";
 
 export async function createClient() {
   const cookieStore = await cookies();
@@ -22,3 +30,44 @@ export async function createClient() {
     }
   );
 }
+
+// The user the middleware verified for this request, or null. Costs no
+// round-trip to Supabase Auth, and is read once per request however many
+// server components ask.
+export const getServerUser = cache(async (): Promise<ServerUser | null> => {
+  const requestHeaders = await headers();
+  const id = requestHeaders.get(USER_ID_HEADER);
+  if (!id) return null;
+  const email = requestHeaders.get(USER_EMAIL_HEADER);
+  try {
+    return { id, email: email ? decodeURIComponent(email) : undefined };
+  } catch {
+    return { id };
+  }
+});
+
+// Route handlers called by scripts authenticate with a bearer token rather
+// than session cookies; queries must then run as that token's user.
+export async function createRouteClient(request: Request) {
+  const bearer = bearerToken(request);
+  if (!bearer) return createClient();
+
+  return createSupabaseClient(
+    process.env.NEXT_PUBLIC_SUPABASE_URL!,
+    process.env.NEXT_PUBLIC_SUPABASE_ANON_KEY!,
+    {
+      global: { headers: { Authorization: `Bearer ${bearer}` } },
+      auth: { persistSession: false, autoRefreshToken: false },
+    }
+  );
+}
+
+// Service-role client for background work with no user request behind it
+// (the chat job worker). Bypasses RLS, so server-side use only.
+export function createServiceClient() {
+  return createSupabaseClient(
+    process.env.NEXT_PUBLIC_SUPABASE_URL!,
+    process.env.SUPABASE_SERVICE_ROLE_KEY!,
+    { auth: { persistSession: false, autoRefreshToken: false } }
+  );
+}